@@ -0,0 +1,88 @@
+# ==============================================================================
+# ANÁLISES DE ESTOQUE (CURVA ABC E REPOSIÇÃO)
+# ==============================================================================
+# Cálculos vetorizados com NumPy sobre arrays já carregados do banco: uma
+# consulta traz o catálogo inteiro e o resto é feito sem laços em Python.
+# Este módulo não importa o Flask nem o banco.
+
+import numpy as np
+
+# Percentual acumulado do valor movimentado que fecha as classes A e B
+LIMITE_CLASSE_A = 0.80
+LIMITE_CLASSE_B = 0.95
+
+# Reposição: z do nível de serviço (1,65 ~ 95%) usado no estoque de segurança
+FATOR_SEGURANCA = 1.65
+
+
+def classificar_abc(quantidades, precos, limite_a=LIMITE_CLASSE_A, limite_b=LIMITE_CLASSE_B):
+    """Classifica cada produto em A, B ou C pelo valor (quantidade × preço) na curva de Pareto.
+
+    Devolve (ordem, valores, percentual_acumulado, classes): 'ordem' são os
+    índices dos produtos do maior para o menor valor e os outros arrays
+    seguem essa ordem. Um produto entra na classe cujo limite ainda não tinha
+    sido atingido antes dele (o item que cruza 80% ainda é A). Produtos sem
+    valor movimentado são sempre C.
+    """
+    valores = np.asarray(quantidades, dtype=np.float64) * np.asarray(precos, dtype=np.float64)
+    # Estável: empates mantêm a ordem de entrada (a consulta já vem ordenada por código)
+    ordem = np.argsort(-valores, kind='stable')
+    valores = valores[ordem]
+    acumulado = np.cumsum(valores)
+    total = acumulado[-1] if len(acumulado) else 0.0
+    if total <= 0:
+        return ordem, valores, np.zeros_like(valores), np.full(len(valores), 'C')
+
+    anterior = (acumulado - valores) / total
+    classes = np.select([anterior < limite_a, anterior < limite_b], ['A', 'B'], default='C')
+    classes[valores <= 0] = 'C'
+    return ordem, valores, acumulado / total, classes
+
+
+def acumular_saidas(saidas_diarias, janela_curta):
+    """Somas por produto da matriz produto × dia das saídas (uma coluna por dia, a mais recente no fim).
+
+    Guardar só as somas permite juntar depois as saídas de hoje sem voltar a
+    ler os dias anteriores (ver prever_reposicao).
+    """
+    # A matriz pode vir em float32 (catálogos grandes); as reduções são feitas em float64
+    saidas = np.asarray(saidas_diarias)
+    return {
+        'soma': saidas.sum(axis=1, dtype=np.float64),
+        'soma_quadrados': np.square(saidas, dtype=np.float64).sum(axis=1),
+        'soma_curta': saidas[:, saidas.shape[1] - janela_curta:].sum(axis=1, dtype=np.float64),
+    }
+
+
+def prever_reposicao(somas, saidas_hoje, saldos, janela, janela_curta, prazo_entrega, cobertura_alvo, fator_seguranca=FATOR_SEGURANCA):
+    """Consumo, cobertura e quantidade a repor por produto.
+
+    'somas' vem de acumular_saidas sobre os janela-1 dias anteriores a hoje
+    (com janela_curta-1 dias na soma curta); 'saidas_hoje' e 'saldos' são os
+    valores atuais de cada produto. O consumo diário é o maior entre a média
+    móvel da janela inteira e a dos últimos 'janela_curta' dias, para que um
+    produto a acelerar apareça antes de esgotar. O ponto de reposição cobre o
+    consumo durante o prazo de entrega mais um estoque de segurança (fator ×
+    desvio padrão diário × raiz do prazo); a quantidade sugerida repõe até ao
+    ponto de reposição mais 'cobertura_alvo' dias.
+
+    Devolve um dict de arrays alinhados com os produtos.
+    """
+    hoje = np.asarray(saidas_hoje, dtype=np.float64)
+    saldos = np.asarray(saldos, dtype=np.float64)
+    media = (somas['soma'] + hoje) / janela
+    variancia = np.maximum((somas['soma_quadrados'] + hoje * hoje) / janela - media * media, 0)
+    consumo = np.maximum(media, (somas['soma_curta'] + hoje) / janela_curta)
+    seguranca = fator_seguranca * np.sqrt(variancia) * np.sqrt(prazo_entrega)
+    ponto_reposicao = consumo * prazo_entrega + seguranca
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cobertura = np.where(consumo > 0, np.maximum(saldos, 0) / consumo, np.inf)
+    sugerido = np.ceil(np.maximum(ponto_reposicao + consumo * cobertura_alvo - saldos, 0))
+    return {
+        'consumo_diario': consumo,
+        'dias_cobertura': cobertura,
+        'estoque_seguranca': seguranca,
+        'ponto_reposicao': ponto_reposicao,
+        'quantidade_sugerida': np.where(consumo > 0, sugerido, 0),
+    }
@@ -0,0 +1,95 @@
+# ==============================================================================
+# CACHE EM DISCO DE RELATÓRIOS RENDERIZADOS
+# ==============================================================================
+# A chave de cada entrada junta o tipo do relatório, os parâmetros e a versão
+# dos dados das tabelas que ele lê; quando os dados mudam a chave muda e a
+# entrada antiga deixa de ser usada até ser removida pela política LRU (o
+# tempo de modificação do ficheiro é atualizado a cada acerto). As entradas
+# são devolvidas já abertas: a limpeza de outro pedido (ou de outro processo)
+# pode apagar o ficheiro a seguir, mas quem já o tem aberto continua a lê-lo
+# (no Windows o ficheiro aberto simplesmente não é apagado).
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+PASTA_CACHE = os.environ.get('ESTOQUE_CACHE_RELATORIOS') or os.path.join(tempfile.gettempdir(), 'estoque_cache_relatorios')
+TAMANHO_MAX_BYTES = int(os.environ.get('ESTOQUE_CACHE_RELATORIOS_MB', '500')) * 1024 * 1024
+
+_lock = threading.Lock()
+
+
+def calcular_chave(tipo, parametros, versoes):
+    conteudo = json.dumps({'tipo': tipo, 'parametros': parametros, 'versoes': versoes}, sort_keys=True, default=str)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def _caminhos(chave, pasta):
+    return os.path.join(pasta, f"{chave}.bin"), os.path.join(pasta, f"{chave}.json")
+
+def obter(chave, pasta=PASTA_CACHE):
+    """
+    Devolve (ficheiro aberto em 'rb', nome_download, mimetype, avisos) se a chave estiver
+    em cache, senão None. Quem chama fecha o ficheiro.
+    """
+    caminho, caminho_meta = _caminhos(chave, pasta)
+    try:
+        with open(caminho_meta, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        arquivo = open(caminho, 'rb')
+    except (OSError, json.JSONDecodeError):
+        return None
+    try:
+        os.utime(caminho)  # marca como usado recentemente (LRU)
+    except OSError:
+        pass
+    return arquivo, meta['nome_download'], meta['mimetype'], meta.get('avisos', [])
+
+def guardar(chave, caminho_origem, nome_download, mimetype, avisos=(), pasta=PASTA_CACHE):
+    """
+    Move o ficheiro renderizado para o cache e remove as entradas menos usadas
+    se passar do limite. Devolve (ficheiro aberto em 'rb', nome_download,
+    mimetype, avisos), aberto antes da limpeza.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    caminho, caminho_meta = _caminhos(chave, pasta)
+    sufixo = f".{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.move(caminho_origem, caminho + sufixo)
+    os.replace(caminho + sufixo, caminho)
+    with open(caminho_meta + sufixo, 'w', encoding='utf-8') as f:
+        json.dump({'nome_download': nome_download, 'mimetype': mimetype, 'avisos': list(avisos)}, f)
+    os.replace(caminho_meta + sufixo, caminho_meta)
+    arquivo = open(caminho, 'rb')
+    remover_excedente(pasta, preservar=chave)
+    return arquivo, nome_download, mimetype, list(avisos)
+
+def remover_excedente(pasta=PASTA_CACHE, limite=None, preservar=None):
+    """Remove as entradas com acesso mais antigo até o cache caber em 'limite' bytes (exceto 'preservar')."""
+    limite = TAMANHO_MAX_BYTES if limite is None else limite
+    with _lock:
+        entradas = []
+        total = 0
+        for nome in os.listdir(pasta):
+            if not nome.endswith('.bin'):
+                continue
+            try:
+                info = os.stat(os.path.join(pasta, nome))
+            except OSError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, nome[:-4]))
+            total += info.st_size
+
+        for _, tamanho, chave in sorted(entradas):
+            if total <= limite:
+                break
+            if chave == preservar:
+                continue
+            for caminho in _caminhos(chave, pasta):
+                try:
+                    os.remove(caminho)
+                except OSError:
+                    # No Windows um ficheiro a ser enviado não pode ser apagado; fica para a próxima
+                    pass
+            total -= tamanho
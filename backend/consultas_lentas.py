@@ -0,0 +1,169 @@
+# ==============================================================================
+# REGISTO DE CONSULTAS LENTAS
+# ==============================================================================
+# Cada instrução SQL que demora mais do que db_consulta_lenta_ms (ver
+# configuracao.py) é escrita numa linha JSON de um ficheiro rotativo, com o
+# SQL normalizado, os parâmetros, a duração e a rota que a fez. Com
+# db_explain_consultas_lentas, os SELECTs lentos são repetidos com EXPLAIN
+# (EXPLAIN QUERY PLAN no SQLite) na mesma ligação e o plano vai junto.
+#
+# A medição é feita pelos eventos de consultas_sql.py; este módulo só trata
+# das consultas acima do limite. O resumo em /api/admin/consultas-lentas é
+# por processo, como as métricas: com o servidor_producao.py cada leitura
+# responde pelo worker que a recebeu. Cada processo escreve no seu próprio
+# ficheiro (o pid entra no nome: consultas_lentas.<pid>.log) e roda-o sozinho:
+# no Windows um ficheiro aberto por outro processo não pode ser renomeado, e
+# com um ficheiro partilhado a rotação falhava em todos os workers.
+#
+# Os valores de colunas sensíveis (login, senha, ...) são mascarados antes de
+# irem para o ficheiro ou para o resumo.
+
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+
+# Formas de consulta distintas guardadas no resumo; acima disto sai a de menor tempo total
+MAX_FORMAS_RESUMO = 500
+# Parâmetros maiores do que isto (texto de importações, blobs) são cortados no registo
+MAX_TAMANHO_PARAMETROS = 2000
+# Ficheiros rotativos: tamanho de cada um e quantos antigos se mantêm
+TAMANHO_ARQUIVO_BYTES = 10 * 1024 * 1024
+ARQUIVOS_ANTIGOS = 5
+# Colunas cujo valor não é registado; parâmetros com o nome delas e um sufixo
+# numérico (login_1, como o SQLAlchemy os nomeia) também contam
+COLUNAS_SENSIVEIS = frozenset({'login', 'senha', 'senha_hash', 'password', 'token'})
+MASCARA = '***'
+
+_SUFIXO_PARAMETRO = re.compile(r'_\d+$')
+_MENCIONA_SENSIVEL = re.compile(r'\b(?:' + '|'.join(sorted(COLUNAS_SENSIVEIS)) + r')\b', re.IGNORECASE)
+
+limite_segundos = None
+explain = False
+arquivo = None
+
+_logger = logging.getLogger('consultas_lentas')
+_lock = threading.Lock()
+_resumo = {}
+
+
+def configurar(limite_ms, com_explain, caminho):
+    """
+    Liga o registo (limite_ms = 0 desliga) e abre o ficheiro rotativo deste
+    processo: 'caminho' com o pid antes da extensão.
+    """
+    global limite_segundos, explain, arquivo
+    if not limite_ms:
+        limite_segundos = None
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    if not _logger.handlers:
+        raiz, extensao = os.path.splitext(caminho)
+        arquivo = f"{raiz}.{os.getpid()}{extensao}"
+        handler = RotatingFileHandler(arquivo, maxBytes=TAMANHO_ARQUIVO_BYTES, backupCount=ARQUIVOS_ANTIGOS, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        _logger.addHandler(handler)
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+    limite_segundos = limite_ms / 1000
+    explain = com_explain
+
+
+def _sensivel(nome):
+    return _SUFIXO_PARAMETRO.sub('', str(nome)).lower() in COLUNAS_SENSIVEIS
+
+def _mascarar(parametros, nomes, mascarar_tudo):
+    if isinstance(parametros, dict):
+        return {k: MASCARA if _sensivel(k) else v for k, v in parametros.items()}
+    if not isinstance(parametros, (list, tuple)):
+        return parametros
+    if nomes is not None and len(nomes) == len(parametros):
+        return tuple(MASCARA if _sensivel(n) else v for n, v in zip(nomes, parametros))
+    return tuple(MASCARA for _ in parametros) if mascarar_tudo else parametros
+
+def parametros_mascarados(statement, parametros, context, executemany):
+    """
+    Os parâmetros com os valores das COLUNAS_SENSIVEIS trocados por MASCARA.
+    Parâmetros posicionais (?, %s) são associados aos nomes pela instrução
+    compilada; se não houver como, e o SQL mencionar uma coluna sensível,
+    todos os valores são mascarados.
+    """
+    nomes = getattr(getattr(context, 'compiled', None), 'positiontup', None)
+    mascarar_tudo = nomes is None and bool(_MENCIONA_SENSIVEL.search(statement))
+    if executemany:
+        return [_mascarar(p, nomes, mascarar_tudo) for p in parametros]
+    return _mascarar(parametros, nomes, mascarar_tudo)
+
+def _parametros_serializaveis(parametros):
+    texto = json.dumps(parametros, default=str, ensure_ascii=False)
+    if len(texto) > MAX_TAMANHO_PARAMETROS:
+        return texto[:MAX_TAMANHO_PARAMETROS] + '...'
+    return json.loads(texto)
+
+def _plano(cursor, statement, parametros):
+    """Linhas do EXPLAIN como dicionários, ou None se a instrução não for um SELECT."""
+    inicio = statement.lstrip()[:6].upper()
+    if not (inicio.startswith('SELECT') or inicio.startswith('WITH')):
+        return None
+    ligacao = cursor.connection
+    prefixo = 'EXPLAIN QUERY PLAN ' if type(ligacao).__module__.startswith('sqlite3') else 'EXPLAIN '
+    # Cursor DBAPI direto: não passa pelos eventos do SQLAlchemy nem é contado como consulta do pedido
+    explicacao = ligacao.cursor()
+    try:
+        explicacao.execute(prefixo + statement, parametros)
+        colunas = [c[0] for c in explicacao.description]
+        return [dict(zip(colunas, linha)) for linha in explicacao.fetchall()]
+    finally:
+        explicacao.close()
+
+def registrar(cursor, statement, forma, parametros, segundos, context, executemany):
+    """Chamada por consultas_sql para cada instrução acima do limite."""
+    endpoint = '<fora de pedido>'
+    if has_request_context():
+        endpoint = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+    plano = None
+    # Com stream_results o cursor original ainda tem linhas por ler (SSCursor no MySQL)
+    if explain and not executemany and not (context is not None and context.execution_options.get('stream_results')):
+        try:
+            plano = _plano(cursor, statement, parametros)
+        except Exception as e:
+            plano = [{'erro': str(e)}]
+    registo = {
+        'data_hora': datetime.now().isoformat(timespec='milliseconds'),
+        'duracao_ms': round(segundos * 1000, 1),
+        'endpoint': endpoint,
+        'sql': forma,
+        'parametros': _parametros_serializaveis(parametros_mascarados(statement, parametros, context, executemany)),
+    }
+    if plano is not None:
+        registo['plano'] = plano
+    _logger.info(json.dumps(registo, default=str, ensure_ascii=False))
+
+    with _lock:
+        entrada = _resumo.get(forma)
+        if entrada is None:
+            if len(_resumo) >= MAX_FORMAS_RESUMO:
+                del _resumo[min(_resumo, key=lambda f: _resumo[f]['total_segundos'])]
+            entrada = _resumo[forma] = {'sql': forma, 'ocorrencias': 0, 'total_segundos': 0.0, 'maximo_segundos': 0.0, 'endpoints': {}}
+        entrada['ocorrencias'] += 1
+        entrada['total_segundos'] += segundos
+        entrada['endpoints'][endpoint] = entrada['endpoints'].get(endpoint, 0) + 1
+        if segundos >= entrada['maximo_segundos']:
+            # A ocorrência mais lenta fica como exemplo (parâmetros e plano)
+            entrada['maximo_segundos'] = segundos
+            entrada['exemplo'] = registo
+
+
+def piores_consultas(limite=20, ordem='total_segundos'):
+    """As formas de consulta lentas deste processo, da pior para a melhor segundo 'ordem'."""
+    with _lock:
+        entradas = [dict(e, endpoints=dict(e['endpoints'])) for e in _resumo.values()]
+    entradas.sort(key=lambda e: e[ordem], reverse=True)
+    for e in entradas:
+        e['media_segundos'] = e['total_segundos'] / e['ocorrencias']
+    return entradas[:limite]
@@ -0,0 +1,109 @@
+# ==============================================================================
+# CONTAGEM DE CONSULTAS SQL POR PEDIDO E DETEÇÃO DE N+1
+# ==============================================================================
+# Eventos do SQLAlchemy contam as consultas e o tempo no banco de cada pedido
+# (cabeçalhos X-DB-Queries e X-DB-Time, em milissegundos) e avisam quando a
+# mesma consulta (com outros parâmetros) se repete mais de
+# LIMITE_CONSULTAS_REPETIDAS vezes no mesmo pedido: o padrão típico de um
+# laço que faz uma consulta por linha.
+#
+# As consultas acima do limite de lentidão seguem para consultas_lentas.py.
+#
+# As rotas podem declarar um orçamento com @orcamento_consultas(n). Fora dos
+# testes, exceder o orçamento só gera um aviso; com app.testing levanta
+# OrcamentoConsultasExcedido e o teste que fez o pedido falha.
+
+import functools
+import os
+import re
+import time
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+import consultas_lentas
+
+LIMITE_CONSULTAS_REPETIDAS = int(os.environ.get('ESTOQUE_LIMITE_CONSULTAS_REPETIDAS', '20'))
+
+_ESPACOS = re.compile(r'\s+')
+# IN (?, ?, ?) / IN (%s, %s) com qualquer número de parâmetros conta como a mesma consulta
+_LISTA_IN = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+)\s*,?)+\)', re.IGNORECASE)
+# Inserções em lote com VALUES (...), (...), ...
+_VALORES_MULTIPLOS = re.compile(r'(VALUES\s*\([^)]*\))(?:\s*,\s*\([^)]*\))+', re.IGNORECASE)
+
+
+class OrcamentoConsultasExcedido(AssertionError):
+    """Levantada em testes quando uma rota faz mais consultas do que o orçamento declarado."""
+
+
+def forma_consulta(sql):
+    """SQL normalizado: espaços colapsados e listas IN / VALUES de tamanho variável reduzidas a uma."""
+    sql = _ESPACOS.sub(' ', sql).strip()
+    sql = _LISTA_IN.sub('IN (...)', sql)
+    return _VALORES_MULTIPLOS.sub(r'\1, ...', sql)
+
+
+def _estado_pedido():
+    if not has_request_context():
+        return None
+    estado = g.get('consultas_sql')
+    if estado is None:
+        estado = g.consultas_sql = {'total': 0, 'segundos': 0.0, 'formas': Counter(), 'avisadas': set()}
+    return estado
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _antes_consulta(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('inicio_consultas', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'handle_error')
+def _erro_consulta(contexto):
+    if contexto.connection is not None and contexto.connection.info.get('inicio_consultas'):
+        contexto.connection.info['inicio_consultas'].pop()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _depois_consulta(conn, cursor, statement, parameters, context, executemany):
+    segundos = time.perf_counter() - conn.info['inicio_consultas'].pop()
+    lenta = consultas_lentas.limite_segundos is not None and segundos >= consultas_lentas.limite_segundos
+    estado = _estado_pedido()
+    if estado is None:
+        if lenta:
+            consultas_lentas.registrar(cursor, statement, forma_consulta(statement), parameters, segundos, context, executemany)
+        return
+    estado['total'] += 1
+    estado['segundos'] += segundos
+    forma = forma_consulta(statement)
+    if lenta:
+        consultas_lentas.registrar(cursor, statement, forma, parameters, segundos, context, executemany)
+    estado['formas'][forma] += 1
+    if estado['formas'][forma] > LIMITE_CONSULTAS_REPETIDAS and forma not in estado['avisadas']:
+        estado['avisadas'].add(forma)
+        current_app.logger.warning("Possível N+1 em %s %s: consulta repetida mais de %d vezes: %s",
+                       request.method, request.path, LIMITE_CONSULTAS_REPETIDAS, forma[:300])
+
+
+def orcamento_consultas(maximo):
+    """Declara o número máximo de consultas SQL que a rota pode fazer por pedido."""
+    def decorador(f):
+        @functools.wraps(f)
+        def rota(*args, **kwargs):
+            g.orcamento_consultas = maximo
+            return f(*args, **kwargs)
+        return rota
+    return decorador
+
+
+def finalizar_pedido(response):
+    """Acrescenta os cabeçalhos X-DB-* à resposta e verifica o orçamento da rota (hook after_request)."""
+    estado = g.get('consultas_sql') or {'total': 0, 'segundos': 0.0}
+    response.headers['X-DB-Queries'] = str(estado['total'])
+    response.headers['X-DB-Time'] = f"{estado['segundos'] * 1000:.1f}"
+    maximo = g.get('orcamento_consultas')
+    if maximo is not None and estado['total'] > maximo:
+        mensagem = f"{request.method} {request.path} fez {estado['total']} consultas SQL (orçamento: {maximo})"
+        if current_app.testing:
+            raise OrcamentoConsultasExcedido(mensagem)
+        current_app.logger.warning(mensagem)
+    return response
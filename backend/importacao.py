@@ -0,0 +1,171 @@
+# ==============================================================================
+# LEITURA E NORMALIZAÇÃO DO CSV DE IMPORTAÇÃO DE PRODUTOS
+# ==============================================================================
+# Este módulo não importa o Flask nem o banco: as funções de bloco correm em
+# processos separados (ProcessPoolExecutor) e precisam de ser leves de importar.
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+# Ficheiros abaixo deste tamanho são lidos no próprio processo (criar o pool não compensa)
+LIMIAR_IMPORTACAO_PARALELA_BYTES = 4 * 1024 * 1024
+BLOCOS_POR_WORKER = 2
+
+# Colunas do CSV de produtos, na ordem usada pela exportação (a importação aceita qualquer ordem)
+COLUNAS_CSV_PRODUTOS = [
+    'codigo', 'nome', 'descricao', 'preco', 'quantidade', 'codigoB', 'codigoC',
+    'setor', 'fornecedores_nomes', 'naturezas_nomes'
+]
+
+# Separador usado ao agregar nomes no SQL da exportação: não aparece em nomes digitados
+SEPARADOR_AGREGACAO = '\x1f'
+
+# Limites das colunas da tabela produto
+TAMANHO_MAX_CODIGO = 20
+TAMANHO_MAX_NOME = 100
+TAMANHO_MAX_DESCRICAO = 200
+
+
+def normalizar_preco(preco_str):
+    """Converte '12,50' / '12.50' / '' num Decimal com duas casas."""
+    if not preco_str:
+        return Decimal('0.00')
+    try:
+        return Decimal(preco_str.replace(',', '.')).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(f"Preço inválido '{preco_str}'")
+
+def ler_lista_nomes(texto):
+    """'A, B, "C, Lda"' -> ['A', 'B', 'C, Lda']: lista separada por vírgulas, com aspas nos nomes que as têm."""
+    return [n.strip() for n in next(csv.reader([texto or ''], skipinitialspace=True), []) if n.strip()]
+
+def formatar_lista_nomes(nomes):
+    """Inverso de ler_lista_nomes: nomes com vírgula ou aspas vão entre aspas."""
+    return ', '.join('"' + n.replace('"', '""') + '"' if (',' in n or '"' in n) else n for n in nomes)
+
+def normalizar_linha_importacao(linha):
+    """Limpa uma linha do CSV de importação. Levanta ValueError se a linha for inválida."""
+    codigo = (linha.get('codigo') or '').strip()
+    nome = (linha.get('nome') or '').strip()
+    if not codigo or not nome:
+        raise ValueError("Campos codigo/nome vazios.")
+    if len(codigo) > TAMANHO_MAX_CODIGO:
+        raise ValueError(f"Código '{codigo}' excede {TAMANHO_MAX_CODIGO} caracteres.")
+    if len(nome) > TAMANHO_MAX_NOME:
+        raise ValueError(f"Nome excede {TAMANHO_MAX_NOME} caracteres.")
+
+    descricao = (linha.get('descricao') or '').strip()
+    if len(descricao) > TAMANHO_MAX_DESCRICAO:
+        raise ValueError(f"Descrição excede {TAMANHO_MAX_DESCRICAO} caracteres.")
+
+    qtd = (linha.get('quantidade') or '').strip()
+    try:
+        quantidade = int(qtd) if qtd else 0
+    except ValueError:
+        raise ValueError(f"Quantidade inválida '{qtd}'")
+
+    return {
+        'codigo': codigo,
+        'nome': nome,
+        'descricao': descricao,
+        'preco': normalizar_preco((linha.get('preco') or '').strip()),
+        'codigoB': (linha.get('codigoB') or '').strip() or None,
+        'codigoC': (linha.get('codigoC') or '').strip() or None,
+        'setor': (linha.get('setor') or '').strip() or None,
+        'quantidade': quantidade,
+        'fornecedores_nomes': ler_lista_nomes(linha.get('fornecedores_nomes')),
+        'naturezas_nomes': ler_lista_nomes(linha.get('naturezas_nomes')),
+    }
+
+def detectar_codificacao(dados):
+    """
+    'UTF-8' se o ficheiro inteiro for UTF-8 válido, senão 'latin-1'. É decidido
+    uma vez para o ficheiro todo: um bloco só com ASCII seria UTF-8 válido mesmo
+    num ficheiro latin-1, e os blocos ficariam descodificados de formas diferentes.
+    """
+    if dados.isascii():
+        return 'UTF-8'
+    try:
+        dados.decode('UTF-8')
+    except UnicodeDecodeError:
+        return 'latin-1'
+    return 'UTF-8'
+
+def processar_bloco(bloco, delimitador, colunas, linha_inicial, codificacao):
+    """
+    Lê e normaliza um bloco de linhas (bytes, sem cabeçalho) na codificação do ficheiro.
+    Devolve (registros, erros); cada registro leva o número da linha em 'linha'.
+    """
+    registros = []
+    erros = []
+    leitor = csv.DictReader(io.StringIO(bloco.decode(codificacao), newline=None), fieldnames=colunas, delimiter=delimitador)
+    for linha in leitor:
+        linha_num = linha_inicial + leitor.line_num - 1
+        try:
+            registro = normalizar_linha_importacao(linha)
+        except ValueError as e:
+            erros.append(f"Linha {linha_num}: {e}")
+            continue
+        registro['linha'] = linha_num
+        registros.append(registro)
+    return registros, erros
+
+def _processar_bloco_args(args):
+    return processar_bloco(*args)
+
+def dividir_em_blocos(dados, inicio, n_blocos):
+    """Divide dados[inicio:] em até n_blocos intervalos (ini, fim) terminados em fim de linha."""
+    total = len(dados)
+    tamanho = max(1, (total - inicio) // max(1, n_blocos))
+    blocos = []
+    ini = inicio
+    while ini < total:
+        fim = min(total, ini + tamanho)
+        if fim < total:
+            quebra = dados.find(b'\n', fim)
+            fim = total if quebra == -1 else quebra + 1
+        blocos.append((ini, fim))
+        ini = fim
+    return blocos
+
+def ler_ficheiro_importacao(dados, max_workers=None):
+    """
+    Lê o CSV de importação (bytes) e devolve (registros, colunas, erros).
+
+    Ficheiros grandes são cortados em blocos de bytes alinhados a fim de linha e
+    normalizados em paralelo num ProcessPoolExecutor; o resultado mantém a ordem
+    do ficheiro. Campos entre aspas com quebra de linha não são suportados no
+    modo paralelo (a divisão é feita em '\\n').
+    """
+    fim_cabecalho = dados.find(b'\n')
+    if fim_cabecalho == -1:
+        fim_cabecalho = len(dados)
+    codificacao = detectar_codificacao(dados)
+    cabecalho = dados[:fim_cabecalho].decode(codificacao).strip('\r\n').lstrip('\ufeff')
+    delimitador = ';' if ';' in cabecalho else ','
+    colunas = next(csv.reader([cabecalho], delimiter=delimitador), [])
+    inicio_corpo = min(len(dados), fim_cabecalho + 1)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers <= 1 or len(dados) < LIMIAR_IMPORTACAO_PARALELA_BYTES:
+        registros, erros = processar_bloco(dados[inicio_corpo:], delimitador, colunas, 2, codificacao)
+        return registros, colunas, erros
+
+    tarefas = []
+    linha_inicial = 2
+    anterior = inicio_corpo
+    for ini, fim in dividir_em_blocos(dados, inicio_corpo, max_workers * BLOCOS_POR_WORKER):
+        linha_inicial += dados.count(b'\n', anterior, ini)
+        anterior = ini
+        tarefas.append((dados[ini:fim], delimitador, colunas, linha_inicial, codificacao))
+
+    registros, erros = [], []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for registros_bloco, erros_bloco in pool.map(_processar_bloco_args, tarefas):
+            registros.extend(registros_bloco)
+            erros.extend(erros_bloco)
+    return registros, colunas, erros
@@ -0,0 +1,143 @@
+# ==============================================================================
+# MÉTRICAS DE PEDIDOS HTTP (FORMATO DE TEXTO DO PROMETHEUS)
+# ==============================================================================
+# Cada thread do servidor soma os seus pedidos num dicionário próprio (sem
+# locks no caminho do pedido); a leitura em /api/metrics junta os
+# dicionários de todas as threads. Os contadores são por processo: com o
+# servidor_producao.py cada leitura responde pelo worker que a recebeu, e a
+# etiqueta 'processo' separa as séries de cada um.
+#
+# Este módulo não importa o Flask; o registo dos pedidos é feito pelos
+# hooks em app.py.
+
+import bisect
+import os
+import threading
+
+# Limites (segundos) dos baldes do histograma de latência
+LIMITES_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_local = threading.local()
+_todos_contadores = []
+_lock_registo = threading.Lock()
+
+
+def _contadores_da_thread():
+    contadores = getattr(_local, 'contadores', None)
+    if contadores is None:
+        contadores = _local.contadores = {}
+        with _lock_registo:
+            _todos_contadores.append(contadores)
+    return contadores
+
+def registrar_pedido(endpoint, metodo, status, segundos, tamanho):
+    """Soma um pedido aos contadores da thread atual."""
+    contadores = _contadores_da_thread()
+    chave = (endpoint, metodo)
+    entrada = contadores.get(chave)
+    if entrada is None:
+        entrada = contadores[chave] = {'status': {}, 'baldes': [0] * (len(LIMITES_LATENCIA) + 1), 'soma': 0.0, 'bytes': 0}
+    entrada['status'][status] = entrada['status'].get(status, 0) + 1
+    entrada['baldes'][bisect.bisect_left(LIMITES_LATENCIA, segundos)] += 1
+    entrada['soma'] += segundos
+    entrada['bytes'] += tamanho
+
+
+class CorpoMedido:
+    """
+    Envolve o corpo de uma resposta em stream (send_file, CSV gerado) para
+    contar os bytes realmente enviados. Quando o servidor WSGI fecha o corpo
+    (fim do envio ou cliente que desligou), chama ao_fechar(bytes_enviados).
+    """
+
+    def __init__(self, corpo, ao_fechar):
+        self._corpo = corpo
+        self._ao_fechar = ao_fechar
+        self._fechado = False
+        self.bytes_enviados = 0
+
+    def __iter__(self):
+        for bloco in self._corpo:
+            if isinstance(bloco, str):
+                bloco = bloco.encode('utf-8')
+            self.bytes_enviados += len(bloco)
+            yield bloco
+
+    def close(self):
+        if self._fechado:
+            return
+        self._fechado = True
+        try:
+            fechar = getattr(self._corpo, 'close', None)
+            if fechar is not None:
+                fechar()
+        finally:
+            self._ao_fechar(self.bytes_enviados)
+
+
+def juntar_contadores():
+    """{(endpoint, metodo): entrada} com a soma dos contadores de todas as threads."""
+    with _lock_registo:
+        todos = list(_todos_contadores)
+    total = {}
+    for contadores in todos:
+        # list() copia de uma vez (sob o GIL) mesmo que a thread dona esteja a escrever
+        for chave, entrada in list(contadores.items()):
+            destino = total.setdefault(chave, {'status': {}, 'baldes': [0] * (len(LIMITES_LATENCIA) + 1), 'soma': 0.0, 'bytes': 0})
+            for status, n in list(entrada['status'].items()):
+                destino['status'][status] = destino['status'].get(status, 0) + n
+            for i, n in enumerate(list(entrada['baldes'])):
+                destino['baldes'][i] += n
+            destino['soma'] += entrada['soma']
+            destino['bytes'] += entrada['bytes']
+    return total
+
+
+def _etiquetas(**valores):
+    partes = []
+    for nome, valor in valores.items():
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{nome}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+def formatar_prometheus(medidores=None):
+    """Texto de exposição do Prometheus com os pedidos HTTP e as métricas extra ({nome: (tipo, ajuda, valor)})."""
+    processo = os.getpid()
+    total = juntar_contadores()
+    linhas = [
+        '# HELP estoque_http_pedidos_total Pedidos HTTP atendidos, por endpoint, método e status.',
+        '# TYPE estoque_http_pedidos_total counter',
+    ]
+    for (endpoint, metodo), entrada in sorted(total.items()):
+        for status, n in sorted(entrada['status'].items()):
+            linhas.append(f"estoque_http_pedidos_total{_etiquetas(endpoint=endpoint, metodo=metodo, status=status, processo=processo)} {n}")
+
+    linhas += [
+        '# HELP estoque_http_latencia_segundos Tempo de resposta dos pedidos HTTP.',
+        '# TYPE estoque_http_latencia_segundos histogram',
+    ]
+    for (endpoint, metodo), entrada in sorted(total.items()):
+        acumulado = 0
+        for limite, n in zip(LIMITES_LATENCIA + ('+Inf',), entrada['baldes']):
+            acumulado += n
+            etiquetas = _etiquetas(endpoint=endpoint, metodo=metodo, processo=processo, le=limite)
+            linhas.append(f"estoque_http_latencia_segundos_bucket{etiquetas} {acumulado}")
+        etiquetas = _etiquetas(endpoint=endpoint, metodo=metodo, processo=processo)
+        linhas.append(f"estoque_http_latencia_segundos_sum{etiquetas} {_numero(entrada['soma'])}")
+        linhas.append(f"estoque_http_latencia_segundos_count{etiquetas} {acumulado}")
+
+    linhas += [
+        '# HELP estoque_http_resposta_bytes_total Bytes enviados no corpo das respostas.',
+        '# TYPE estoque_http_resposta_bytes_total counter',
+    ]
+    for (endpoint, metodo), entrada in sorted(total.items()):
+        linhas.append(f"estoque_http_resposta_bytes_total{_etiquetas(endpoint=endpoint, metodo=metodo, processo=processo)} {entrada['bytes']}")
+
+    for nome, (tipo, ajuda, valor) in (medidores or {}).items():
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+        linhas.append(f"{nome}{_etiquetas(processo=processo)} {_numero(valor)}")
+    return '\n'.join(linhas) + '\n'
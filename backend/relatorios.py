@@ -0,0 +1,513 @@
+# ==============================================================================
+# GERAÇÃO DE RELATÓRIOS EM PDF E XLSX
+# ==============================================================================
+# Funções de desenho sem dependência do Flask ou do banco: recebem iteradores de
+# linhas já consultadas e escrevem o PDF página a página (ou a planilha linha a
+# linha).
+
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+from pypdf import PdfWriter
+from reportlab.graphics.barcode import createBarcodeDrawing
+from reportlab.graphics.shapes import Group, Rect
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas as pdf_canvas
+from reportlab.platypus import Table, TableStyle
+
+AZUL_TEMA = colors.Color(0.2, 0.4, 0.6)
+CINZA_SUBTOTAL = colors.Color(0.88, 0.9, 0.93)
+
+MARGEM = 30
+ALTURA_TITULO = 36
+ALTURA_RODAPE = 20
+ALTURA_LINHA = 14
+TAMANHO_FONTE = 8
+
+def formatar_moeda(valor):
+    """1234.5 -> '1.234,50'"""
+    return f"{valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+
+def _ajustar_texto(texto, largura, fonte='Helvetica', tamanho=TAMANHO_FONTE):
+    """Corta o texto com reticências para caber numa linha da coluna."""
+    texto = str(texto or '')
+    largura_util = largura - 6
+    largura_texto = stringWidth(texto, fonte, tamanho)
+    if largura_texto <= largura_util:
+        return texto
+    # Estimativa proporcional primeiro, para não medir o texto caractere a caractere
+    texto = texto[:int(len(texto) * largura_util / largura_texto) + 1]
+    while texto and stringWidth(texto + '…', fonte, tamanho) > largura_util:
+        texto = texto[:-1]
+    return texto + '…'
+
+def _quebrar_texto(texto, largura, fonte='Helvetica', tamanho=TAMANHO_FONTE):
+    """Divide o texto em linhas que cabem na coluna, quebrando entre palavras (ou dentro de palavras longas demais)."""
+    largura_util = largura - 6
+    linhas, atual = [], ''
+    for palavra in str(texto or '').split():
+        candidata = f"{atual} {palavra}" if atual else palavra
+        if stringWidth(candidata, fonte, tamanho) <= largura_util:
+            atual = candidata
+            continue
+        if atual:
+            linhas.append(atual)
+        atual = palavra
+        while stringWidth(atual, fonte, tamanho) > largura_util and len(atual) > 1:
+            corte = len(atual) - 1
+            while corte > 1 and stringWidth(atual[:corte], fonte, tamanho) > largura_util:
+                corte -= 1
+            linhas.append(atual[:corte])
+            atual = atual[corte:]
+    linhas.append(atual)
+    return linhas
+
+
+class RelatorioTabelaPDF:
+    """
+    Escreve uma tabela longa em PDF, uma página de cada vez.
+
+    Cada página é uma Table (flowable do reportlab) com altura de linha fixa,
+    desenhada direto no canvas e descartada em seguida; assim a memória não
+    cresce com o número de linhas e não há o custo de dividir uma Table enorme
+    entre páginas. As linhas são (celulas, tipo), onde tipo é 'item',
+    'continuacao' (texto quebrado do item anterior, sem linha a separá-los),
+    'subtotal' ou 'total'.
+    """
+
+    def __init__(self, destino, titulo, colunas, larguras, alinhamentos=None, pagesize=letter):
+        self.canvas = pdf_canvas.Canvas(destino, pagesize=pagesize, pageCompression=1)
+        self.canvas.setTitle(titulo)
+        self.titulo = titulo
+        self.colunas = colunas
+        self.larguras = larguras
+        self.alinhamentos = alinhamentos or ['LEFT'] * len(colunas)
+        self.largura_pagina, self.altura_pagina = pagesize
+        self.gerado_em = datetime.now().strftime('%d/%m/%Y %H:%M')
+        self.pagina = 0
+        self.linhas_por_pagina = linhas_por_pagina(pagesize)
+        self._buffer = []
+
+    def adicionar(self, celulas, tipo='item'):
+        self._buffer.append((celulas, tipo))
+        if len(self._buffer) >= self.linhas_por_pagina:
+            self._desenhar_pagina()
+
+    def fechar(self):
+        if self._buffer or self.pagina == 0:
+            self._desenhar_pagina()
+        self.canvas.save()
+
+    def _desenhar_pagina(self):
+        self.pagina += 1
+        c = self.canvas
+        topo = self.altura_pagina - MARGEM
+
+        c.setFont('Helvetica-Bold', 14)
+        c.drawString(MARGEM, topo - 16, self.titulo)
+        c.setFont('Helvetica', 8)
+        c.drawRightString(self.largura_pagina - MARGEM, topo - 16, f"Gerado em: {self.gerado_em}")
+
+        dados = [self.colunas]
+        estilo = [
+            ('BACKGROUND', (0, 0), (-1, 0), AZUL_TEMA),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), TAMANHO_FONTE),
+            ('LEADING', (0, 0), (-1, -1), TAMANHO_FONTE + 1),
+            ('TOPPADDING', (0, 0), (-1, -1), 2),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]
+        for indice, alinhamento in enumerate(self.alinhamentos):
+            estilo.append(('ALIGN', (indice, 0), (indice, -1), alinhamento))
+
+        for num, (celulas, tipo) in enumerate(self._buffer, start=1):
+            fonte = 'Helvetica' if tipo in ('item', 'continuacao') else 'Helvetica-Bold'
+            dados.append([_ajustar_texto(v, w, fonte) for v, w in zip(celulas, self.larguras)])
+            if tipo == 'continuacao':
+                if num > 1:
+                    estilo.append(('LINEABOVE', (0, num), (-1, num), 0.25, colors.white))
+            elif tipo != 'item':
+                estilo.append(('FONTNAME', (0, num), (-1, num), fonte))
+                estilo.append(('BACKGROUND', (0, num), (-1, num), AZUL_TEMA if tipo == 'total' else CINZA_SUBTOTAL))
+                if tipo == 'total':
+                    estilo.append(('TEXTCOLOR', (0, num), (-1, num), colors.whitesmoke))
+
+        tabela = Table(dados, colWidths=self.larguras, rowHeights=ALTURA_LINHA)
+        tabela.setStyle(TableStyle(estilo))
+        _, altura = tabela.wrapOn(c, self.largura_pagina - 2 * MARGEM, self.altura_pagina)
+        tabela.drawOn(c, MARGEM, topo - ALTURA_TITULO - altura)
+
+        c.setFont('Helvetica', 8)
+        c.drawCentredString(self.largura_pagina / 2, MARGEM - 10, f"Página {self.pagina}")
+        c.showPage()
+        self._buffer = []
+
+
+def linhas_por_pagina(pagesize=letter):
+    """Linhas de dados que cabem numa página do RelatorioTabelaPDF."""
+    area_util = pagesize[1] - 2 * MARGEM - ALTURA_TITULO - ALTURA_RODAPE
+    return int(area_util // ALTURA_LINHA) - 1  # -1 pelo cabeçalho
+
+
+def gerar_pdf_tabela(destino, titulo, colunas, larguras, alinhamentos, linhas):
+    """Escreve um RelatorioTabelaPDF a partir de um iterador de (celulas, tipo), página a página."""
+    relatorio = RelatorioTabelaPDF(destino, titulo, colunas, larguras, alinhamentos)
+    for celulas, tipo in linhas:
+        relatorio.adicionar(celulas, tipo)
+    relatorio.fechar()
+
+
+# --- Inventário ---
+
+COLUNAS_INVENTARIO = ['CÓDIGO', 'PRODUTO', 'SETOR', 'SALDO', 'PREÇO UNIT.', 'TOTAL (R$)']
+LARGURAS_INVENTARIO = [75, 200, 85, 45, 65, 82]
+ALINHAMENTOS_INVENTARIO = ['LEFT', 'LEFT', 'LEFT', 'RIGHT', 'RIGHT', 'RIGHT']
+
+def linhas_inventario(linhas):
+    """
+    Converte (setor_nome, codigo, nome, saldo, preco), já ordenado por setor,
+    em linhas (celulas, tipo) com subtotais por setor e o total geral.
+    """
+    setor_atual = None
+    qtd_setor = valor_setor = Decimal('0')
+    qtd_geral = valor_geral = Decimal('0')
+    produtos = 0
+
+    def fechar_setor():
+        return ['', f"Subtotal {setor_atual}", '', str(qtd_setor), '', formatar_moeda(valor_setor)], 'subtotal'
+
+    for setor_nome, codigo, nome, saldo, preco in linhas:
+        setor_nome = setor_nome or 'Sem Setor'
+        if setor_atual is not None and setor_nome != setor_atual:
+            yield fechar_setor()
+            qtd_setor = valor_setor = Decimal('0')
+        setor_atual = setor_nome
+
+        saldo = int(saldo or 0)
+        preco = Decimal(preco or 0)
+        total = saldo * preco
+        qtd_setor += saldo
+        valor_setor += total
+        qtd_geral += saldo
+        valor_geral += total
+        produtos += 1
+        yield [
+            (codigo or '').strip(), nome, setor_nome, str(saldo), formatar_moeda(preco), formatar_moeda(total)
+        ], 'item'
+
+    if setor_atual is not None:
+        yield fechar_setor()
+    yield ['', f"TOTAL GERAL ({produtos} produtos)", '', str(qtd_geral), '', formatar_moeda(valor_geral)], 'total'
+
+def gerar_pdf_inventario(destino, linhas, titulo="Inventário de Estoque"):
+    """
+    Escreve o inventário em PDF a partir de um iterador de
+    (setor_nome, codigo, nome, saldo, preco), já ordenado por setor.
+    """
+    gerar_pdf_tabela(destino, titulo, COLUNAS_INVENTARIO, LARGURAS_INVENTARIO, ALINHAMENTOS_INVENTARIO,
+                     linhas_inventario(linhas))
+
+
+# --- Relação de itens de um setor ---
+
+COLUNAS_SETOR = ['CÓDIGO', 'PRODUTO', 'SALDO ATUAL']
+LARGURAS_SETOR = [110, 342, 100]
+ALINHAMENTOS_SETOR = ['LEFT', 'LEFT', 'CENTER']
+
+def gerar_pdf_setor(destino, nome_setor, linhas):
+    """
+    Escreve a relação de itens do setor a partir de (codigo, nome, saldo), já
+    ordenado por nome. Nomes que não cabem na coluna continuam nas linhas seguintes.
+    """
+    def celulas():
+        vazio = True
+        for codigo, nome, saldo in linhas:
+            vazio = False
+            primeira, *resto = _quebrar_texto(nome, LARGURAS_SETOR[1])
+            yield [(codigo or '').strip(), primeira, str(int(saldo or 0))], 'item'
+            for continuacao in resto:
+                yield ['', continuacao, ''], 'continuacao'
+        if vazio:
+            yield ['', "Nenhum produto cadastrado neste setor.", ''], 'item'
+
+    gerar_pdf_tabela(destino, f"Relação de Itens - {nome_setor}", COLUNAS_SETOR, LARGURAS_SETOR, ALINHAMENTOS_SETOR,
+                     celulas())
+
+def nome_ficheiro_seguro(nome):
+    """Mantém só letras, dígitos, espaço, '_' e '-' (nome de setor usado como nome de ficheiro)."""
+    return "".join(c for c in nome if c.isalnum() or c in " _-").strip() or "setor"
+
+def gerar_relatorio_setores(destino, setores, formato='pdf'):
+    """
+    Escreve a relação de itens de vários setores de uma vez. 'setores' é uma
+    lista de (nome_setor, linhas), com linhas (codigo, nome, saldo) já
+    consultadas. Cada setor é renderizado num PDF próprio; com formato='zip'
+    o resultado é um ZIP com esses PDFs, com 'pdf' um único PDF com uma secção
+    (e um marcador) por setor.
+    """
+    pasta = tempfile.mkdtemp(prefix='estoque_setores_')
+    try:
+        partes = [os.path.join(pasta, f"{indice:04d}.pdf") for indice in range(len(setores))]
+        for parte, (nome_setor, linhas) in zip(partes, setores):
+            gerar_pdf_setor(parte, nome_setor, linhas)
+
+        if formato == 'zip':
+            with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED) as arquivo_zip:
+                usados = set()
+                for parte, (nome_setor, _) in zip(partes, setores):
+                    base = nome = f"Relacao_{nome_ficheiro_seguro(nome_setor)}"
+                    # O sufixo pode coincidir com o nome de outro setor: tenta até ficar único
+                    sufixo = 2
+                    while nome in usados:
+                        nome = f"{base}_{sufixo}"
+                        sufixo += 1
+                    usados.add(nome)
+                    arquivo_zip.write(parte, f"{nome}.pdf")
+        else:
+            escritor = PdfWriter()
+            for parte, (nome_setor, _) in zip(partes, setores):
+                escritor.append(parte, outline_item=nome_setor)
+            escritor.add_metadata({'/Title': "Relação de Itens por Setor"})
+            escritor.write(destino)
+    finally:
+        shutil.rmtree(pasta, ignore_errors=True)
+
+
+# --- Planilhas XLSX ---
+
+def gerar_xlsx(destino, colunas, linhas, titulo='Relatório', larguras=None, com_tipo=False):
+    """
+    Escreve uma planilha com o openpyxl em modo write_only: cada linha do
+    iterador vai direto para o XML temporário da folha e não fica em memória.
+    Com com_tipo=True as linhas são (celulas, tipo), como no RelatorioTabelaPDF,
+    e as de subtotal/total saem a negrito. Devolve o número de linhas escritas.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(titulo[:31])  # limite do Excel para nomes de folha
+    # Em modo write_only larguras e painéis congelados têm de vir antes da primeira linha
+    for indice, largura in enumerate(larguras or [], start=1):
+        ws.column_dimensions[get_column_letter(indice)].width = largura
+    ws.freeze_panes = 'A2'
+
+    negrito = Font(bold=True)
+    cabecalho = []
+    for nome in colunas:
+        celula = WriteOnlyCell(ws, value=nome)
+        celula.font = negrito
+        cabecalho.append(celula)
+    ws.append(cabecalho)
+
+    total = 0
+    for linha in linhas:
+        if com_tipo:
+            linha, tipo = linha
+            if tipo != 'item':
+                linha = [WriteOnlyCell(ws, value=valor) for valor in linha]
+                for celula in linha:
+                    celula.font = negrito
+        ws.append(linha)
+        total += 1
+    wb.save(destino)
+    return total
+
+
+# --- Histórico de movimentações ---
+
+COLUNAS_MOVIMENTACOES = ['DATA/HORA', 'CÓDIGO', 'PRODUTO', 'ENTRADA', 'SAÍDA', 'USUÁRIO', 'MOTIVO']
+LARGURAS_MOVIMENTACOES = [78, 60, 152, 45, 45, 70, 102]
+ALINHAMENTOS_MOVIMENTACOES = ['LEFT', 'LEFT', 'LEFT', 'RIGHT', 'RIGHT', 'LEFT', 'LEFT']
+
+def agrupar_movimentacoes(linhas):
+    """
+    Recebe (data_hora, codigo, nome, tipo, quantidade, usuario, motivo) em ordem
+    cronológica e produz (celulas, tipo_linha): as movimentações de cada dia
+    agrupadas por produto, com subtotal do produto (quando tem mais de uma
+    movimentação no dia), subtotal do dia e total geral no fim.
+
+    Só as movimentações de um dia ficam em memória de cada vez, por isso o
+    custo cresce de forma linear com o período exportado.
+    """
+    total_entradas = total_saidas = total_movs = 0
+    dia_atual = None
+    por_produto = {}
+
+    def fechar_dia():
+        entradas_dia = saidas_dia = 0
+        for codigo in sorted(por_produto):
+            movs = por_produto[codigo]
+            entradas = saidas = 0
+            for data_hora, nome, tipo, quantidade, usuario, motivo in movs:
+                if tipo == 'Entrada':
+                    entradas += quantidade
+                    yield [data_hora, codigo, nome, quantidade, None, usuario, motivo], 'item'
+                else:
+                    saidas += quantidade
+                    yield [data_hora, codigo, nome, None, quantidade, usuario, motivo], 'item'
+            if len(movs) > 1:
+                yield [None, codigo, f"Subtotal {movs[0][1]}", entradas, saidas, None, None], 'subtotal'
+            entradas_dia += entradas
+            saidas_dia += saidas
+        yield [None, None, f"Total do dia {dia_atual.strftime('%d/%m/%Y')}", entradas_dia, saidas_dia, None, None], 'subtotal'
+
+    for data_hora, codigo, nome, tipo, quantidade, usuario, motivo in linhas:
+        if data_hora.date() != dia_atual:
+            if dia_atual is not None:
+                yield from fechar_dia()
+            dia_atual = data_hora.date()
+            por_produto = {}
+        por_produto.setdefault((codigo or '').strip(), []).append((data_hora, nome, tipo, quantidade, usuario, motivo))
+        total_movs += 1
+        if tipo == 'Entrada':
+            total_entradas += quantidade
+        else:
+            total_saidas += quantidade
+
+    if dia_atual is not None:
+        yield from fechar_dia()
+    yield [None, None, f"TOTAL GERAL ({total_movs} movimentações)", total_entradas, total_saidas, None, None], 'total'
+
+def gerar_pdf_movimentacoes(destino, linhas, titulo="Histórico de Movimentações"):
+    """Escreve o histórico em PDF a partir das linhas de agrupar_movimentacoes."""
+    texto = (
+        ([valor.strftime('%d/%m/%Y %H:%M') if isinstance(valor, datetime) else ('' if valor is None else str(valor))
+          for valor in celulas], tipo)
+        for celulas, tipo in linhas
+    )
+    gerar_pdf_tabela(destino, titulo, COLUNAS_MOVIMENTACOES, LARGURAS_MOVIMENTACOES, ALINHAMENTOS_MOVIMENTACOES,
+                     texto)
+
+
+# --- Etiquetas com código de barras ---
+
+# Medidas em mm. Rolos de impressora térmica têm uma etiqueta por página; as
+# folhas adesivas são uma grelha de colunas x linhas a partir das margens.
+FORMATOS_ETIQUETA = {
+    'rolo_62x29': {
+        'descricao': 'Rolo 62 x 29 mm (impressora térmica)',
+        'pagina': (62, 29), 'etiqueta': (62, 29), 'colunas': 1, 'linhas': 1, 'margens': (0, 0), 'espacos': (0, 0),
+    },
+    'rolo_62x100': {
+        'descricao': 'Rolo 62 x 100 mm (impressora térmica)',
+        'pagina': (62, 100), 'etiqueta': (62, 100), 'colunas': 1, 'linhas': 1, 'margens': (0, 0), 'espacos': (0, 0),
+    },
+    'a4_3x8': {
+        'descricao': 'Folha A4, 3 x 8 etiquetas de 70 x 37 mm',
+        'pagina': (210, 297), 'etiqueta': (70, 37), 'colunas': 3, 'linhas': 8, 'margens': (0, 0.5), 'espacos': (0, 0),
+    },
+    'carta_3x10': {
+        'descricao': 'Folha Carta, 3 x 10 etiquetas de 66,7 x 25,4 mm',
+        'pagina': (215.9, 279.4), 'etiqueta': (66.7, 25.4), 'colunas': 3, 'linhas': 10, 'margens': (4.8, 12.7), 'espacos': (3.2, 0),
+    },
+}
+FORMATO_ETIQUETA_PADRAO = os.environ.get('ESTOQUE_FORMATO_ETIQUETA', 'rolo_62x29')
+
+MARGEM_ETIQUETA = 2 * mm
+LARGURA_MODULO_MAX = 1.5  # pontos por módulo do Code128 (~0,5 mm)
+ALTURA_BARRAS_MAX = 15 * mm
+
+
+def _retangulos(no):
+    if isinstance(no, Group):
+        for filho in no.contents:
+            yield from _retangulos(filho)
+    elif isinstance(no, Rect):
+        yield no
+
+
+@lru_cache(maxsize=20000)
+def barras_code128(codigo):
+    """
+    Geometria do Code128 de 'codigo' em módulos: ((x, largura), ...) e a
+    largura total, ou None se o código tiver caracteres que o Code128 não
+    codifica. Memoizado por código: reimprimir etiquetas não volta a codificar.
+    """
+    if not codigo:
+        return None
+    try:
+        desenho = createBarcodeDrawing('Code128', value=codigo, barWidth=1, barHeight=1,
+                                       quiet=False, humanReadable=False)
+    except ValueError:
+        return None
+    # O primeiro retângulo é o fundo (sem preenchimento); os restantes são as barras
+    barras = tuple((r.x, r.width) for r in _retangulos(desenho.expandUserNodes()) if r.fillColor is not None)
+    return barras, desenho.width
+
+def codigos_sem_barras(codigos):
+    """Códigos (sem repetição, pela ordem dada) que o Code128 não codifica: as etiquetas saem sem barras."""
+    return [codigo for codigo in dict.fromkeys((c or '').strip() for c in codigos) if codigo and barras_code128(codigo) is None]
+
+def _desenhar_etiqueta(c, x, y, largura, altura, codigo, nome, preco):
+    fonte = max(6, min(10, altura / mm * 0.28))
+    esquerda, direita = x + MARGEM_ETIQUETA, x + largura - MARGEM_ETIQUETA
+    largura_util = direita - esquerda
+
+    linha_nome = y + altura - MARGEM_ETIQUETA - fonte
+    c.setFont('Helvetica-Bold', fonte)
+    c.drawString(esquerda, linha_nome, _ajustar_texto(nome, largura_util + 6, 'Helvetica-Bold', fonte))
+
+    linha_preco = linha_nome - fonte * 1.4
+    c.setFont('Helvetica-Bold', fonte * 1.3)
+    c.drawRightString(direita, linha_preco, f"R$ {formatar_moeda(preco)}")
+
+    linha_codigo = y + MARGEM_ETIQUETA
+    c.setFont('Helvetica', fonte * 0.9)
+    c.drawCentredString(x + largura / 2, linha_codigo, codigo)
+
+    geometria = barras_code128(codigo)
+    if geometria is None:
+        return
+    barras, modulos = geometria
+    base = linha_codigo + fonte * 0.9 + 1 * mm
+    altura_barras = min(linha_preco - 1.5 * mm - base, ALTURA_BARRAS_MAX)
+    escala = min(largura_util / modulos, LARGURA_MODULO_MAX)
+    inicio = x + (largura - modulos * escala) / 2
+    # Um único caminho por etiqueta em vez de um retângulo por barra
+    caminho = c.beginPath()
+    for bx, bl in barras:
+        caminho.rect(inicio + bx * escala, base, bl * escala, altura_barras)
+    c.drawPath(caminho, stroke=0, fill=1)
+
+def gerar_pdf_etiquetas(destino, produtos, formato=FORMATO_ETIQUETA_PADRAO):
+    """
+    Escreve uma etiqueta Code128 (código, nome e preço) por item de 'produtos',
+    um iterador de (codigo, nome, preco), no formato de FORMATOS_ETIQUETA
+    indicado.
+    """
+    if formato not in FORMATOS_ETIQUETA:
+        raise ValueError(f"Formato de etiqueta desconhecido: {formato}")
+    f = FORMATOS_ETIQUETA[formato]
+    largura_pagina, altura_pagina = f['pagina'][0] * mm, f['pagina'][1] * mm
+    largura, altura = f['etiqueta'][0] * mm, f['etiqueta'][1] * mm
+    margem_x, margem_y = f['margens'][0] * mm, f['margens'][1] * mm
+    espaco_x, espaco_y = f['espacos'][0] * mm, f['espacos'][1] * mm
+    por_pagina = f['colunas'] * f['linhas']
+
+    c = pdf_canvas.Canvas(destino, pagesize=(largura_pagina, altura_pagina), pageCompression=1)
+    c.setTitle("Etiquetas")
+    total = 0
+    for codigo, nome, preco in produtos:
+        posicao = total % por_pagina
+        if total and posicao == 0:
+            c.showPage()
+        linha, coluna = divmod(posicao, f['colunas'])
+        x = margem_x + coluna * (largura + espaco_x)
+        y = altura_pagina - margem_y - (linha + 1) * altura - linha * espaco_y
+        _desenhar_etiqueta(c, x, y, largura, altura, (codigo or '').strip(), nome or '', Decimal(preco or 0))
+        total += 1
+    c.showPage()
+    c.save()
@@ -0,0 +1,514 @@
+# ==============================================================================
+# ROTAS DE CADASTROS (PRODUTOS, SETORES, FORNECEDORES E NATUREZAS)
+# ==============================================================================
+# Blueprint registado por app.criar_app(); os modelos e helpers vêm de app.
+from flask import Blueprint, jsonify, request, Response, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql import func
+import io
+import consultas_sql
+from app import (
+    db, Produto, Setor, Fornecedor, Natureza, MovimentacaoEstoque, produto_fornecedor, produto_natureza,
+    calcular_saldo_produto, subquery_saldos, ajustar_indicadores, reconciliar_indicadores,
+    TAMANHO_LOTE_IMPORTACAO, importar_produtos_novos, importar_produtos_upsert
+)
+
+blueprint = Blueprint('cadastros', __name__)
+
+# --- ROTAS DE PRODUTOS ---
+
+@blueprint.route('/api/produtos', methods=['GET'])
+@jwt_required()
+@consultas_sql.orcamento_consultas(5)
+def get_todos_produtos():
+    try:
+        termo_busca = request.args.get('search')
+        query = Produto.query
+        if termo_busca:
+            query = query.filter(
+                or_(
+                    Produto.nome.ilike(f"%{termo_busca}%"),
+                    Produto.codigo.ilike(f"%{termo_busca}%"),
+                    Produto.codigoB.ilike(f"%{termo_busca}%"),
+                    Produto.codigoC.ilike(f"%{termo_busca}%")
+                )
+            )
+        
+        # Otimização: carregar setor junto
+        produtos_db = query.options(joinedload(Produto.setor)).all()
+        
+        if not produtos_db:
+            return jsonify([]), 200
+
+        # Montagem Manual para Performance
+        product_ids = [p.id_produto for p in produtos_db]
+        
+        fornecedores_map = {f.id_fornecedor: f.nome for f in Fornecedor.query.all()}
+        naturezas_map = {n.id_natureza: n.nome for n in Natureza.query.all()}
+        
+        prod_forn_assoc = db.session.query(produto_fornecedor).filter(produto_fornecedor.c.FK_PRODUTO_Id_produto.in_(product_ids)).all()
+        prod_nat_assoc = db.session.query(produto_natureza).filter(produto_natureza.c.fk_PRODUTO_Id_produto.in_(product_ids)).all()
+
+        produto_fornecedores = {}
+        for p_id, f_id in prod_forn_assoc:
+            if p_id not in produto_fornecedores: produto_fornecedores[p_id] = []
+            produto_fornecedores[p_id].append(fornecedores_map.get(f_id, ''))
+
+        produto_naturezas = {}
+        for p_id, n_id in prod_nat_assoc:
+            if p_id not in produto_naturezas: produto_naturezas[p_id] = []
+            produto_naturezas[p_id].append(naturezas_map.get(n_id, ''))
+
+        produtos_json = []
+        for produto in produtos_db:
+            fornecedores_list = produto_fornecedores.get(produto.id_produto, [])
+            naturezas_list = produto_naturezas.get(produto.id_produto, [])
+            
+            produtos_json.append({
+                'id': produto.id_produto,
+                'nome': produto.nome,
+                'codigo': produto.codigo.strip() if produto.codigo else '',
+                'descricao': produto.descricao,
+                'preco': str(produto.preco),
+                'codigoB': produto.codigoB,
+                'codigoC': produto.codigoC,
+                'fornecedores': ", ".join(sorted(fornecedores_list)),
+                'naturezas': ", ".join(sorted(naturezas_list)),
+                'setor_nome': produto.setor.nome if produto.setor else '',
+                'id_setor': produto.id_setor
+            })
+            
+        return jsonify(produtos_json), 200
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+def preco_do_pedido(valor):
+    """Preço vindo do JSON ('12,50', '12.50', 12.5) como Decimal; None ou '' dão None. Levanta ValueError se for inválido."""
+    if valor is None or (isinstance(valor, str) and not valor.strip()):
+        return None
+    try:
+        preco = Decimal(str(valor).strip().replace(',', '.'))
+    except InvalidOperation:
+        raise ValueError(f"Preço inválido '{valor}'.")
+    if not preco.is_finite():
+        raise ValueError(f"Preço inválido '{valor}'.")
+    return preco
+
+@blueprint.route('/api/produtos', methods=['POST'])
+@jwt_required()
+def add_novo_produto():
+    try:
+        dados = request.get_json()
+        required_fields = ['nome', 'codigo']
+        if not all(field in dados and dados[field] for field in required_fields):
+            return jsonify({'erro': 'Campos obrigatórios (nome, codigo) não podem estar vazios.'}), 400
+
+        novo_produto = Produto(
+            nome=dados['nome'],
+            codigo=dados['codigo'],
+            descricao=dados.get('descricao'),
+            preco=dados.get('preco', '0.00').replace(',', '.'), 
+            codigoB=dados.get('codigoB'),
+            codigoC=dados.get('codigoC'),
+            id_setor=dados.get('id_setor')
+        )
+        db.session.add(novo_produto)
+        ajustar_indicadores(total_produtos=1)
+        db.session.commit()
+        
+        return jsonify({
+            'mensagem': 'Produto adicionado com sucesso!',
+            'id_produto_criado': novo_produto.id_produto
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/produtos/<int:id_produto>', methods=['GET', 'PUT', 'DELETE'])
+@jwt_required()
+def produto_por_id_endpoint(id_produto):
+    try:
+        produto = Produto.query.get_or_404(id_produto)
+
+        if request.method == 'GET':
+            produto_json = {
+                'id': produto.id_produto, 
+                'nome': produto.nome,
+                'codigo': produto.codigo.strip() if produto.codigo else '',
+                'descricao': produto.descricao, 
+                'preco': str(produto.preco),
+                'codigoB': produto.codigoB, 
+                'codigoC': produto.codigoC,
+                'id_setor': produto.id_setor,
+                'setor_nome': produto.setor.nome if produto.setor else '',
+                'fornecedores': [{'id': f.id_fornecedor, 'nome': f.nome} for f in produto.fornecedores],
+                'naturezas': [{'id': n.id_natureza, 'nome': n.nome} for n in produto.naturezas]
+            }
+            return jsonify(produto_json), 200
+        
+        elif request.method == 'PUT':
+            dados = request.get_json()
+            try:
+                novo_preco = preco_do_pedido(dados.get('preco'))
+            except ValueError as e:
+                return jsonify({'erro': str(e)}), 400
+            if (novo_preco or 0) != (produto.preco or 0):
+                ajustar_indicadores(valor_total_estoque=calcular_saldo_produto(id_produto) * ((novo_preco or 0) - (produto.preco or 0)))
+            produto.nome = dados['nome']
+            produto.codigo = dados['codigo']
+            produto.descricao = dados.get('descricao')
+            produto.preco = novo_preco
+            produto.codigoB = dados.get('codigoB')
+            produto.codigoC = dados.get('codigoC')
+            produto.id_setor = dados.get('id_setor')
+
+            if 'fornecedores_ids' in dados:
+                produto.fornecedores.clear()
+                if dados['fornecedores_ids']:
+                    produto.fornecedores = Fornecedor.query.filter(Fornecedor.id_fornecedor.in_(dados['fornecedores_ids'])).all()
+
+            if 'naturezas_ids' in dados:
+                produto.naturezas.clear()
+                if dados['naturezas_ids']:
+                    produto.naturezas = Natureza.query.filter(Natureza.id_natureza.in_(dados['naturezas_ids'])).all()
+
+            db.session.commit()
+
+            updated_product = Produto.query.options(
+                joinedload(Produto.fornecedores),
+                joinedload(Produto.naturezas),
+                joinedload(Produto.setor)
+            ).get(id_produto)
+
+            fornecedores_str = ", ".join(sorted([f.nome for f in updated_product.fornecedores]))
+            naturezas_str = ", ".join(sorted([n.nome for n in updated_product.naturezas]))
+
+            response_data = {
+                'id': updated_product.id_produto,
+                'nome': updated_product.nome,
+                'codigo': updated_product.codigo.strip() if updated_product.codigo else '',
+                'descricao': updated_product.descricao,
+                'preco': str(updated_product.preco),
+                'codigoB': updated_product.codigoB,
+                'codigoC': updated_product.codigoC,
+                'fornecedores': fornecedores_str,
+                'naturezas': naturezas_str,
+                'setor_nome': updated_product.setor.nome if updated_product.setor else '',
+                'id_setor': updated_product.id_setor
+            }
+            return jsonify(response_data), 200
+        
+        elif request.method == 'DELETE':
+            movimentacao_existente = MovimentacaoEstoque.query.filter_by(id_produto=id_produto).first()
+            if movimentacao_existente:
+                return jsonify({'erro': 'Produto possui histórico de movimentações e não pode ser excluído.'}), 400
+
+            db.session.delete(produto)
+            ajustar_indicadores(total_produtos=-1)
+            db.session.commit()
+            return jsonify({'mensagem': 'Produto excluído com sucesso!'}), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/formularios/produto_data', methods=['GET'])
+@jwt_required()
+def get_form_produto_data():
+    try:
+        produto_id = request.args.get('produto_id', type=int)
+        
+        fornecedores_data = db.session.query(Fornecedor.id_fornecedor, Fornecedor.nome).order_by(Fornecedor.nome).all()
+        naturezas_data = db.session.query(Natureza.id_natureza, Natureza.nome).order_by(Natureza.nome).all()
+        
+        dados_produto = None
+        if produto_id:
+            produto = Produto.query.options(
+                joinedload(Produto.fornecedores),
+                joinedload(Produto.naturezas),
+                joinedload(Produto.setor)
+            ).get(produto_id)
+            
+            if produto:
+                dados_produto = {
+                    'id': produto.id_produto,
+                    'nome': produto.nome,
+                    'codigo': produto.codigo.strip() if produto.codigo else '',
+                    'descricao': produto.descricao,
+                    'preco': str(produto.preco),
+                    'codigoB': produto.codigoB,
+                    'codigoC': produto.codigoC,
+                    'id_setor': produto.id_setor,
+                    'fornecedores': [{'id': f.id_fornecedor} for f in produto.fornecedores],
+                    'naturezas': [{'id': n.id_natureza} for n in produto.naturezas]
+                }
+
+        response_data = {
+            'fornecedores': [{'id': id, 'nome': nome} for id, nome in fornecedores_data],
+            'naturezas': [{'id': id, 'nome': nome} for id, nome in naturezas_data],
+            'produto': dados_produto
+        }
+        return jsonify(response_data), 200
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/produtos/codigo/<string:codigo>', methods=['GET'])
+@jwt_required()
+@consultas_sql.orcamento_consultas(1)
+def get_produto_por_codigo(codigo):
+    try:
+        produto = Produto.query.filter_by(codigo=codigo.strip()).first()
+        if produto:
+            produto_json = {
+                'id': produto.id_produto,
+                'nome': produto.nome,
+                'codigo': produto.codigo.strip(),
+                'descricao': produto.descricao,
+                'preco': str(produto.preco)
+            }
+            return jsonify(produto_json), 200
+        else:
+            return jsonify({'erro': 'Produto não encontrado.'}), 404
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/produtos/importar', methods=['POST'])
+@jwt_required()
+def importar_produtos_csv():
+    if 'file' not in request.files:
+        return jsonify({'erro': 'Nenhum ficheiro enviado.'}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'erro': 'Nome de ficheiro vazio.'}), 400
+    # 'inserir' (padrão) rejeita códigos existentes; 'atualizar' faz upsert pelo código
+    modo = request.form.get('modo', 'inserir')
+    if modo not in ('inserir', 'atualizar'):
+        return jsonify({'erro': "Modo de importação inválido. Use 'inserir' ou 'atualizar'."}), 400
+
+    from importacao import ler_ficheiro_importacao
+
+    try:
+        registros, colunas_csv, erros = ler_ficheiro_importacao(file.stream.read())
+        id_usuario_logado = get_jwt_identity()
+
+        if modo == 'atualizar':
+            registros_por_codigo = {}
+            for registro in registros:
+                if registro['codigo'] in registros_por_codigo:
+                    erros.append(f"Linha {registro['linha']}: Código '{registro['codigo']}' repetido no ficheiro; mantida a última ocorrência.")
+                registros_por_codigo[registro['codigo']] = registro
+
+            inseridos, atualizados, inalterados = importar_produtos_upsert(
+                list(registros_por_codigo.values()), colunas_csv, id_usuario_logado, erros
+            )
+            db.session.commit()
+            # Importação em lote (pode mudar preços e saldos): recalcula em vez de somar deltas
+            reconciliar_indicadores(registrar_desvio=False)
+            return jsonify({
+                'mensagem': 'Importação concluída!',
+                'produtos_importados': inseridos + atualizados,
+                'produtos_inseridos': inseridos,
+                'produtos_atualizados': atualizados,
+                'produtos_inalterados': inalterados,
+                'erros': erros
+            }), 200
+
+        sucesso_count = importar_produtos_novos(registros, id_usuario_logado, erros)
+        db.session.commit()
+        reconciliar_indicadores(registrar_desvio=False)
+        return jsonify({'mensagem': 'Importação concluída!', 'produtos_importados': sucesso_count, 'erros': erros}), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/produtos/exportar', methods=['GET'])
+@jwt_required()
+def exportar_produtos():
+    """
+    Exporta o catálogo completo no mesmo formato do CSV de importação (a coluna
+    'quantidade' leva o saldo atual). As linhas vêm de um cursor do lado do servidor
+    e são escritas em blocos, por isso a memória não cresce com o tamanho do catálogo.
+    """
+    formato = request.args.get('formato', 'csv')
+    if formato != 'csv':
+        return jsonify({'erro': "Formato não suportado. Use 'csv'."}), 400
+    import csv
+    from importacao import COLUNAS_CSV_PRODUTOS, SEPARADOR_AGREGACAO, formatar_lista_nomes
+
+    saldos = subquery_saldos()
+
+    fornecedores = db.session.query(
+        produto_fornecedor.c.FK_PRODUTO_Id_produto.label('id_produto'),
+        func.aggregate_strings(Fornecedor.nome, SEPARADOR_AGREGACAO).label('nomes')
+    ).join(Fornecedor, Fornecedor.id_fornecedor == produto_fornecedor.c.FK_FORNECEDOR_id_fornecedor
+    ).group_by(produto_fornecedor.c.FK_PRODUTO_Id_produto).subquery()
+
+    naturezas = db.session.query(
+        produto_natureza.c.fk_PRODUTO_Id_produto.label('id_produto'),
+        func.aggregate_strings(Natureza.nome, SEPARADOR_AGREGACAO).label('nomes')
+    ).join(Natureza, Natureza.id_natureza == produto_natureza.c.fk_NATUREZA_id_natureza
+    ).group_by(produto_natureza.c.fk_PRODUTO_Id_produto).subquery()
+
+    consulta = db.select(
+        Produto.codigo, Produto.nome, Produto.descricao, Produto.preco,
+        func.coalesce(saldos.c.saldo, 0), Produto.codigoB, Produto.codigoC,
+        Setor.nome, fornecedores.c.nomes, naturezas.c.nomes
+    ).outerjoin(saldos, saldos.c.id_produto == Produto.id_produto
+    ).outerjoin(Setor, Setor.id_setor == Produto.id_setor
+    ).outerjoin(fornecedores, fornecedores.c.id_produto == Produto.id_produto
+    ).outerjoin(naturezas, naturezas.c.id_produto == Produto.id_produto
+    ).order_by(Produto.codigo)
+
+    engine = db.engine
+
+    def lista(nomes):
+        # Os nomes chegam juntos pelo separador da agregação; no CSV vão separados por vírgulas
+        return formatar_lista_nomes(nomes.split(SEPARADOR_AGREGACAO)) if nomes else ''
+
+    def gerar_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, delimiter=';', lineterminator='\n')
+        # BOM para o Excel reconhecer UTF-8; a importação ignora-o
+        buffer.write('\ufeff')
+        writer.writerow(COLUNAS_CSV_PRODUTOS)
+        with engine.connect() as conn:
+            if conn.dialect.name == 'mysql':
+                # O GROUP_CONCAT corta o resultado em 1024 caracteres por omissão
+                conn.exec_driver_sql('SET SESSION group_concat_max_len = 16777216')
+            resultado = conn.execution_options(stream_results=True, yield_per=TAMANHO_LOTE_IMPORTACAO).execute(consulta)
+            for bloco in resultado.partitions():
+                for codigo, nome, descricao, preco, saldo, codigo_b, codigo_c, setor, forn, nat in bloco:
+                    writer.writerow([
+                        codigo.strip() if codigo else '', nome, descricao or '',
+                        preco if preco is not None else '0.00', int(saldo),
+                        codigo_b or '', codigo_c or '', setor or '', lista(forn), lista(nat)
+                    ])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    return Response(
+        stream_with_context(gerar_csv()),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=produtos.csv'}
+    )
+
+# --- ROTAS DE SETORES (NOVO) ---
+
+@blueprint.route('/api/setores', methods=['GET'])
+@jwt_required()
+def get_todos_setores():
+    try:
+        setores = Setor.query.order_by(Setor.nome).all()
+        return jsonify([{'id': s.id_setor, 'nome': s.nome} for s in setores]), 200
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/setores', methods=['POST'])
+@jwt_required()
+def add_novo_setor():
+    try:
+        dados = request.get_json()
+        if 'nome' not in dados or not dados['nome'].strip():
+            return jsonify({'erro': 'Nome do setor obrigatório.'}), 400
+        novo = Setor(nome=dados['nome'])
+        db.session.add(novo)
+        db.session.commit()
+        return jsonify({'mensagem': 'Setor criado!'}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/setores/<int:id_setor>', methods=['GET', 'PUT', 'DELETE'])
+@jwt_required()
+def gerenciar_setor(id_setor):
+    try:
+        setor = Setor.query.get_or_404(id_setor)
+        
+        if request.method == 'GET':
+            return jsonify({'id': setor.id_setor, 'nome': setor.nome}), 200
+            
+        if request.method == 'PUT':
+            dados = request.get_json()
+            setor.nome = dados['nome']
+            db.session.commit()
+            return jsonify({'mensagem': 'Atualizado!'}), 200
+            
+        if request.method == 'DELETE':
+            if setor.produtos:
+                return jsonify({'erro': 'Setor em uso por produtos.'}), 400
+            db.session.delete(setor)
+            db.session.commit()
+            return jsonify({'mensagem': 'Removido!'}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+
+# --- ROTAS DE FORNECEDORES E NATUREZAS ---
+
+@blueprint.route('/api/fornecedores', methods=['GET'])
+@jwt_required()
+def get_todos_fornecedores():
+    f = Fornecedor.query.order_by(Fornecedor.nome).all()
+    return jsonify([{'id': i.id_fornecedor, 'nome': i.nome} for i in f]), 200
+
+@blueprint.route('/api/fornecedores', methods=['POST'])
+@jwt_required()
+def add_novo_fornecedor():
+    d = request.get_json()
+    db.session.add(Fornecedor(nome=d['nome']))
+    ajustar_indicadores(total_fornecedores=1)
+    db.session.commit()
+    return jsonify({'mensagem': 'Criado!'}), 201
+
+@blueprint.route('/api/fornecedores/<int:id>', methods=['GET', 'PUT', 'DELETE'])
+@jwt_required()
+def gerenciar_fornecedor(id):
+    obj = Fornecedor.query.get_or_404(id)
+    if request.method == 'GET': return jsonify({'id': obj.id_fornecedor, 'nome': obj.nome})
+    if request.method == 'PUT':
+        obj.nome = request.get_json()['nome']
+        db.session.commit()
+        return jsonify({'mensagem': 'Atualizado'})
+    if request.method == 'DELETE':
+        if obj.produtos: return jsonify({'erro': 'Em uso'}), 400
+        db.session.delete(obj)
+        ajustar_indicadores(total_fornecedores=-1)
+        db.session.commit()
+        return jsonify({'mensagem': 'Deletado'})
+
+@blueprint.route('/api/naturezas', methods=['GET'])
+@jwt_required()
+def get_todas_naturezas():
+    n = Natureza.query.order_by(Natureza.nome).all()
+    return jsonify([{'id': i.id_natureza, 'nome': i.nome} for i in n]), 200
+
+@blueprint.route('/api/naturezas', methods=['POST'])
+@jwt_required()
+def add_nova_natureza():
+    d = request.get_json()
+    db.session.add(Natureza(nome=d['nome']))
+    db.session.commit()
+    return jsonify({'mensagem': 'Criado!'}), 201
+
+@blueprint.route('/api/naturezas/<int:id>', methods=['GET', 'PUT', 'DELETE'])
+@jwt_required()
+def gerenciar_natureza(id):
+    obj = Natureza.query.get_or_404(id)
+    if request.method == 'GET': return jsonify({'id': obj.id_natureza, 'nome': obj.nome})
+    if request.method == 'PUT':
+        obj.nome = request.get_json()['nome']
+        db.session.commit()
+        return jsonify({'mensagem': 'Atualizado'})
+    if request.method == 'DELETE':
+        if obj.produtos: return jsonify({'erro': 'Em uso'}), 400
+        db.session.delete(obj)
+        db.session.commit()
+        return jsonify({'mensagem': 'Deletado'})
@@ -0,0 +1,297 @@
+# ==============================================================================
+# ROTAS DO DASHBOARD E DAS ANÁLISES
+# ==============================================================================
+# Blueprint registado por app.criar_app(); os modelos e helpers vêm de app.
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from datetime import datetime, timedelta, date
+from decimal import Decimal
+from sqlalchemy import case
+from sqlalchemy.sql import func
+import consultas_sql
+from app import (
+    db, Produto, MovimentoDiario, Indicador, INDICADORES, HISTORICO_MOV_DIARIO,
+    consulta_em_cache, reconciliar_indicadores
+)
+
+blueprint = Blueprint('dashboard', __name__)
+
+# --- DASHBOARD ---
+
+@blueprint.route('/api/dashboard/kpis', methods=['GET'])
+@jwt_required()
+@consultas_sql.orcamento_consultas(9)
+def get_dashboard_kpis():
+    try:
+        valores = dict(db.session.query(Indicador.nome, Indicador.valor).filter(Indicador.nome.in_(INDICADORES)))
+        if len(valores) < len(INDICADORES):
+            # Banco ainda sem os indicadores (inicializar_banco não correu): calcula uma vez e grava
+            reconciliar_indicadores()
+            valores = dict(db.session.query(Indicador.nome, Indicador.valor).filter(Indicador.nome.in_(INDICADORES)))
+        return jsonify({
+            'total_produtos': int(valores['total_produtos']),
+            'total_fornecedores': int(valores['total_fornecedores']),
+            'valor_total_estoque': float(valores['valor_total_estoque'])
+        }), 200
+    except Exception as e: return jsonify({'erro': str(e)}), 500
+
+MAX_DIAS_TENDENCIAS = 730
+
+def calcular_tendencias(dias, hoje):
+    """Entradas, saídas e valor do estoque por dia nos últimos 'dias' dias, a partir de mov_diario.
+
+    O valor de cada dia é reconstruído para trás a partir do valor atual,
+    desfazendo o saldo (em R$, a preços atuais) dos dias seguintes.
+    """
+    inicio = hoje - timedelta(days=dias - 1)
+    sinal = case((MovimentoDiario.tipo == 'Entrada', 1), else_=-1)
+    por_dia = db.session.execute(
+        db.select(
+            MovimentoDiario.dia,
+            func.sum(case((MovimentoDiario.tipo == 'Entrada', MovimentoDiario.quantidade), else_=0)),
+            func.sum(case((MovimentoDiario.tipo == 'Saida', MovimentoDiario.quantidade), else_=0)),
+            func.sum(sinal * MovimentoDiario.quantidade * func.coalesce(Produto.preco, 0)),
+        )
+        .join(Produto, Produto.id_produto == MovimentoDiario.id_produto)
+        .where(MovimentoDiario.dia >= inicio)
+        .group_by(MovimentoDiario.dia)
+    ).all()
+    totais = {}
+    for dia, entradas, saidas, variacao in por_dia:
+        if isinstance(dia, str):  # SQLite devolve a data como texto em consultas agregadas
+            dia = date.fromisoformat(dia)
+        totais[dia] = (int(entradas or 0), int(saidas or 0), Decimal(variacao or 0))
+
+    valor = Decimal(db.session.query(Indicador.valor).filter(Indicador.nome == 'valor_total_estoque').scalar() or 0)
+    # Movimentos com data futura (relógio de outro posto adiantado) já estão no valor atual
+    valor -= sum((v for d, (_, _, v) in totais.items() if d > hoje), Decimal(0))
+    serie = []
+    for i in range(dias):
+        dia = hoje - timedelta(days=i)
+        entradas, saidas, variacao = totais.get(dia, (0, 0, Decimal(0)))
+        serie.append({'data': dia.isoformat(), 'entradas': entradas, 'saidas': saidas, 'valor_estoque': float(valor)})
+        valor -= variacao
+    serie.reverse()
+    return serie
+
+@blueprint.route('/api/dashboard/tendencias', methods=['GET'])
+@jwt_required()
+@consultas_sql.orcamento_consultas(3)
+def get_dashboard_tendencias():
+    try:
+        dias = int(request.args.get('dias', 30))
+    except ValueError:
+        return jsonify({'erro': "Parâmetro 'dias' inválido."}), 400
+    if not 1 <= dias <= MAX_DIAS_TENDENCIAS:
+        return jsonify({'erro': f"'dias' deve estar entre 1 e {MAX_DIAS_TENDENCIAS}."}), 400
+    try:
+        hoje = date.today()
+        serie = consulta_em_cache(
+            'tendencias', (dias, hoje), ('mov_diario', 'produto', 'indicador'),
+            lambda: calcular_tendencias(dias, hoje)
+        )
+        return jsonify({'dias': dias, 'serie': serie}), 200
+    except Exception as e: return jsonify({'erro': str(e)}), 500
+
+# --- ANÁLISES ---
+
+DIAS_PERIODO_ANALISE_PADRAO = 90
+
+def periodo_analise(args):
+    """(data_inicio, data_fim) como date; por omissão os últimos DIAS_PERIODO_ANALISE_PADRAO dias. Levanta ValueError."""
+    data_fim = datetime.strptime(args['data_fim'], '%Y-%m-%d').date() if args.get('data_fim') else date.today()
+    if args.get('data_inicio'):
+        data_inicio = datetime.strptime(args['data_inicio'], '%Y-%m-%d').date()
+    else:
+        data_inicio = data_fim - timedelta(days=DIAS_PERIODO_ANALISE_PADRAO - 1)
+    if data_inicio > data_fim:
+        raise ValueError("data_inicio posterior a data_fim.")
+    return data_inicio, data_fim
+
+def calcular_curva_abc(data_inicio, data_fim, limite_a, limite_b):
+    import analise
+    saidas = db.select(
+        MovimentoDiario.id_produto, func.sum(MovimentoDiario.quantidade).label('quantidade')
+    ).where(
+        MovimentoDiario.tipo == 'Saida', MovimentoDiario.dia >= data_inicio, MovimentoDiario.dia <= data_fim
+    ).group_by(MovimentoDiario.id_produto).subquery()
+    # Uma consulta para o catálogo inteiro; produtos sem saídas entram com quantidade 0 (classe C)
+    linhas = db.session.execute(
+        db.select(Produto.id_produto, Produto.codigo, Produto.nome, func.coalesce(Produto.preco, 0), func.coalesce(saidas.c.quantidade, 0))
+        .outerjoin(saidas, saidas.c.id_produto == Produto.id_produto)
+        .order_by(Produto.codigo)
+    ).all()
+    if not linhas:
+        return []
+    ids, codigos, nomes, precos, quantidades = zip(*linhas)
+    ordem, valores, acumulado, classes = analise.classificar_abc(quantidades, [float(p) for p in precos], limite_a, limite_b)
+    return [
+        {
+            'id_produto': ids[i],
+            'codigo': (codigos[i] or '').strip(),
+            'nome': nomes[i],
+            'quantidade_saida': int(quantidades[i]),
+            'valor_saida': round(float(valor), 2),
+            'percentual_acumulado': round(float(pct) * 100, 2),
+            'classe': str(classe),
+        }
+        for i, valor, pct, classe in zip(ordem.tolist(), valores, acumulado, classes)
+    ]
+
+@blueprint.route('/api/analise/abc', methods=['GET'])
+@jwt_required()
+@consultas_sql.orcamento_consultas(2)
+def get_analise_abc():
+    """Curva ABC do catálogo pelo valor das saídas no período (do mais para o menos movimentado)."""
+    import analise
+    try:
+        data_inicio, data_fim = periodo_analise(request.args)
+        limite_a = float(request.args.get('limite_a', analise.LIMITE_CLASSE_A))
+        limite_b = float(request.args.get('limite_b', analise.LIMITE_CLASSE_B))
+        if not 0 < limite_a < limite_b <= 1:
+            raise ValueError("Os limites devem cumprir 0 < limite_a < limite_b <= 1.")
+    except ValueError as e:
+        return jsonify({'erro': f"Parâmetros inválidos: {e}"}), 400
+    try:
+        produtos = consulta_em_cache(
+            'abc', (data_inicio, data_fim, limite_a, limite_b), ('mov_diario', 'produto'),
+            lambda: calcular_curva_abc(data_inicio, data_fim, limite_a, limite_b)
+        )
+        resumo = {c: {'produtos': 0, 'valor_saida': 0.0} for c in 'ABC'}
+        for p in produtos:
+            resumo[p['classe']]['produtos'] += 1
+            resumo[p['classe']]['valor_saida'] += p['valor_saida']
+        for classe in resumo.values():
+            classe['valor_saida'] = round(classe['valor_saida'], 2)
+        return jsonify({
+            'data_inicio': data_inicio.isoformat(),
+            'data_fim': data_fim.isoformat(),
+            'limite_a': limite_a,
+            'limite_b': limite_b,
+            'resumo': resumo,
+            'produtos': produtos,
+        }), 200
+    except Exception as e: return jsonify({'erro': str(e)}), 500
+
+MAX_JANELA_REPOSICAO = 180
+
+def base_reposicao(hoje, janela, janela_curta):
+    """Parte do cálculo de reposição anterior a hoje: catálogo, saldos até ontem e somas das saídas.
+
+    Só as movimentações de hoje mudam durante o dia (as rotas de escrita usam
+    a hora atual), por isso isto é calculado uma vez por dia, por catálogo e
+    por versão do histórico (HISTORICO_MOV_DIARIO: importações, lançamentos
+    retroativos, reconstruir-mov-diario) e cada pedido junta apenas o dia
+    corrente (ver calcular_reposicao).
+    """
+    import numpy as np
+    import analise
+    produtos = db.session.execute(
+        db.select(Produto.id_produto, Produto.codigo, Produto.nome).order_by(Produto.id_produto)
+    ).all()
+    ids = np.fromiter((p[0] for p in produtos), dtype=np.int64, count=len(produtos))
+    inicio = hoje - timedelta(days=janela - 1)
+
+    saldos = np.zeros(len(ids))
+    linhas = db.session.execute(
+        db.select(
+            MovimentoDiario.id_produto,
+            func.sum(case((MovimentoDiario.tipo == 'Entrada', MovimentoDiario.quantidade), else_=-MovimentoDiario.quantidade))
+        ).where(MovimentoDiario.dia < hoje).group_by(MovimentoDiario.id_produto)
+    ).all()
+    if linhas:
+        id_linhas, valores = (np.array(c) for c in zip(*linhas))
+        saldos[np.searchsorted(ids, id_linhas)] = valores.astype(np.float64)
+
+    # Matriz produto × dia das saídas (sem hoje), numa única consulta ao resumo diário
+    matriz = np.zeros((len(ids), janela - 1), dtype=np.float32)
+    linhas = db.session.execute(
+        db.select(MovimentoDiario.id_produto, MovimentoDiario.dia, MovimentoDiario.quantidade)
+        .where(MovimentoDiario.tipo == 'Saida', MovimentoDiario.dia >= inicio, MovimentoDiario.dia < hoje)
+    ).all()
+    if linhas:
+        id_linhas, dias, quantidades = zip(*linhas)
+        colunas = (np.array([str(d) for d in dias], dtype='datetime64[D]') - np.datetime64(inicio, 'D')).astype(np.int64)
+        matriz[np.searchsorted(ids, np.array(id_linhas)), colunas] = quantidades
+
+    return {
+        'ids': ids,
+        'codigos': [(p[1] or '').strip() for p in produtos],
+        'nomes': [p[2] for p in produtos],
+        'saldos': saldos,
+        'somas': analise.acumular_saidas(matriz, janela_curta - 1),
+    }
+
+def calcular_reposicao(hoje, janela, janela_curta, prazo_entrega, cobertura_alvo, limite):
+    import numpy as np
+    import analise
+    base = consulta_em_cache(
+        'reposicao_base', (hoje, janela, janela_curta), ('produto', HISTORICO_MOV_DIARIO),
+        lambda: base_reposicao(hoje, janela, janela_curta)
+    )
+    ids = base['ids']
+    saidas_hoje = np.zeros(len(ids))
+    saldos = base['saldos'].copy()
+    for id_produto, tipo, quantidade in db.session.execute(
+        db.select(MovimentoDiario.id_produto, MovimentoDiario.tipo, MovimentoDiario.quantidade).where(MovimentoDiario.dia >= hoje)
+    ):
+        i = np.searchsorted(ids, id_produto)
+        if i == len(ids) or ids[i] != id_produto:
+            continue
+        if tipo == 'Saida':
+            saidas_hoje[i] += quantidade
+            saldos[i] -= quantidade
+        else:
+            saldos[i] += quantidade
+
+    r = analise.prever_reposicao(base['somas'], saidas_hoje, saldos, janela, janela_curta, prazo_entrega, cobertura_alvo)
+    # Em risco: com consumo e saldo no ponto de reposição ou abaixo; os que acabam primeiro vêm primeiro
+    em_risco = np.flatnonzero((r['consumo_diario'] > 0) & (saldos <= r['ponto_reposicao']))
+    total_em_risco = len(em_risco)
+    em_risco = em_risco[np.argsort(r['dias_cobertura'][em_risco], kind='stable')][:limite]
+    return {
+        'total_em_risco': total_em_risco,
+        'produtos': [
+            {
+                'id_produto': int(ids[i]),
+                'codigo': base['codigos'][i],
+                'nome': base['nomes'][i],
+                'saldo_atual': int(saldos[i]),
+                'consumo_diario': round(float(r['consumo_diario'][i]), 2),
+                'dias_cobertura': round(float(r['dias_cobertura'][i]), 1),
+                'ponto_reposicao': int(np.ceil(r['ponto_reposicao'][i])),
+                'quantidade_sugerida': int(r['quantidade_sugerida'][i]),
+            }
+            for i in em_risco.tolist()
+        ],
+    }
+
+@blueprint.route('/api/analise/reposicao', methods=['GET'])
+@jwt_required()
+@consultas_sql.orcamento_consultas(6)
+def get_analise_reposicao():
+    """Produtos no ponto de reposição, ordenados pelos dias de cobertura que ainda restam."""
+    try:
+        janela = int(request.args.get('janela', 30))
+        janela_curta = int(request.args.get('janela_curta', 7))
+        prazo_entrega = int(request.args.get('prazo_entrega', 7))
+        cobertura_alvo = int(request.args.get('cobertura_alvo', 30))
+        limite = int(request.args.get('limite', 100))
+        if not 1 <= janela_curta <= janela <= MAX_JANELA_REPOSICAO:
+            raise ValueError(f"deve ser 1 <= janela_curta <= janela <= {MAX_JANELA_REPOSICAO}")
+        if prazo_entrega < 0 or cobertura_alvo < 0 or limite < 1:
+            raise ValueError("prazo_entrega e cobertura_alvo não podem ser negativos e limite deve ser positivo")
+    except ValueError as e:
+        return jsonify({'erro': f"Parâmetros inválidos: {e}"}), 400
+    try:
+        hoje = date.today()
+        resultado = consulta_em_cache(
+            'reposicao', (hoje, janela, janela_curta, prazo_entrega, cobertura_alvo, limite), ('mov_diario', 'produto'),
+            lambda: calcular_reposicao(hoje, janela, janela_curta, prazo_entrega, cobertura_alvo, limite)
+        )
+        return jsonify({
+            'janela': janela, 'janela_curta': janela_curta,
+            'prazo_entrega': prazo_entrega, 'cobertura_alvo': cobertura_alvo,
+            **resultado
+        }), 200
+    except Exception as e: return jsonify({'erro': str(e)}), 500
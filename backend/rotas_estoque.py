@@ -0,0 +1,169 @@
+# ==============================================================================
+# ROTAS DE ESTOQUE (ENTRADAS, SAÍDAS, SALDOS E MOVIMENTAÇÕES)
+# ==============================================================================
+# Blueprint registado por app.criar_app(); os modelos e helpers vêm de app.
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime
+from sqlalchemy import case, or_
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql import func
+import consultas_sql
+from app import (
+    db, Produto, MovimentacaoEstoque, MovimentoDiario,
+    calcular_saldo_produto, subquery_saldos, filtros_relatorio_movimentacoes, acumular_mov_diario, ajustar_indicadores
+)
+
+blueprint = Blueprint('estoque', __name__)
+
+# --- ROTAS DE ESTOQUE ---
+
+@blueprint.route('/api/estoque/entrada', methods=['POST'])
+@jwt_required()
+@consultas_sql.orcamento_consultas(6)
+def registrar_entrada():
+    try:
+        dados = request.get_json()
+        saldo_atual = calcular_saldo_produto(dados['id_produto'])
+        novo = MovimentacaoEstoque(
+            id_produto=dados['id_produto'],
+            quantidade=dados['quantidade'],
+            id_usuario=get_jwt_identity(),
+            data_hora=datetime.now(),
+            tipo='Entrada'
+        )
+        db.session.add(novo)
+        acumular_mov_diario([{'id_produto': novo.id_produto, 'data_hora': novo.data_hora, 'tipo': novo.tipo, 'quantidade': novo.quantidade}])
+        ajustar_indicadores(valor_total_estoque=dados['quantidade'] * (db.session.get(Produto, dados['id_produto']).preco or 0))
+        db.session.commit()
+        return jsonify({'mensagem': 'Sucesso', 'novo_saldo': saldo_atual + dados['quantidade']}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/estoque/saida', methods=['POST'])
+@jwt_required()
+@consultas_sql.orcamento_consultas(6)
+def registrar_saida():
+    try:
+        dados = request.get_json()
+        saldo = calcular_saldo_produto(dados['id_produto'])
+        if saldo < dados['quantidade']:
+            return jsonify({'erro': 'Saldo insuficiente'}), 400
+        
+        novo = MovimentacaoEstoque(
+            id_produto=dados['id_produto'],
+            quantidade=dados['quantidade'],
+            id_usuario=get_jwt_identity(),
+            data_hora=datetime.now(),
+            tipo='Saida',
+            motivo_saida=dados.get('motivo_saida')
+        )
+        db.session.add(novo)
+        acumular_mov_diario([{'id_produto': novo.id_produto, 'data_hora': novo.data_hora, 'tipo': novo.tipo, 'quantidade': novo.quantidade}])
+        ajustar_indicadores(valor_total_estoque=-dados['quantidade'] * (db.session.get(Produto, dados['id_produto']).preco or 0))
+        db.session.commit()
+        return jsonify({'mensagem': 'Sucesso', 'novo_saldo': saldo - dados['quantidade']}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/estoque/saldos', methods=['GET'])
+@jwt_required()
+@consultas_sql.orcamento_consultas(1)
+def get_saldos_estoque():
+    try:
+        termo = request.args.get('search')
+        setor_id = request.args.get('setor_id')
+        
+        saldos_sq = subquery_saldos()
+        query = db.session.query(Produto, func.coalesce(saldos_sq.c.saldo, 0)).outerjoin(saldos_sq, saldos_sq.c.id_produto == Produto.id_produto)
+        if termo:
+            query = query.filter(or_(
+                Produto.nome.ilike(f"%{termo}%"),
+                Produto.codigo.ilike(f"%{termo}%"),
+                Produto.codigoB.ilike(f"%{termo}%"),
+                Produto.codigoC.ilike(f"%{termo}%")
+            ))
+        if setor_id:
+            query = query.filter(Produto.id_setor == setor_id)
+            
+        produtos = query.options(joinedload(Produto.setor)).all()
+        
+        saldos = []
+        for p, saldo in produtos:
+            saldos.append({
+                'id_produto': p.id_produto,
+                'codigo': p.codigo.strip(),
+                'nome': p.nome,
+                'saldo_atual': int(saldo),
+                'preco': str(p.preco),
+                'codigoB': p.codigoB,
+                'codigoC': p.codigoC,
+                'setor_nome': p.setor.nome if p.setor else 'Sem Setor'
+            })
+        return jsonify(saldos), 200
+    except Exception as e:
+        return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/movimentacoes', methods=['GET'])
+@jwt_required()
+@consultas_sql.orcamento_consultas(1)
+def get_todas_movimentacoes():
+    try:
+        tipo = request.args.get('tipo')
+        q = MovimentacaoEstoque.query.options(joinedload(MovimentacaoEstoque.produto), joinedload(MovimentacaoEstoque.usuario)).order_by(MovimentacaoEstoque.data_hora.desc())
+        if tipo in ['Entrada', 'Saida']: q = q.filter(MovimentacaoEstoque.tipo == tipo)
+        
+        res = []
+        for m in q.all():
+            res.append({
+                'id': m.id_movimentacao,
+                'data_hora': m.data_hora.strftime('%d/%m/%Y %H:%M:%S'),
+                'tipo': m.tipo,
+                'quantidade': m.quantidade,
+                'motivo_saida': m.motivo_saida,
+                'produto_codigo': m.produto.codigo if m.produto else '',
+                'produto_nome': m.produto.nome if m.produto else 'Excluído',
+                'usuario_nome': m.usuario.nome if m.usuario else 'Excluído'
+            })
+        return jsonify(res), 200
+    except Exception as e: return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/movimentacoes/resumo', methods=['GET'])
+@jwt_required()
+def resumo_movimentacoes():
+    """Totais de entradas e saídas do período, por dia ou por produto, lidos do resumo diário."""
+    agrupar = request.args.get('agrupar', 'dia')
+    if agrupar not in ('dia', 'produto'):
+        return jsonify({'erro': "Agrupamento inválido. Use 'dia' ou 'produto'."}), 400
+    try:
+        filtros = filtros_relatorio_movimentacoes(request.args)
+    except ValueError:
+        return jsonify({'erro': 'Datas devem estar no formato AAAA-MM-DD.'}), 400
+
+    entradas = func.sum(case((MovimentoDiario.tipo == 'Entrada', MovimentoDiario.quantidade), else_=0))
+    saidas = func.sum(case((MovimentoDiario.tipo == 'Saida', MovimentoDiario.quantidade), else_=0))
+    movimentos = func.sum(MovimentoDiario.movimentos)
+    if agrupar == 'dia':
+        consulta = db.select(MovimentoDiario.dia, entradas, saidas, movimentos).group_by(MovimentoDiario.dia).order_by(MovimentoDiario.dia)
+    else:
+        consulta = db.select(Produto.id_produto, Produto.codigo, Produto.nome, entradas, saidas, movimentos
+        ).join(Produto, Produto.id_produto == MovimentoDiario.id_produto
+        ).group_by(Produto.id_produto, Produto.codigo, Produto.nome).order_by(Produto.nome)
+    if 'data_inicio' in filtros:
+        consulta = consulta.where(MovimentoDiario.dia >= datetime.strptime(filtros['data_inicio'], '%Y-%m-%d').date())
+    if 'data_fim' in filtros:
+        consulta = consulta.where(MovimentoDiario.dia <= datetime.strptime(filtros['data_fim'], '%Y-%m-%d').date())
+    if 'tipo' in filtros:
+        consulta = consulta.where(MovimentoDiario.tipo == filtros['tipo'])
+
+    res = []
+    for linha in db.session.execute(consulta):
+        *chave, total_entradas, total_saidas, total_movimentos = linha
+        item = {'dia': chave[0].strftime('%Y-%m-%d')} if agrupar == 'dia' else {
+            'id_produto': chave[0], 'produto_codigo': (chave[1] or '').strip(), 'produto_nome': chave[2]
+        }
+        item.update(entradas=int(total_entradas or 0), saidas=int(total_saidas or 0), movimentos=int(total_movimentos or 0))
+        res.append(item)
+    return jsonify(res), 200
@@ -0,0 +1,146 @@
+# ==============================================================================
+# ROTAS DE RELATÓRIOS, ETIQUETAS E TRABALHOS EM SEGUNDO PLANO
+# ==============================================================================
+# Blueprint registado por app.criar_app(). A geração dos ficheiros fica em app
+# (GERAÇÃO DE RELATÓRIOS), partilhada com os processos de trabalhos_relatorio.
+from flask import Blueprint, jsonify, request, send_file, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+import os
+import trabalhos_relatorio
+from app import (
+    db, Setor, consulta_movimentacoes, filtros_relatorio_movimentacoes,
+    RENDERIZADORES_RELATORIO, parametros_relatorio, parametros_etiquetas, enviar_relatorio
+)
+
+blueprint = Blueprint('relatorios', __name__)
+
+# --- ROTAS DE RELATÓRIOS E ETIQUETAS ---
+
+@blueprint.route('/api/relatorios/inventario', methods=['GET'])
+@jwt_required()
+def relatorio_inventario():
+    try:
+        parametros = parametros_relatorio('inventario', request.args)
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    return enviar_relatorio('inventario', **parametros)
+
+@blueprint.route('/api/relatorios/movimentacoes', methods=['GET'])
+@jwt_required()
+def relatorio_movimentacoes():
+    formato = request.args.get('formato', 'json')
+    if formato in ('pdf', 'xlsx'):
+        # Os mesmos parâmetros validados dos trabalhos: um 'tipo' qualquer não cria entradas novas no cache
+        try:
+            parametros = parametros_relatorio('movimentacoes', request.args)
+        except ValueError as e:
+            return jsonify({'erro': str(e)}), 400
+        return enviar_relatorio('movimentacoes', **parametros)
+    try:
+        filtros = filtros_relatorio_movimentacoes(request.args)
+    except ValueError:
+        return jsonify({'erro': 'Datas devem estar no formato AAAA-MM-DD.'}), 400
+    if formato != 'json':
+        return jsonify({'erro': "Formato inválido. Use 'json', 'pdf' ou 'xlsx'."}), 400
+    res = []
+    for data_hora, codigo, nome, tipo, quantidade, usuario, _ in db.session.execute(consulta_movimentacoes(**filtros)):
+        res.append({
+            'data_hora': data_hora.strftime('%d/%m/%Y'),
+            'produto_codigo': codigo or '',
+            'produto_nome': nome or '',
+            'tipo': tipo,
+            'quantidade': quantidade,
+            'usuario_nome': usuario or ''
+        })
+    return jsonify(res)
+
+@blueprint.route('/api/produtos/etiquetas', methods=['POST'])
+@jwt_required()
+def gerar_etiquetas():
+    try:
+        parametros = parametros_etiquetas(request.get_json() or {})
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    return enviar_relatorio('etiquetas', **parametros)
+
+@blueprint.route('/api/etiquetas/formatos', methods=['GET'])
+@jwt_required()
+def listar_formatos_etiqueta():
+    import relatorios
+    formatos = [{'id': chave, 'descricao': f['descricao']} for chave, f in relatorios.FORMATOS_ETIQUETA.items()]
+    return jsonify({'formatos': formatos, 'padrao': relatorios.FORMATO_ETIQUETA_PADRAO}), 200
+
+# --- ROTA PARA RELATÓRIO DE SETOR ---
+@blueprint.route('/api/relatorios/setor/<int:id_setor>', methods=['GET'])
+@jwt_required()
+def relatorio_por_setor(id_setor):
+    Setor.query.get_or_404(id_setor)
+    formato = request.args.get('formato', 'pdf')
+    if formato not in ('pdf', 'xlsx'):
+        return jsonify({'erro': "Formato inválido. Use 'pdf' ou 'xlsx'."}), 400
+    return enviar_relatorio('setor', id_setor=id_setor, formato=formato)
+
+@blueprint.route('/api/relatorios/setores', methods=['GET'])
+@jwt_required()
+def relatorio_todos_setores():
+    formato = request.args.get('formato', 'pdf')
+    if formato not in ('pdf', 'zip'):
+        return jsonify({'erro': "Formato inválido. Use 'pdf' ou 'zip'."}), 400
+    return enviar_relatorio('setores', formato=formato)
+
+# --- ROTAS DE TRABALHOS DE RELATÓRIO (SEGUNDO PLANO) ---
+
+def _trabalho_do_usuario(id_trabalho):
+    """Estado do trabalho, se existir e pertencer ao utilizador logado (ou se este for Administrador)."""
+    estado = trabalhos_relatorio.ler_estado(id_trabalho)
+    if estado is None:
+        return None
+    if estado.get('id_usuario') != get_jwt_identity() and get_jwt().get('permissao') != 'Administrador':
+        return None
+    return estado
+
+def _estado_publico(estado):
+    return {k: v for k, v in estado.items() if k not in ('arquivo', 'id_usuario')}
+
+@blueprint.route('/api/relatorios/jobs', methods=['POST'])
+@jwt_required()
+def criar_trabalho_relatorio():
+    dados = request.get_json() or {}
+    tipo = dados.get('tipo')
+    parametros = dados.get('parametros') or {}
+    if tipo not in RENDERIZADORES_RELATORIO:
+        return jsonify({'erro': f"Tipo de relatório inválido. Use um de: {', '.join(RENDERIZADORES_RELATORIO)}."}), 400
+    if not isinstance(parametros, dict):
+        return jsonify({'erro': 'Parâmetros do relatório inválidos.'}), 400
+    try:
+        parametros = parametros_relatorio(tipo, parametros)
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    if tipo == 'setor' and not db.session.get(Setor, parametros['id_setor']):
+        return jsonify({'erro': 'Setor não encontrado.'}), 404
+
+    try:
+        estado = trabalhos_relatorio.enfileirar(tipo, parametros, get_jwt_identity(), current_app.config['ESTOQUE_CONFIGURACAO'])
+    except trabalhos_relatorio.FilaCheiaError:
+        return jsonify({'erro': 'Fila de relatórios cheia. Tente novamente em instantes.'}), 429
+    return jsonify(_estado_publico(estado)), 202
+
+@blueprint.route('/api/relatorios/jobs/<string:id_trabalho>', methods=['GET'])
+@jwt_required()
+def consultar_trabalho_relatorio(id_trabalho):
+    estado = _trabalho_do_usuario(id_trabalho)
+    if estado is None:
+        return jsonify({'erro': 'Trabalho não encontrado.'}), 404
+    return jsonify(_estado_publico(estado)), 200
+
+@blueprint.route('/api/relatorios/jobs/<string:id_trabalho>/arquivo', methods=['GET'])
+@jwt_required()
+def baixar_trabalho_relatorio(id_trabalho):
+    estado = _trabalho_do_usuario(id_trabalho)
+    if estado is None:
+        return jsonify({'erro': 'Trabalho não encontrado.'}), 404
+    if estado['estado'] != 'concluido':
+        return jsonify({'erro': 'Relatório ainda não está pronto.', 'estado': estado['estado']}), 409
+    if not os.path.exists(estado['arquivo']):
+        return jsonify({'erro': 'Ficheiro do relatório expirou.'}), 410
+    return send_file(estado['arquivo'], download_name=estado['nome_download'], as_attachment=True, mimetype=estado['mimetype'])
@@ -0,0 +1,67 @@
+# ==============================================================================
+# ROTAS DE SISTEMA (MÉTRICAS, DIAGNÓSTICO E VERSÃO)
+# ==============================================================================
+# Blueprint registado por app.criar_app().
+from flask import Blueprint, jsonify, request, Response, current_app
+from flask_jwt_extended import jwt_required, get_jwt
+import json
+import os
+import configuracao
+import metricas
+import consultas_lentas
+from app import db
+
+blueprint = Blueprint('sistema', __name__)
+
+# Opcional: se definido, o Prometheus envia-o como "Authorization: Bearer <token>"
+TOKEN_METRICAS = os.environ.get('ESTOQUE_METRICAS_TOKEN')
+
+@blueprint.route('/api/metrics', methods=['GET'])
+def get_metricas():
+    """Métricas deste processo no formato de texto do Prometheus (sem JWT: o scraper não faz login)."""
+    if TOKEN_METRICAS and request.headers.get('Authorization') != f"Bearer {TOKEN_METRICAS}":
+        return jsonify({"erro": "Acesso negado"}), 403
+    pool = configuracao.metricas_pool(db.engine.pool)
+    extras = {
+        'estoque_db_pool_retiradas_total': ('counter', 'Ligações retiradas do pool.', pool['retiradas']),
+        'estoque_db_pool_espera_segundos_total': ('counter', 'Tempo total à espera de uma ligação livre.', pool['espera_total_segundos']),
+        'estoque_db_pool_esgotamentos_total': ('counter', 'Pedidos que desistiram por falta de ligação livre.', pool['esgotamentos']),
+    }
+    if 'em_uso' in pool:
+        extras['estoque_db_pool_em_uso'] = ('gauge', 'Ligações do pool em uso.', pool['em_uso'])
+        extras['estoque_db_pool_tamanho'] = ('gauge', 'Tamanho configurado do pool.', pool['tamanho'])
+    return Response(metricas.formatar_prometheus(extras), mimetype='text/plain; version=0.0.4')
+
+@blueprint.route('/api/admin/pool', methods=['GET'])
+@jwt_required()
+def get_metricas_pool():
+    """Uso do pool de ligações deste processo (espera por ligação, ligações em uso, esgotamentos)."""
+    if get_jwt().get('permissao') != 'Administrador': return jsonify({"erro": "Acesso negado"}), 403
+    return jsonify(configuracao.metricas_pool(db.engine.pool)), 200
+
+@blueprint.route('/api/admin/consultas-lentas', methods=['GET'])
+@jwt_required()
+def get_consultas_lentas():
+    """As consultas lentas deste processo agrupadas pela forma do SQL (?limite=20&ordem=total|maximo|ocorrencias)."""
+    if get_jwt().get('permissao') != 'Administrador': return jsonify({"erro": "Acesso negado"}), 403
+    ordens = {'total': 'total_segundos', 'maximo': 'maximo_segundos', 'ocorrencias': 'ocorrencias'}
+    ordem = request.args.get('ordem', 'total')
+    if ordem not in ordens:
+        return jsonify({'erro': f"Ordem inválida. Use uma de: {', '.join(ordens)}"}), 400
+    try:
+        limite = int(request.args.get('limite', 20))
+    except ValueError:
+        return jsonify({'erro': 'Limite inválido'}), 400
+    configuracao_banco = current_app.config['ESTOQUE_CONFIGURACAO']
+    return jsonify({
+        'limite_ms': configuracao_banco['db_consulta_lenta_ms'],
+        'explain': configuracao_banco['db_explain_consultas_lentas'],
+        'arquivo': consultas_lentas.arquivo,
+        'consultas': consultas_lentas.piores_consultas(limite, ordens[ordem]),
+    }), 200
+
+@blueprint.route('/api/versao', methods=['GET'])
+def get_versao():
+    try:
+        with open('versao.json', 'r') as f: return jsonify(json.load(f))
+    except: return jsonify({'versao': '1.0'}), 200
@@ -0,0 +1,80 @@
+# ==============================================================================
+# ROTAS DE USUÁRIOS E LOGIN
+# ==============================================================================
+# Blueprint registado por app.criar_app(); os modelos vêm de app.
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt
+from datetime import timedelta
+from app import db, Usuario
+
+blueprint = Blueprint('usuarios', __name__)
+
+# --- ROTAS DE USUARIOS E LOGIN ---
+
+@blueprint.route('/api/login', methods=['POST'])
+def login_endpoint():
+    try:
+        d = request.get_json()
+        u = Usuario.query.filter_by(login=d.get('login'), ativo=True).first()
+        if u and u.check_password(d.get('senha')):
+            token = create_access_token(identity=str(u.id_usuario), additional_claims={'permissao': u.permissao}, expires_delta=timedelta(hours=8))
+            return jsonify(access_token=token), 200
+        return jsonify({"erro": "Credenciais inválidas"}), 401
+    except Exception as e: return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/usuario/me', methods=['GET'])
+@jwt_required()
+def get_usuario_logado():
+    u = Usuario.query.get(get_jwt_identity())
+    if not u: return jsonify({"erro": "Não encontrado"}), 404
+    return jsonify({'id': u.id_usuario, 'nome': u.nome, 'login': u.login, 'permissao': u.permissao}), 200
+
+@blueprint.route('/api/usuario/mudar-senha', methods=['POST'])
+@jwt_required()
+def mudar_senha_usuario():
+    try:
+        u = Usuario.query.get(get_jwt_identity())
+        d = request.get_json()
+        if not u.check_password(d['senha_atual']): return jsonify({'erro': 'Senha atual incorreta'}), 401
+        if d['nova_senha'] != d['confirmacao_nova_senha']: return jsonify({'erro': 'Confirmação incorreta'}), 400
+        u.set_password(d['nova_senha'])
+        db.session.commit()
+        return jsonify({'mensagem': 'Sucesso'}), 200
+    except Exception as e: return jsonify({'erro': str(e)}), 500
+
+@blueprint.route('/api/usuarios', methods=['GET'])
+@jwt_required()
+def get_todos_usuarios():
+    if get_jwt().get('permissao') != 'Administrador': return jsonify({"erro": "Acesso negado"}), 403
+    return jsonify([{'id': u.id_usuario, 'nome': u.nome, 'login': u.login, 'permissao': u.permissao, 'ativo': u.ativo} for u in Usuario.query.all()]), 200
+
+@blueprint.route('/api/usuarios', methods=['POST'])
+@jwt_required()
+def add_usuario():
+    if get_jwt().get('permissao') != 'Administrador': return jsonify({"erro": "Acesso negado"}), 403
+    d = request.get_json()
+    u = Usuario(nome=d['nome'], login=d['login'], permissao=d['permissao'])
+    u.set_password(d['senha'])
+    db.session.add(u)
+    db.session.commit()
+    return jsonify({'mensagem': 'Criado'}), 201
+
+@blueprint.route('/api/usuarios/<int:id>', methods=['GET', 'PUT', 'DELETE'])
+@jwt_required()
+def gerenciar_usuario(id):
+    if get_jwt().get('permissao') != 'Administrador': return jsonify({"erro": "Acesso negado"}), 403
+    u = Usuario.query.get_or_404(id)
+    if request.method == 'GET':
+        return jsonify({'id': u.id_usuario, 'nome': u.nome, 'login': u.login, 'permissao': u.permissao, 'ativo': u.ativo})
+    if request.method == 'PUT':
+        d = request.get_json()
+        u.nome = d['nome']
+        u.login = d['login']
+        u.permissao = d['permissao']
+        if d.get('senha'): u.set_password(d['senha'])
+        db.session.commit()
+        return jsonify({'mensagem': 'Atualizado'})
+    if request.method == 'DELETE':
+        u.ativo = not u.ativo
+        db.session.commit()
+        return jsonify({'mensagem': 'Status alterado'})
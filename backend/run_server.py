@@ -1,3 +1,13 @@
 from waitress import serve
-from app import app
-serve(app, host='0.0.0.0', port=5000)
\ No newline at end of file
+from app import criar_app, inicializar_banco, iniciar_reconciliacao_periodica
+
+# Servidor de um só processo (4 threads do Waitress). Para usar vários núcleos em
+# produção, ver servidor_producao.py.
+#
+# A guarda é necessária: os processos do ProcessPoolExecutor (importação paralela)
+# reimportam este módulo no Windows e não podem abrir um segundo servidor.
+if __name__ == '__main__':
+    app = criar_app()
+    inicializar_banco(app)
+    iniciar_reconciliacao_periodica(app)
+    serve(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,202 @@
+# ==============================================================================
+# SERVIDOR DE PRODUÇÃO COM VÁRIOS PROCESSOS
+# ==============================================================================
+# O run_server.py corre um único processo Waitress: por causa do GIL, a
+# renderização de relatórios e a serialização JSON nunca passam de um núcleo.
+# Este lançador abre o socket de escuta uma vez e entrega-o a N processos
+# Waitress ('spawn', também no Windows); o kernel distribui as ligações
+# entre eles.
+#
+# O processo principal só supervisiona: inicializa o banco, corre a
+# reconciliação periódica dos indicadores, substitui workers que morrem e
+# faz reinícios graduais (cada worker novo arranca antes de o antigo parar
+# de aceitar ligações e terminar os pedidos em curso).
+#
+# Reinício gradual: SIGHUP (Linux/macOS) ou alterar a data do ficheiro
+# indicado em --arquivo-reinicio (qualquer sistema). Ctrl+C / SIGTERM param
+# todos os workers da mesma forma.
+#
+# Uso:
+#   python servidor_producao.py --workers 4 --threads 8
+
+import argparse
+import _thread
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+logger = logging.getLogger('servidor_producao')
+
+# Tempo máximo para um worker terminar os pedidos em curso ao parar
+TEMPO_DRENAGEM_SEGUNDOS = int(os.environ.get('ESTOQUE_TEMPO_DRENAGEM', '30'))
+# Um worker que morre logo ao arrancar não é relançado em ciclo apertado
+ESPERA_RELANCAMENTO_SEGUNDOS = 2
+
+
+def _argumentos():
+    parser = argparse.ArgumentParser(description="Servidor de produção do Estoque (vários processos Waitress).")
+    parser.add_argument('--host', default=os.environ.get('ESTOQUE_HOST', '0.0.0.0'))
+    parser.add_argument('--porta', type=int, default=int(os.environ.get('ESTOQUE_PORTA', '5000')))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('ESTOQUE_WORKERS', '0')) or (os.cpu_count() or 1),
+                        help="processos do servidor (padrão: número de CPUs)")
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('ESTOQUE_THREADS', '8')),
+                        help="threads de pedidos por processo")
+    parser.add_argument('--limite-ligacoes', type=int, default=int(os.environ.get('ESTOQUE_LIMITE_LIGACOES', '200')),
+                        help="ligações abertas por processo antes de deixar de aceitar novas")
+    parser.add_argument('--backlog', type=int, default=int(os.environ.get('ESTOQUE_BACKLOG', '1024')),
+                        help="fila de ligações pendentes do socket de escuta")
+    parser.add_argument('--arquivo-reinicio', default=os.environ.get('ESTOQUE_ARQUIVO_REINICIO'),
+                        help="ficheiro cuja data de modificação, ao mudar, provoca um reinício gradual")
+    return parser.parse_args()
+
+
+# --- Worker ---
+
+def _drenar_e_sair(servidor, parar):
+    """Espera o pedido de paragem, deixa de aceitar ligações e sai quando os pedidos em curso terminarem."""
+    parar.wait()
+    servidor.accepting = False
+    servidor.pull_trigger()
+    limite = time.monotonic() + TEMPO_DRENAGEM_SEGUNDOS
+    while time.monotonic() < limite:
+        ocupado = servidor.task_dispatcher.queue or any(c.requests for c in list(servidor.active_channels.values()))
+        if not ocupado:
+            break
+        time.sleep(0.1)
+    # run() do Waitress trata o KeyboardInterrupt: para as threads e regressa
+    _thread.interrupt_main()
+
+def executar_worker(sock, parar, configuracao_banco, threads, limite_ligacoes, backlog):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(name)s: %(message)s')
+    from waitress import create_server
+    from app import criar_app
+    app = criar_app(configuracao_banco)
+
+    # Ctrl+C chega a todos os processos da consola, mas quem decide a paragem é o
+    # principal: o SIGINT só interrompe o worker depois da drenagem (interrupt_main)
+    def interromper(*_):
+        if parar.is_set():
+            raise KeyboardInterrupt
+    signal.signal(signal.SIGINT, interromper)
+    servidor = create_server(
+        app, sockets=[sock], threads=threads, connection_limit=limite_ligacoes, backlog=backlog,
+        ident='estoque'
+    )
+    threading.Thread(target=_drenar_e_sair, args=(servidor, parar), daemon=True).start()
+    logger.info("Worker %s a servir em %s:%s", os.getpid(), *sock.getsockname()[:2])
+    try:
+        servidor.run()
+    finally:
+        servidor.close()
+
+
+# --- Processo principal ---
+
+class Supervisor:
+    def __init__(self, args, sock, configuracao_banco):
+        self.args = args
+        self.sock = sock
+        self.configuracao_banco = configuracao_banco
+        self.contexto = multiprocessing.get_context('spawn')
+        self.workers = []
+        self.parar = threading.Event()
+        self.reiniciar = threading.Event()
+
+    def _lancar(self):
+        evento = self.contexto.Event()
+        processo = self.contexto.Process(
+            target=executar_worker,
+            args=(self.sock, evento, self.configuracao_banco, self.args.threads, self.args.limite_ligacoes, self.args.backlog),
+            name='estoque-worker'
+        )
+        processo.start()
+        return processo, evento, time.monotonic()
+
+    def _terminar(self, processo, evento):
+        evento.set()
+        processo.join(TEMPO_DRENAGEM_SEGUNDOS + 5)
+        if processo.is_alive():
+            logger.warning("Worker %s não terminou a tempo; a forçar a saída", processo.pid)
+            processo.terminate()
+            processo.join()
+
+    def reinicio_gradual(self):
+        logger.info("Reinício gradual de %d worker(s)", len(self.workers))
+        for i, (processo, evento, _) in enumerate(list(self.workers)):
+            self.workers[i] = self._lancar()
+            self._terminar(processo, evento)
+
+    def executar(self):
+        self.workers = [self._lancar() for _ in range(self.args.workers)]
+        data_reinicio = self._data_arquivo_reinicio()
+        while not self.parar.is_set():
+            self.parar.wait(1)
+            data_atual = self._data_arquivo_reinicio()
+            if data_atual != data_reinicio:
+                data_reinicio = data_atual
+                self.reiniciar.set()
+            if self.reiniciar.is_set():
+                self.reiniciar.clear()
+                self.reinicio_gradual()
+            for i, (processo, evento, iniciado) in enumerate(self.workers):
+                if not processo.is_alive() and not self.parar.is_set():
+                    if time.monotonic() - iniciado < ESPERA_RELANCAMENTO_SEGUNDOS:
+                        continue
+                    logger.warning("Worker %s terminou (código %s); a relançar", processo.pid, processo.exitcode)
+                    self.workers[i] = self._lancar()
+        logger.info("A parar %d worker(s)", len(self.workers))
+        for processo, evento, _ in self.workers:
+            evento.set()
+        for processo, evento, _ in self.workers:
+            self._terminar(processo, evento)
+
+    def _data_arquivo_reinicio(self):
+        if not self.args.arquivo_reinicio:
+            return None
+        try:
+            return os.path.getmtime(self.args.arquivo_reinicio)
+        except OSError:
+            return None
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(process)d] %(name)s: %(message)s')
+    args = _argumentos()
+
+    import configuracao
+    from app import criar_app, db, inicializar_banco, iniciar_reconciliacao_periodica
+    # Lida uma vez aqui e passada aos workers: todos servem o mesmo banco
+    configuracao_banco = configuracao.carregar_configuracao()
+    if args.threads > configuracao_banco['db_pool_size'] + configuracao_banco['db_max_overflow']:
+        logger.warning("%d threads por worker para no máximo %d ligações ao banco: pedidos vão esperar pelo pool",
+                       args.threads, configuracao_banco['db_pool_size'] + configuracao_banco['db_max_overflow'])
+    app = criar_app(configuracao_banco)
+    inicializar_banco(app)
+    with app.app_context():
+        # As ligações abertas aqui não passam para os workers
+        db.engine.dispose()
+    iniciar_reconciliacao_periodica(app)
+
+    sock = socket.create_server((args.host, args.porta), backlog=args.backlog)
+    supervisor = Supervisor(args, sock, configuracao_banco)
+
+    def pedir_paragem(*_):
+        supervisor.parar.set()
+    signal.signal(signal.SIGINT, pedir_paragem)
+    signal.signal(signal.SIGTERM, pedir_paragem)
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda *_: supervisor.reiniciar.set())
+
+    logger.info("A servir em http://%s:%s com %d worker(s) x %d thread(s)", args.host, args.porta, args.workers, args.threads)
+    try:
+        supervisor.executar()
+    finally:
+        sock.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+# ==============================================================================
+# TRABALHOS DE RELATÓRIO EM SEGUNDO PLANO
+# ==============================================================================
+# As rotas enfileiram o relatório e devolvem logo um id; um pool limitado de
+# processos renderiza o ficheiro numa pasta de spool e o cliente consulta o
+# estado até poder descarregar o resultado.
+#
+# O estado de cada trabalho fica num <id>.json dentro da pasta de spool (e não
+# só em memória), para que qualquer processo do servidor consiga responder à
+# consulta.
+
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+PASTA_SPOOL = os.environ.get('ESTOQUE_SPOOL_RELATORIOS') or os.path.join(tempfile.gettempdir(), 'estoque_relatorios')
+MAX_WORKERS = int(os.environ.get('ESTOQUE_RELATORIO_WORKERS', '2'))
+# Máximo de trabalhos pendentes/em execução por processo do servidor
+MAX_FILA = int(os.environ.get('ESTOQUE_RELATORIO_FILA', '16'))
+# Ficheiros e estados de trabalhos terminados são apagados depois deste tempo
+VALIDADE_SEGUNDOS = int(os.environ.get('ESTOQUE_RELATORIO_VALIDADE', '3600'))
+
+ESTADOS_FINAIS = ('concluido', 'erro')
+_ID_VALIDO = re.compile(r'^[0-9a-f]{32}$')
+
+_pool = None
+_aplicacao = None  # No processo do worker: a aplicação criada por _inicializar_worker
+_lock = threading.Lock()
+_ativos = set()
+_ultima_limpeza = 0
+
+
+class FilaCheiaError(Exception):
+    """Levantada quando já há MAX_FILA trabalhos pendentes neste processo."""
+
+
+def _caminho_estado(id_trabalho, pasta=PASTA_SPOOL):
+    return os.path.join(pasta, f"{id_trabalho}.json")
+
+def _caminho_parcial(id_trabalho, pasta=PASTA_SPOOL):
+    return os.path.join(pasta, f"{id_trabalho}.part")
+
+def _gravar_estado(estado, pasta=PASTA_SPOOL):
+    caminho = _caminho_estado(estado['id'], pasta)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(estado, f)
+    os.replace(temporario, caminho)
+
+def ler_estado(id_trabalho, pasta=PASTA_SPOOL):
+    """Devolve o dicionário de estado do trabalho, ou None se não existir."""
+    if not _ID_VALIDO.match(id_trabalho or ''):
+        return None
+    try:
+        with open(_caminho_estado(id_trabalho, pasta), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+# --- Lado do worker (corre no processo do pool) ---
+
+def _inicializar_worker(configuracao_banco):
+    global _aplicacao
+    import app as aplicacao
+    # Uma aplicação própria do processo, com a configuração do servidor que criou o pool
+    _aplicacao = aplicacao.criar_app(configuracao_banco)
+
+def executar_trabalho(id_trabalho, tipo, parametros, pasta):
+    import app as aplicacao
+
+    estado = ler_estado(id_trabalho, pasta)
+    estado.update(estado='executando', iniciado_em=time.time())
+    _gravar_estado(estado, pasta)
+
+    parcial = _caminho_parcial(id_trabalho, pasta)
+    try:
+        with _aplicacao.app_context():
+            # O relatório é copiado do cache: o trabalho expira e é apagado independentemente do cache
+            with open(parcial, 'wb') as destino:
+                nome_download, mimetype, avisos = aplicacao.renderizar_relatorio(tipo, parametros, destino)
+        arquivo = os.path.join(pasta, id_trabalho + os.path.splitext(nome_download)[1])
+        os.replace(parcial, arquivo)
+        estado.update(estado='concluido', arquivo=arquivo, nome_download=nome_download, mimetype=mimetype, avisos=avisos)
+    except Exception as e:
+        if os.path.exists(parcial):
+            os.remove(parcial)
+        estado.update(estado='erro', erro=str(e))
+    estado['concluido_em'] = time.time()
+    _gravar_estado(estado, pasta)
+
+
+# --- Lado do servidor ---
+
+def _obter_pool(configuracao_banco):
+    global _pool
+    if _pool is None:
+        # 'spawn' em todas as plataformas: não herda threads nem ligações do servidor
+        _pool = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_inicializar_worker,
+            initargs=(configuracao_banco,)
+        )
+    return _pool
+
+def _trabalho_terminado(id_trabalho, futuro):
+    with _lock:
+        _ativos.discard(id_trabalho)
+    erro = futuro.exception()
+    if erro is not None:
+        # O processo do worker morreu antes de gravar o estado final
+        estado = ler_estado(id_trabalho) or {'id': id_trabalho}
+        if estado.get('estado') not in ESTADOS_FINAIS:
+            estado.update(estado='erro', erro=f"Falha no processo de relatório: {erro}", concluido_em=time.time())
+            _gravar_estado(estado)
+
+def enfileirar(tipo, parametros, id_usuario, configuracao_banco):
+    """
+    Regista um trabalho e entrega-o ao pool. Devolve o estado inicial.
+    configuracao_banco é a da aplicação que enfileira; os processos do pool
+    criam com ela a sua própria aplicação.
+    """
+    limpar_expirados()
+    with _lock:
+        if len(_ativos) >= MAX_FILA:
+            raise FilaCheiaError()
+        os.makedirs(PASTA_SPOOL, exist_ok=True)
+        estado = {
+            'id': uuid.uuid4().hex,
+            'tipo': tipo,
+            'parametros': parametros,
+            'id_usuario': id_usuario,
+            'estado': 'pendente',
+            'criado_em': time.time(),
+        }
+        _gravar_estado(estado)
+        futuro = _obter_pool(configuracao_banco).submit(executar_trabalho, estado['id'], tipo, parametros, PASTA_SPOOL)
+        _ativos.add(estado['id'])
+    futuro.add_done_callback(lambda f, id_trabalho=estado['id']: _trabalho_terminado(id_trabalho, f))
+    return estado
+
+def limpar_expirados(pasta=PASTA_SPOOL):
+    """Apaga ficheiros e estados com mais de VALIDADE_SEGUNDOS (no máximo uma vez por minuto)."""
+    global _ultima_limpeza
+    agora = time.time()
+    if agora - _ultima_limpeza < 60 or not os.path.isdir(pasta):
+        return
+    _ultima_limpeza = agora
+    for nome in os.listdir(pasta):
+        if not nome.endswith('.json'):
+            continue
+        estado = ler_estado(nome[:-5], pasta)
+        if not estado:
+            continue
+        # Trabalhos que nunca terminaram (servidor reiniciado a meio) também expiram
+        referencia = estado.get('concluido_em') or estado.get('criado_em', agora)
+        if agora - referencia > VALIDADE_SEGUNDOS:
+            # O .part fica para trás quando o processo do worker morre a meio da renderização
+            caminhos = (estado.get('arquivo'), _caminho_parcial(estado['id'], pasta), _caminho_estado(estado['id'], pasta))
+            for caminho in caminhos:
+                if caminho and os.path.exists(caminho):
+                    os.remove(caminho)
@@ -0,0 +1,73 @@
+# ==============================================================================
+# BENCHMARK: ETIQUETAS COM CÓDIGO DE BARRAS
+# ==============================================================================
+# Mede gerar_pdf_etiquetas com produtos sintéticos, sem banco: a primeira
+# passagem codifica cada Code128 (cache vazio) e a segunda reimprime os mesmos
+# códigos com a geometria já memoizada.
+#
+# Uso:
+#   python benchmarks/bench_etiquetas.py --etiquetas 5000 --formato a4_3x8
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from relatorios import gerar_pdf_etiquetas, barras_code128, FORMATOS_ETIQUETA
+
+
+def produtos_sinteticos(quantidade, seed=42):
+    rnd = random.Random(seed)
+    return [
+        (f"{rnd.randint(10**11, 10**12 - 1)}", f"Produto sintético {i} " + "x" * rnd.randint(0, 30), Decimal(rnd.randint(1, 99999)) / 100)
+        for i in range(quantidade)
+    ]
+
+
+def medir(produtos, formato):
+    destino = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False).name
+    try:
+        inicio = time.perf_counter()
+        with open(destino, 'wb') as f:
+            gerar_pdf_etiquetas(f, produtos, formato)
+        segundos = time.perf_counter() - inicio
+        return segundos, os.path.getsize(destino)
+    finally:
+        os.remove(destino)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--etiquetas', type=int, default=5000)
+    parser.add_argument('--formato', choices=list(FORMATOS_ETIQUETA), default='a4_3x8')
+    args = parser.parse_args()
+
+    produtos = produtos_sinteticos(args.etiquetas)
+    resultados = []
+    for passagem in ('cache_vazio', 'cache_cheio'):
+        segundos, tamanho = medir(produtos, args.formato)
+        resultados.append({
+            'passagem': passagem,
+            'segundos': round(segundos, 3),
+            'etiquetas_por_segundo': int(args.etiquetas / segundos),
+            'bytes_pdf': tamanho,
+        })
+        print(f"{passagem:>11}: {segundos:7.3f}s  ({args.etiquetas / segundos:8.0f} etiquetas/s)")
+
+    print(json.dumps({
+        'benchmark': 'etiquetas',
+        'etiquetas': args.etiquetas,
+        'formato': args.formato,
+        'cache': barras_code128.cache_info()._asdict(),
+        'resultados': resultados,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+# ==============================================================================
+# BENCHMARK: TEMPO DE ARRANQUE DO app.py (IMPORTAÇÃO E criar_app, A FRIO)
+# ==============================================================================
+# Corre "import app; app.criar_app()" com "python -X importtime" num processo
+# novo, várias vezes: mede o tempo total no processo e lê do stderr os módulos
+# que o app importa diretamente e os que o criar_app() importa (as rotas).
+# É o custo que o run_server.py, cada worker do servidor_producao.py, cada
+# processo de trabalhos de relatório e o run.py do desktop pagam antes de
+# atender o primeiro pedido.
+#
+# Serve também de guarda: sai com código 1 se a mediana passar de --limite-ms
+# ou se algum dos módulos de MODULOS_ADIADOS for carregado no arranque (eles
+# só devem entrar no primeiro relatório, importação ou análise). O limite
+# padrão foi medido numa máquina de 1 núcleo; noutras máquinas ajuste-o com
+# --limite-ms, mas a verificação dos módulos adiados não depende da máquina.
+#
+# Uso:
+#   python benchmarks/bench_importacao_app.py --repeticoes 7 --limite-ms 800 --saida importacao.json
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+PASTA_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+# Dependências pesadas que o app.py só importa quando são usadas
+MODULOS_ADIADOS = ('relatorios', 'reportlab', 'openpyxl', 'pypdf', 'importacao', 'analise', 'numpy')
+
+LIMITE_PADRAO_MS = 800
+
+# "import time:  self [us] | cumulative | imported package", com o nome indentado pela profundidade
+_LINHA_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def ler_importtime(texto):
+    """[(profundidade, modulo, proprio_us, acumulado_us)] na ordem em que o Python os escreve (filhos antes do pai)."""
+    entradas = []
+    for linha in texto.splitlines():
+        m = _LINHA_IMPORTTIME.match(linha)
+        if m:
+            entradas.append(((len(m.group(3)) - 1) // 2, m.group(4), int(m.group(1)), int(m.group(2))))
+    return entradas
+
+
+def medir(modulo, url):
+    """
+    Importa o módulo num processo novo e chama o criar_app() dele, se tiver;
+    devolve (total_ms, {import direto: ms}, módulos carregados).
+    """
+    env = dict(os.environ, ESTOQUE_DATABASE_URL=url, ESTOQUE_DB_CONSULTA_LENTA_MS='0')
+    codigo = (
+        "import time; inicio = time.perf_counter()\n"
+        f"import {modulo}\n"
+        f"getattr({modulo}, 'criar_app', lambda: None)()\n"
+        "print((time.perf_counter() - inicio) * 1000)"
+    )
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        cwd=PASTA_BACKEND, env=env, capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"'import {modulo}' falhou:\n{resultado.stderr[-2000:]}")
+    entradas = ler_importtime(resultado.stderr)
+    filhos, encontrado = {}, False
+    for profundidade, nome, _, acumulado_us in entradas:
+        if encontrado:
+            # Depois do módulo: o que o criar_app() importa aparece no nível de topo
+            if profundidade == 0:
+                filhos[nome] = acumulado_us / 1000
+        elif profundidade == 0 and nome == modulo:
+            encontrado = True
+        elif profundidade == 0:
+            filhos = {}
+        elif profundidade == 1:
+            filhos[nome] = acumulado_us / 1000
+    if not encontrado:
+        raise RuntimeError(f"'{modulo}' não aparece na saída do -X importtime (já estava importado?)")
+    return float(resultado.stdout.split()[-1]), filhos, {nome for _, nome, _, _ in entradas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de arranque a frio do app.py (importação e criar_app), com limite e lista de módulos adiados.")
+    parser.add_argument('--modulo', default='app', help="módulo a importar a partir de backend/")
+    parser.add_argument('--url', default='sqlite://', help="URL do banco vista pelo criar_app() (que cria o engine)")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--limite-ms', type=float, default=LIMITE_PADRAO_MS, help="mediana máxima aceite; 0 desliga")
+    parser.add_argument('--top', type=int, default=10, help="quantos imports diretos mais lentos listar")
+    parser.add_argument('--saida', help="ficheiro onde gravar o JSON (além da saída padrão)")
+    args = parser.parse_args()
+
+    tempos, filhos_por_execucao, carregados = [], [], set()
+    for _ in range(args.repeticoes):
+        total, filhos, modulos = medir(args.modulo, args.url)
+        tempos.append(total)
+        filhos_por_execucao.append(filhos)
+        carregados |= modulos
+
+    mediana = statistics.median(tempos)
+    nomes = set().union(*filhos_por_execucao)
+    filhos = {n: statistics.median(f.get(n, 0.0) for f in filhos_por_execucao) for n in nomes}
+    adiados_carregados = sorted(m for m in carregados if m in MODULOS_ADIADOS)
+
+    saida = json.dumps({
+        'modulo': args.modulo,
+        'python': sys.version.split()[0],
+        'repeticoes_ms': [round(t, 1) for t in tempos],
+        'mediana_ms': round(mediana, 1),
+        'minimo_ms': round(min(tempos), 1),
+        'limite_ms': args.limite_ms,
+        'imports_diretos_ms': {n: round(t, 1) for n, t in sorted(filhos.items(), key=lambda x: -x[1])[:args.top]},
+        'modulos_adiados_carregados': adiados_carregados,
+    }, indent=2, ensure_ascii=False)
+    print(saida)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            f.write(saida + '\n')
+
+    falhas = []
+    if args.limite_ms and mediana > args.limite_ms:
+        falhas.append(f"mediana de {mediana:.0f} ms acima do limite de {args.limite_ms:.0f} ms")
+    if adiados_carregados:
+        falhas.append(f"módulos que deviam ser adiados carregados no arranque: {', '.join(adiados_carregados)}")
+    if falhas:
+        print("FALHOU: " + '; '.join(falhas), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# ==============================================================================
+# BENCHMARK: LEITURA PARALELA DO CSV DE IMPORTAÇÃO
+# ==============================================================================
+# Mede o tempo de ler_ficheiro_importacao (parsing + normalização, sem banco)
+# com 1, 2, 4, ... processos e mostra o ganho em relação a 1 processo.
+#
+# Uso:
+#   python benchmarks/bench_importacao_paralela.py --linhas 500000
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from importacao import ler_ficheiro_importacao
+
+
+def gerar_csv(linhas, seed=42):
+    rnd = random.Random(seed)
+    partes = ["codigo;nome;preco;quantidade;descricao;fornecedores_nomes;naturezas_nomes\n"]
+    for i in range(linhas):
+        partes.append(
+            f"P{i:08d};  Produto de teste {i}  ;{rnd.randint(1, 99999) / 100:.2f}".replace('.', ',')
+            + f";{rnd.randint(0, 50)};Descrição do item {i};Fornecedor {i % 500}, Fornecedor {(i + 7) % 500};Natureza {i % 30}\n"
+        )
+    return "".join(partes).encode("utf-8")
+
+
+def medir(dados, workers, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        registros, _, erros = ler_ficheiro_importacao(dados, max_workers=workers)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), len(registros), len(erros)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--linhas', type=int, default=300000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    dados = gerar_csv(args.linhas)
+    workers_lista = [1]
+    while workers_lista[-1] * 2 <= args.max_workers:
+        workers_lista.append(workers_lista[-1] * 2)
+    if workers_lista[-1] != args.max_workers:
+        workers_lista.append(args.max_workers)
+
+    resultados = []
+    base = None
+    for workers in workers_lista:
+        segundos, n_registros, n_erros = medir(dados, workers, args.repeticoes)
+        base = base or segundos
+        resultados.append({
+            'workers': workers,
+            'segundos': round(segundos, 3),
+            'linhas_por_segundo': int(n_registros / segundos),
+            'speedup': round(base / segundos, 2),
+            'registros': n_registros,
+            'erros': n_erros,
+        })
+        print(f"{workers:>3} workers: {segundos:7.3f}s  ({base / segundos:4.2f}x)")
+
+    print(json.dumps({
+        'benchmark': 'importacao_paralela',
+        'linhas': args.linhas,
+        'bytes': len(dados),
+        'cpu_count': os.cpu_count(),
+        'resultados': resultados,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# ==============================================================================
+# BENCHMARK: PDF DO INVENTÁRIO
+# ==============================================================================
+# Mede tempo de renderização e pico de memória (RSS) de gerar_pdf_inventario
+# com dados sintéticos, sem banco. Cada medição corre num subprocesso próprio
+# para que o pico de memória de uma não contamine a outra.
+#
+# Modos:
+#   paginado - RelatorioTabelaPDF (uma Table por página, desenhada e descartada)
+#   lista    - referência: SimpleDocTemplate.build com uma única Table longa
+#
+# Uso:
+#   python benchmarks/bench_relatorio_inventario.py --linhas 50000 --linhas-lista 5000
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+
+def pico_rss_mb():
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss vem em KB no Linux e em bytes no macOS
+        return pico / 1024 / (1024 if sys.platform == 'darwin' else 1)
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+
+
+def linhas_sinteticas(quantidade, seed=42):
+    rnd = random.Random(seed)
+    setores = [f"Setor {i:02d}" for i in range(20)]
+    for i in range(quantidade):
+        yield (
+            setores[i * len(setores) // quantidade],
+            f"P{i:08d}",
+            f"Produto sintético número {i} " + "x" * rnd.randint(0, 40),
+            rnd.randint(0, 500),
+            Decimal(rnd.randint(1, 99999)) / 100,
+        )
+
+
+def executar_paginado(quantidade, destino):
+    from relatorios import gerar_pdf_inventario
+    with open(destino, 'wb') as f:
+        gerar_pdf_inventario(f, linhas_sinteticas(quantidade))
+
+
+def executar_lista(quantidade, destino):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table
+    dados = [['CÓDIGO', 'PRODUTO', 'SETOR', 'SALDO', 'PREÇO', 'TOTAL']]
+    for setor, codigo, nome, saldo, preco in linhas_sinteticas(quantidade):
+        dados.append([codigo, nome[:40], setor, str(saldo), str(preco), str(saldo * preco)])
+    doc = SimpleDocTemplate(destino, pagesize=letter)
+    doc.build([Table(dados, repeatRows=1)])
+
+
+def medir_subprocesso(modo, quantidade):
+    saida = subprocess.run(
+        [sys.executable, __file__, '--executar', modo, '--linhas', str(quantidade)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, default=50000)
+    parser.add_argument('--linhas-lista', type=int, default=5000, help="linhas do modo de referência (0 para omitir)")
+    parser.add_argument('--executar', choices=['paginado', 'lista'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.executar:
+        destino = tempfile.NamedTemporaryFile(suffix='.pdf', delete=False).name
+        try:
+            inicio = time.perf_counter()
+            (executar_paginado if args.executar == 'paginado' else executar_lista)(args.linhas, destino)
+            segundos = time.perf_counter() - inicio
+            tamanho = os.path.getsize(destino)
+        finally:
+            os.remove(destino)
+        print(json.dumps({
+            'modo': args.executar,
+            'linhas': args.linhas,
+            'segundos': round(segundos, 3),
+            'linhas_por_segundo': int(args.linhas / segundos),
+            'pico_rss_mb': round(pico_rss_mb(), 1),
+            'bytes_pdf': tamanho,
+        }))
+        return
+
+    resultados = [medir_subprocesso('paginado', args.linhas)]
+    if args.linhas_lista:
+        resultados.append(medir_subprocesso('paginado', args.linhas_lista))
+        resultados.append(medir_subprocesso('lista', args.linhas_lista))
+    for r in resultados:
+        print(f"{r['modo']:>9} {r['linhas']:>7} linhas: {r['segundos']:8.3f}s  pico RSS {r['pico_rss_mb']:7.1f} MB")
+    print(json.dumps({'benchmark': 'relatorio_inventario', 'resultados': resultados}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
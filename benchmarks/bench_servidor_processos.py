@@ -0,0 +1,206 @@
+# ==============================================================================
+# BENCHMARK: UM PROCESSO VS. VÁRIOS PROCESSOS (servidor_producao.py)
+# ==============================================================================
+# Cria um banco SQLite temporário com dados sintéticos, arranca o servidor
+# real em cada configuração e mede latência e débito com vários clientes HTTP
+# em paralelo (ligações keep-alive, mistura de endpoints de leitura).
+#
+# A configuração "1x4" (1 processo, 4 threads) é a mesma do run_server.py.
+# Com um só núcleo os processos extra não podem ganhar nada; o ganho esperado
+# aparece em endpoints que usam CPU (JSON grande, análises) com vários núcleos.
+#
+# Uso:
+#   python benchmarks/bench_servidor_processos.py --produtos 5000 --clientes 16 --segundos 15 \
+#       --configuracoes 1x4 2x4 4x4
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PASTA_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+ENDPOINTS = [
+    '/api/estoque/saldos',
+    '/api/dashboard/kpis',
+    '/api/dashboard/tendencias?dias=90',
+    '/api/analise/abc',
+]
+
+
+def preparar_banco(url, produtos, movimentos, seed=42):
+    """Cria o esquema, o utilizador admin/admin e dados sintéticos num subprocesso (criar_app() lê a URL do ambiente)."""
+    codigo = f"""
+import random, sys
+from datetime import datetime, timedelta
+sys.path.insert(0, {PASTA_BACKEND!r})
+import app as a
+app = a.criar_app()
+a.inicializar_banco(app)
+rnd = random.Random({seed})
+with app.app_context():
+    u = a.Usuario(nome='Admin', login='admin', permissao='Administrador'); u.set_password('admin')
+    a.db.session.add(u)
+    a.db.session.execute(a.db.insert(a.Produto), [
+        {{'codigo': f'P{{i:07d}}', 'nome': f'Produto sintético {{i}}', 'preco': rnd.randint(100, 99999) / 100}}
+        for i in range({produtos})
+    ])
+    agora = datetime.now()
+    movs = [
+        {{'id_produto': rnd.randint(1, {produtos}), 'id_usuario': 1, 'quantidade': rnd.randint(1, 20),
+          'tipo': 'Entrada' if rnd.random() < 0.4 else 'Saida', 'data_hora': agora - timedelta(minutes=rnd.randint(0, 60 * 24 * 120))}}
+        for _ in range({movimentos})
+    ]
+    a.db.session.execute(a.db.insert(a.MovimentacaoEstoque), movs)
+    a.db.session.commit()
+    a.reconstruir_mov_diario()
+    a.reconciliar_indicadores(registrar_desvio=False)
+"""
+    subprocess.run([sys.executable, '-c', codigo], check=True, env={**os.environ, 'ESTOQUE_DATABASE_URL': url})
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def pedir(ligacao, metodo, caminho, corpo=None, headers=None):
+    ligacao.request(metodo, caminho, body=corpo, headers=headers or {})
+    resposta = ligacao.getresponse()
+    dados = resposta.read()
+    return resposta.status, dados
+
+
+def esperar_servidor(porta, limite=60):
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        try:
+            with socket.create_connection(('127.0.0.1', porta), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("O servidor não arrancou a tempo.")
+
+
+def carga(porta, token, clientes, segundos, seed=42):
+    """Cada cliente repete pedidos numa ligação keep-alive até acabar o tempo; devolve latências (s) e erros."""
+    latencias = []
+    erros = [0]
+    lock = threading.Lock()
+    fim = time.monotonic() + segundos
+
+    def cliente(n):
+        rnd = random.Random(seed + n)
+        ligacao = http.client.HTTPConnection('127.0.0.1', porta, timeout=60)
+        headers = {'Authorization': f'Bearer {token}'}
+        locais = []
+        falhas = 0
+        while time.monotonic() < fim:
+            inicio = time.perf_counter()
+            try:
+                status, _ = pedir(ligacao, 'GET', rnd.choice(ENDPOINTS), headers=headers)
+            except (OSError, http.client.HTTPException):
+                ligacao.close()
+                ligacao = http.client.HTTPConnection('127.0.0.1', porta, timeout=60)
+                status = None
+            if status == 200:
+                locais.append(time.perf_counter() - inicio)
+            else:
+                falhas += 1
+        ligacao.close()
+        with lock:
+            latencias.extend(locais)
+            erros[0] += falhas
+
+    threads = [threading.Thread(target=cliente, args=(n,)) for n in range(clientes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencias, erros[0]
+
+
+def percentil(ordenadas, p):
+    if not ordenadas:
+        return None
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))]
+
+
+def medir_configuracao(url, workers, threads, clientes, segundos):
+    porta = porta_livre()
+    servidor = subprocess.Popen(
+        [sys.executable, os.path.join(PASTA_BACKEND, 'servidor_producao.py'),
+         '--host', '127.0.0.1', '--porta', str(porta), '--workers', str(workers), '--threads', str(threads)],
+        cwd=PASTA_BACKEND, env={**os.environ, 'ESTOQUE_DATABASE_URL': url, 'ESTOQUE_RECONCILIAR_KPIS_SEGUNDOS': '86400'},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        esperar_servidor(porta)
+        ligacao = http.client.HTTPConnection('127.0.0.1', porta, timeout=60)
+        _, dados = pedir(ligacao, 'POST', '/api/login', json.dumps({'login': 'admin', 'senha': 'admin'}),
+                         {'Content-Type': 'application/json'})
+        token = json.loads(dados)['access_token']
+        # Aquecimento: imports preguiçosos e caches de cada worker
+        carga(porta, token, clientes, min(3, segundos))
+        latencias, erros = carga(porta, token, clientes, segundos)
+    finally:
+        servidor.terminate()
+        servidor.wait(60)
+    latencias.sort()
+    return {
+        'configuracao': f"{workers}x{threads}",
+        'workers': workers,
+        'threads': threads,
+        'pedidos': len(latencias),
+        'erros': erros,
+        'pedidos_por_segundo': round(len(latencias) / segundos, 1),
+        'p50_ms': round(percentil(latencias, 50) * 1000, 1) if latencias else None,
+        'p95_ms': round(percentil(latencias, 95) * 1000, 1) if latencias else None,
+        'p99_ms': round(percentil(latencias, 99) * 1000, 1) if latencias else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--produtos', type=int, default=5000)
+    parser.add_argument('--movimentos', type=int, default=100000)
+    parser.add_argument('--clientes', type=int, default=16)
+    parser.add_argument('--segundos', type=int, default=15)
+    parser.add_argument('--configuracoes', nargs='+', default=['1x4', f"{os.cpu_count() or 1}x4"],
+                        help="processos x threads, ex.: 1x4 4x8")
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix='bench_servidor_')
+    url = f"sqlite:///{os.path.join(pasta, 'estoque.db')}"
+    preparar_banco(url, args.produtos, args.movimentos)
+
+    resultados = []
+    for configuracao in dict.fromkeys(args.configuracoes):
+        workers, threads = (int(x) for x in configuracao.split('x'))
+        r = medir_configuracao(url, workers, threads, args.clientes, args.segundos)
+        resultados.append(r)
+        print(f"{r['configuracao']:>6}: {r['pedidos_por_segundo']:8.1f} req/s  p50 {r['p50_ms']} ms  "
+              f"p95 {r['p95_ms']} ms  p99 {r['p99_ms']} ms  erros {r['erros']}")
+
+    print(json.dumps({
+        'benchmark': 'servidor_processos',
+        'cpu_count': os.cpu_count(),
+        'produtos': args.produtos,
+        'movimentos': args.movimentos,
+        'clientes': args.clientes,
+        'segundos': args.segundos,
+        'endpoints': ENDPOINTS,
+        'resultados': resultados,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
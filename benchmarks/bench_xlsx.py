@@ -0,0 +1,101 @@
+# ==============================================================================
+# BENCHMARK: EXPORTAÇÃO XLSX
+# ==============================================================================
+# Compara tempo e pico de memória (RSS) das duas formas de escrever a planilha
+# do inventário, com dados sintéticos e sem banco. Cada medição corre num
+# subprocesso próprio para que o pico de memória de uma não contamine a outra.
+#
+# Modos:
+#   streaming - gerar_xlsx (openpyxl write_only, linha a linha)
+#   pandas    - referência: lista de dicts -> DataFrame -> to_excel em BytesIO
+#               (só se o pandas estiver instalado; não é dependência do backend)
+#
+# Uso:
+#   python benchmarks/bench_xlsx.py --linhas 100000
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+
+from bench_relatorio_inventario import linhas_sinteticas, pico_rss_mb
+
+COLUNAS = ['setor', 'codigo', 'nome', 'saldo_atual', 'preco', 'total']
+
+
+def executar_streaming(quantidade, destino):
+    from relatorios import gerar_xlsx
+    with open(destino, 'wb') as f:
+        gerar_xlsx(f, COLUNAS, (
+            (setor, codigo, nome, saldo, preco, saldo * preco)
+            for setor, codigo, nome, saldo, preco in linhas_sinteticas(quantidade)
+        ))
+
+
+def executar_pandas(quantidade, destino):
+    import pandas as pd
+    dados = [
+        {'setor': setor, 'codigo': codigo, 'nome': nome, 'saldo_atual': saldo, 'preco': preco}
+        for setor, codigo, nome, saldo, preco in linhas_sinteticas(quantidade)
+    ]
+    df = pd.DataFrame(dados, columns=COLUNAS[:-1])
+    df['total'] = df['saldo_atual'] * df['preco']
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False)
+    with open(destino, 'wb') as f:
+        f.write(buffer.getvalue())
+
+
+def medir_subprocesso(modo, quantidade):
+    saida = subprocess.run(
+        [sys.executable, __file__, '--executar', modo, '--linhas', str(quantidade)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--linhas', type=int, default=100000)
+    parser.add_argument('--executar', choices=['streaming', 'pandas'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.executar:
+        destino = tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False).name
+        try:
+            inicio = time.perf_counter()
+            (executar_streaming if args.executar == 'streaming' else executar_pandas)(args.linhas, destino)
+            segundos = time.perf_counter() - inicio
+            tamanho = os.path.getsize(destino)
+        finally:
+            os.remove(destino)
+        print(json.dumps({
+            'modo': args.executar,
+            'linhas': args.linhas,
+            'segundos': round(segundos, 3),
+            'linhas_por_segundo': int(args.linhas / segundos),
+            'pico_rss_mb': round(pico_rss_mb(), 1),
+            'bytes_xlsx': tamanho,
+        }))
+        return
+
+    modos = ['streaming']
+    if importlib.util.find_spec('pandas'):
+        modos.append('pandas')
+    else:
+        print("pandas não instalado: a referência 'pandas' fica de fora", file=sys.stderr)
+    resultados = [medir_subprocesso(modo, args.linhas) for modo in modos]
+    for r in resultados:
+        print(f"{r['modo']:>9} {r['linhas']:>7} linhas: {r['segundos']:8.3f}s  pico RSS {r['pico_rss_mb']:7.1f} MB")
+    print(json.dumps({'benchmark': 'xlsx', 'resultados': resultados}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
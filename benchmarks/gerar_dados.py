@@ -0,0 +1,306 @@
+# ==============================================================================
+# GERADOR DE DADOS SINTÉTICOS (CARGA E DIMENSIONAMENTO)
+# ==============================================================================
+# Preenche um banco vazio com setores, fornecedores, naturezas, produtos,
+# as tabelas de associação e o histórico de mov_estoque, com distribuições
+# parecidas com as de uma loja real:
+#   - frequência de saídas por produto segundo uma lei de Zipf (com o
+#     expoente padrão, 20% dos produtos fazem cerca de 75% das saídas); o
+#     mesmo para o peso de cada fornecedor no catálogo
+#   - entradas como reposições em lote quando o saldo chega ao ponto de
+#     reposição, por isso nenhum saldo fica negativo
+#   - movimentos em dias úteis (sábado com meio expediente, domingo fechado),
+#     entre as 08h e as 18h, com menos movimento à hora de almoço
+#   - códigos internos por setor (FER000123), EAN-13 com dígito verificador
+#     e referências de fornecedor em parte dos produtos
+#
+# Os valores vêm de numpy com a semente indicada: a mesma semente, escala e
+# --data-fim geram exatamente os mesmos dados. As inserções usam o INSERT
+# do Core em lotes (executemany; o insert do ORM parte o lote sempre que
+# uma linha tem colunas nulas diferentes da anterior).
+#
+# O banco vem da configuração normal (ESTOQUE_DATABASE_URL ou
+# estoque_config.json) ou de --url. No fim, mov_diario e os indicadores do
+# dashboard são recalculados.
+#
+# Uso:
+#   python benchmarks/gerar_dados.py --url sqlite:///carga.db --produtos 200000 --movimentos 10000000 \
+#       --fornecedores 500 --seed 7
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+PASTA_BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+LOTE_PRODUTOS = 20000
+LOTE_MOVIMENTOS = 100000
+
+SETORES = [
+    ('FER', 'Ferragens'), ('ELE', 'Elétrica'), ('HID', 'Hidráulica'), ('PIN', 'Pintura'), ('FRR', 'Ferramentas'),
+    ('JAR', 'Jardim'), ('LIM', 'Limpeza'), ('ESC', 'Escritório'), ('EPI', 'Equipamento de proteção'),
+    ('ILU', 'Iluminação'), ('CON', 'Construção'), ('MAD', 'Madeiras'), ('AUT', 'Automotivo'), ('INF', 'Informática'),
+]
+NATUREZAS = [
+    'Revenda', 'Consumo interno', 'Matéria-prima', 'Ativo imobilizado', 'Embalagem', 'Manutenção',
+    'Uso e consumo', 'Material de expediente', 'Produto acabado', 'Amostra',
+]
+ITENS = [
+    'Parafuso', 'Porca', 'Arruela', 'Cabo flexível', 'Tubo PVC', 'Luva de correr', 'Fita isolante', 'Tinta acrílica',
+    'Lixa d\'água', 'Broca aço rápido', 'Disjuntor', 'Tomada 2P+T', 'Lâmpada LED', 'Cola de contacto', 'Mangueira',
+    'Registo de esfera', 'Joelho 90°', 'Abraçadeira', 'Chave de fendas', 'Serra copo', 'Luva nitrílica', 'Bucha',
+    'Interruptor', 'Silicone', 'Rolo de pintura', 'Pincel', 'Trincha', 'Fusível', 'Terminal', 'Calha',
+]
+MEDIDAS = [3, 4, 5, 6, 8, 10, 12, 16, 20, 25, 32, 40, 50]
+VARIANTES = ['zincado', 'inox', 'galvanizado', 'branco', 'preto', 'cinza', 'reforçado', 'profissional', 'econômico']
+PREFIXOS_FORNECEDOR = ['Distribuidora', 'Comercial', 'Indústria', 'Atacado', 'Metalúrgica', 'Importadora', 'Casa']
+NOMES_FORNECEDOR = ['Aurora', 'Horizonte', 'Paulista', 'Sul', 'Atlântico', 'Central', 'Nordeste', 'Serra', 'Vale', 'Litoral',
+                    'Planalto', 'Norte', 'Brasil', 'União', 'Progresso', 'Minas', 'Delta', 'Ômega', 'Real', 'Estrela']
+
+# As entradas de reposição saem da simulação do saldo; as saídas ficam com esta
+# parte do total pedido, o que deixa o total final perto de --movimentos
+FRACAO_SAIDAS = 0.9
+QUANTIDADE_MEDIA_SAIDA = 2.5
+
+# Peso de cada dia da semana (segunda = 0) e de cada hora do expediente
+PESO_DIA_SEMANA = np.array([1.0, 1.0, 1.0, 1.0, 1.1, 0.4, 0.0])
+HORAS = np.arange(8, 18)
+PESO_HORA = np.array([0.6, 1.0, 1.1, 1.0, 0.4, 0.7, 1.0, 1.1, 0.9, 0.5])
+# Sábado só até às 12h
+PESO_HORA_SABADO = np.where(HORAS < 12, PESO_HORA, 0.0)
+
+
+def _nomes_unicos(base, quantidade, formato):
+    """Os primeiros nomes da lista base e, se faltarem, variantes numeradas."""
+    nomes = list(base[:quantidade])
+    i = 2
+    while len(nomes) < quantidade:
+        nomes.extend(formato(nome, i) for nome in base[:quantidade - len(nomes)])
+        i += 1
+    return nomes
+
+def _probabilidades_zipf(n, expoente, rng):
+    """Probabilidade de cada um de n itens com lei de Zipf, com a ordem de popularidade baralhada."""
+    pesos = 1.0 / np.arange(1, n + 1) ** expoente
+    return rng.permutation(pesos / pesos.sum())
+
+def ean13(numeros):
+    """Códigos EAN-13 (prefixo 789, Brasil) a partir de números de 9 dígitos, com o dígito verificador."""
+    corpo = 789 * 10 ** 9 + numeros.astype(np.int64)
+    digitos = corpo[:, None] // 10 ** np.arange(11, -1, -1, dtype=np.int64) % 10
+    soma = digitos[:, 0::2].sum(axis=1) + 3 * digitos[:, 1::2].sum(axis=1)
+    return [f"{c:013d}" for c in (corpo * 10 + (10 - soma % 10) % 10).tolist()]
+
+
+def gerar_catalogo(a, rng, produtos, fornecedores, setores, naturezas, expoente):
+    """Setores, fornecedores, naturezas, produtos e associações."""
+    nomes_setor = _nomes_unicos(SETORES, setores, lambda s, i: (f"{s[0][:2]}{i}", f"{s[1]} {i}"))
+    a.db.session.execute(a.db.insert(a.Setor), [{'id_setor': i + 1, 'nome': nome} for i, (_, nome) in enumerate(nomes_setor)])
+    combinacoes = [f"{p} {n}" for n in NOMES_FORNECEDOR for p in PREFIXOS_FORNECEDOR]
+    nomes_fornecedor = _nomes_unicos(combinacoes, fornecedores, lambda nome, i: f"{nome} {i}")
+    a.db.session.execute(a.db.insert(a.Fornecedor), [
+        {'id_fornecedor': i + 1, 'nome': f"{nome} Ltda"[:50]} for i, nome in enumerate(nomes_fornecedor)
+    ])
+    nomes_natureza = _nomes_unicos(NATUREZAS, naturezas, lambda nome, i: f"{nome} {i}")
+    a.db.session.execute(a.db.insert(a.Natureza), [{'id_natureza': i + 1, 'nome': nome} for i, nome in enumerate(nomes_natureza)])
+    a.db.session.commit()
+
+    # Preços log-normais (muitos itens baratos, poucos caros)
+    precos = np.round(np.exp(rng.normal(3.0, 1.2, produtos)).clip(0.5, 50000), 2)
+    id_setor = rng.integers(0, setores, produtos)
+    item = rng.integers(0, len(ITENS), produtos)
+    variante = rng.integers(0, len(VARIANTES), produtos)
+    medida = rng.choice(MEDIDAS, produtos)
+    codigos_b = ean13(rng.choice(10 ** 9, produtos, replace=False))
+    com_referencia = rng.random(produtos) < 0.5
+    prob_fornecedor = _probabilidades_zipf(fornecedores, expoente, rng)
+    acumulada_fornecedor = np.cumsum(prob_fornecedor)
+
+    sequencia_setor = np.zeros(setores, dtype=np.int64)
+    for inicio in range(0, produtos, LOTE_PRODUTOS):
+        fim = min(produtos, inicio + LOTE_PRODUTOS)
+        linhas = []
+        for i in range(inicio, fim):
+            s = id_setor[i]
+            sequencia_setor[s] += 1
+            linhas.append({
+                'Id_produto': i + 1,
+                'Codigo': f"{nomes_setor[s][0]}{sequencia_setor[s]:06d}",
+                'Nome': f"{ITENS[item[i]]} {medida[i]} mm {VARIANTES[variante[i]]}",
+                'Descricao': f"{ITENS[item[i]]} {VARIANTES[variante[i]]}, medida {medida[i]} mm",
+                'Preco': float(precos[i]),
+                'CodigoB': codigos_b[i],
+                'CodigoC': f"R{rng.integers(1000, 99999)}-{rng.integers(10, 99)}" if com_referencia[i] else None,
+                'id_setor': int(s) + 1,
+            })
+        a.db.session.execute(a.Produto.__table__.insert(), linhas)
+
+        # 1 a 3 fornecedores por produto, escolhidos pelo peso de cada fornecedor
+        vinculos = set()
+        for i, n in zip(range(inicio, fim), rng.integers(1, min(3, fornecedores) + 1, fim - inicio)):
+            for f in np.searchsorted(acumulada_fornecedor, rng.random(n)).clip(0, fornecedores - 1):
+                vinculos.add((i + 1, int(f) + 1))
+        a.db.session.execute(a.produto_fornecedor.insert(), [
+            {'FK_PRODUTO_Id_produto': p, 'FK_FORNECEDOR_id_fornecedor': f} for p, f in sorted(vinculos)
+        ])
+        # Natureza principal (Revenda na maioria) e, em 20% dos produtos, uma segunda
+        principal = np.where(rng.random(fim - inicio) < 0.7, 0, rng.integers(0, naturezas, fim - inicio))
+        vinculos = {(i + 1, int(n) + 1) for i, n in zip(range(inicio, fim), principal)}
+        for i in range(inicio, fim):
+            if rng.random() < 0.2:
+                vinculos.add((i + 1, int(rng.integers(0, naturezas)) + 1))
+        a.db.session.execute(a.produto_natureza.insert(), [
+            {'fk_PRODUTO_Id_produto': p, 'fk_NATUREZA_id_natureza': n} for p, n in sorted(vinculos)
+        ])
+        a.db.session.commit()
+
+
+def _dias_e_movimentos(rng, movimentos, data_inicio, data_fim):
+    """(dias úteis, número de movimentos de cada um), somando exatamente 'movimentos'."""
+    dias = np.arange(np.datetime64(data_inicio), np.datetime64(data_fim) + 1)
+    pesos = PESO_DIA_SEMANA[(dias.astype('datetime64[D]').view('int64') - 4) % 7]
+    uteis = pesos > 0
+    dias, pesos = dias[uteis], pesos[uteis]
+    return dias, rng.multinomial(movimentos, pesos / pesos.sum())
+
+def _horarios(rng, dia, n):
+    """n instantes ordenados dentro do expediente do dia."""
+    pesos = PESO_HORA_SABADO if (dia.astype('datetime64[D]').view('int64') - 4) % 7 == 5 else PESO_HORA
+    horas = rng.choice(HORAS, n, p=pesos / pesos.sum())
+    segundos = horas * 3600 + rng.integers(0, 3600, n)
+    return np.sort(dia.astype('datetime64[s]') + segundos.astype('timedelta64[s]'))
+
+
+def gerar_movimentos(a, rng, produtos, movimentos, usuarios, data_inicio, data_fim, expoente):
+    """
+    Saldo de abertura de cada produto e o histórico em ordem cronológica. As
+    saídas seguem a popularidade de cada produto; as entradas são reposições
+    em lotes, recebidas antes da abertura nos dias em que o saldo ia ficar
+    abaixo do ponto de reposição (o saldo nunca fica negativo). Devolve o
+    número de movimentos inseridos.
+    """
+    prob_produto = _probabilidades_zipf(produtos, expoente, rng)
+    acumulada_produto = np.cumsum(prob_produto)
+    dias, por_dia = _dias_e_movimentos(rng, int(max(0, movimentos - produtos) * FRACAO_SAIDAS), data_inicio, data_fim)
+    demanda_diaria = prob_produto * por_dia.sum() * QUANTIDADE_MEDIA_SAIDA / max(1, len(dias))
+    # Uma semana de segurança; lotes de compra múltiplos de 6 que cobrem cerca de um mês
+    ponto = np.ceil(demanda_diaria * 7).astype(np.int64) + 1
+    lote = np.maximum(6, np.ceil(demanda_diaria * 30 / 6).astype(np.int64) * 6)
+    estoque = ponto + lote
+
+    abertura = datetime.combine(data_inicio, datetime.min.time()) + timedelta(hours=7)
+    for inicio in range(0, produtos, LOTE_MOVIMENTOS):
+        a.db.session.execute(a.MovimentacaoEstoque.__table__.insert(), [
+            {'id_produto': i + 1, 'id_usuario': 1, 'data_hora': abertura, 'quantidade': int(estoque[i]), 'tipo': 'Entrada', 'motivo_saida': None}
+            for i in range(inicio, min(produtos, inicio + LOTE_MOVIMENTOS))
+        ])
+    a.db.session.commit()
+
+    pendentes = []
+    inseridos = produtos
+    for dia, n in zip(dias, por_dia):
+        if not n:
+            continue
+        ids = np.searchsorted(acumulada_produto, rng.random(n)).clip(0, produtos - 1)
+        quantidade = rng.geometric(1 / QUANTIDADE_MEDIA_SAIDA, n)
+        demanda = np.bincount(ids, weights=quantidade, minlength=produtos).astype(np.int64)
+        repor = np.flatnonzero(estoque - demanda < ponto)
+        reposicao = lote[repor] * np.ceil((ponto[repor] - estoque[repor] + demanda[repor]) / lote[repor]).astype(np.int64)
+        estoque[repor] += reposicao
+        estoque -= demanda
+
+        # Receções em ordem aleatória de produto dentro da primeira hora
+        ordem = rng.permutation(len(repor))
+        recebimento = np.sort(dia.astype('datetime64[s]') + (7 * 3600 + rng.integers(0, 3600, len(repor))).astype('timedelta64[s]'))
+        pendentes.extend(
+            {'id_produto': int(p) + 1, 'id_usuario': int(u), 'data_hora': m, 'quantidade': int(q), 'tipo': 'Entrada', 'motivo_saida': None}
+            for p, u, m, q in zip(repor[ordem], rng.integers(1, usuarios + 1, len(repor)),
+                                  recebimento.astype(datetime).tolist(), reposicao[ordem])
+        )
+        pendentes.extend(
+            {'id_produto': int(p) + 1, 'id_usuario': int(u), 'data_hora': m, 'quantidade': int(q), 'tipo': 'Saida', 'motivo_saida': 'Venda'}
+            for p, u, m, q in zip(ids, rng.integers(1, usuarios + 1, n), _horarios(rng, dia, n).astype(datetime).tolist(), quantidade)
+        )
+        if len(pendentes) >= LOTE_MOVIMENTOS:
+            a.db.session.execute(a.MovimentacaoEstoque.__table__.insert(), pendentes)
+            a.db.session.commit()
+            inseridos += len(pendentes)
+            pendentes = []
+            print(f"  {inseridos:>12,} movimentos", file=sys.stderr)
+    if pendentes:
+        a.db.session.execute(a.MovimentacaoEstoque.__table__.insert(), pendentes)
+        a.db.session.commit()
+        inseridos += len(pendentes)
+    return inseridos
+
+
+def popular_banco(a, aplicacao, produtos, movimentos, fornecedores=500, setores=14, naturezas=10, usuarios=5,
+                  seed=42, data_fim=None, dias=365, expoente=0.85, senha_admin='admin'):
+    """Cria o esquema e preenche o banco (que tem de estar sem produtos). Devolve o tempo gasto em segundos."""
+    inicio = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    data_fim = data_fim or date.today()
+    data_inicio = data_fim - timedelta(days=dias - 1)
+    a.inicializar_banco(aplicacao)
+    with aplicacao.app_context():
+        if a.db.session.query(a.Produto.query.exists()).scalar():
+            raise RuntimeError("O banco já tem produtos; o gerador só preenche bancos vazios.")
+        # O admin (id 1) é quem regista os saldos iniciais; os operadores fazem o resto
+        if not a.Usuario.query.filter_by(login='admin').first():
+            admin = a.Usuario(nome='Admin', login='admin', permissao='Administrador')
+            admin.set_password(senha_admin)
+            a.db.session.add(admin)
+        for i in range(1, usuarios):
+            operador = a.Usuario(nome=f'Operador {i}', login=f'operador{i}', permissao='Usuario')
+            operador.set_password(senha_admin)
+            a.db.session.add(operador)
+        a.db.session.commit()
+        total_usuarios = a.Usuario.query.count()
+
+        print(f"Catálogo: {produtos:,} produtos, {fornecedores} fornecedores", file=sys.stderr)
+        gerar_catalogo(a, rng, produtos, fornecedores, setores, naturezas, expoente)
+        print(f"Movimentos: {movimentos:,} entre {data_inicio} e {data_fim}", file=sys.stderr)
+        inseridos = gerar_movimentos(a, rng, produtos, movimentos, total_usuarios, data_inicio, data_fim, expoente)
+        print(f"{inseridos:,} movimentos inseridos", file=sys.stderr)
+        print("A recalcular mov_diario e indicadores", file=sys.stderr)
+        a.reconstruir_mov_diario()
+        a.reconciliar_indicadores(registrar_desvio=False)
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preenche um banco vazio com dados sintéticos realistas.")
+    parser.add_argument('--url', help="URL do banco (padrão: a configuração do backend)")
+    parser.add_argument('--produtos', type=int, default=20000)
+    parser.add_argument('--movimentos', type=int, default=1000000)
+    parser.add_argument('--fornecedores', type=int, default=500)
+    parser.add_argument('--setores', type=int, default=len(SETORES))
+    parser.add_argument('--naturezas', type=int, default=len(NATUREZAS))
+    parser.add_argument('--usuarios', type=int, default=5, help="utilizadores que registam movimentos (inclui o admin)")
+    parser.add_argument('--dias', type=int, default=365, help="dias de histórico até --data-fim")
+    parser.add_argument('--data-fim', type=date.fromisoformat, help="último dia do histórico, AAAA-MM-DD (padrão: hoje)")
+    parser.add_argument('--zipf', type=float, default=0.85, help="expoente da lei de Zipf da popularidade dos produtos")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--senha-admin', default='admin')
+    args = parser.parse_args()
+
+    if args.url:
+        os.environ['ESTOQUE_DATABASE_URL'] = args.url
+    # As inserções em lote passariam todas pelo registo de consultas lentas
+    os.environ['ESTOQUE_DB_CONSULTA_LENTA_MS'] = '0'
+    sys.path.insert(0, PASTA_BACKEND)
+    import app as a
+
+    segundos = popular_banco(
+        a, a.criar_app(), args.produtos, args.movimentos, args.fornecedores, args.setores, args.naturezas, args.usuarios,
+        args.seed, args.data_fim, args.dias, args.zipf, args.senha_admin
+    )
+    print(f"Concluído em {segundos:.1f} s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
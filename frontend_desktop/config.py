@@ -3,4 +3,14 @@
 # Para testar no mesmo computador, use "127.0.0.1".
 # Para testar em outra máquina na rede, use o IP da máquina servidora (ex: "192.168.0.10").
 
-SERVER_IP = '192.168.17.200'
\ No newline at end of file
+SERVER_IP = '192.168.17.200'
+
+# Modo local (loja com um só computador): o programa usa um banco SQLite neste
+# computador, criado no primeiro arranque, em vez do MySQL do servidor; o
+# cliente fala com o servidor embutido em 127.0.0.1 e SERVER_IP é ignorado.
+# No primeiro arranque é criado o utilizador admin / admin: mude a senha.
+MODO_LOCAL = False
+
+# Pasta do banco local e dos registos (None = %LOCALAPPDATA%\Estoque no
+# Windows, ~/.estoque nos outros sistemas)
+PASTA_DADOS_LOCAL = None
@@ -10,6 +10,7 @@ import random
 import webbrowser
 import winsound
 import threading
+import time
 
 from PySide6.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout,
@@ -17,24 +18,25 @@ from PySide6.QtWidgets import (
     QTableWidgetItem, QHeaderView, QSizePolicy, QDialog, QFormLayout,
     QDialogButtonBox, QListWidget, QListWidgetItem, QAbstractItemView,
     QComboBox, QFileDialog, QFrame, QDateEdit, QCalendarWidget, QMenu,
-    QTextEdit, QGraphicsDropShadowEffect
+    QTextEdit, QGraphicsDropShadowEffect, QCheckBox, QProgressDialog, QInputDialog
 )
 from PySide6.QtGui import (
-    QPixmap, QAction, QDoubleValidator, QKeySequence, QIcon, QColor
+    QPixmap, QAction, QDoubleValidator, QKeySequence, QIcon, QColor,
+    QImage, QPainter, QPen, QFont, QPolygonF
 )
 from PySide6.QtCore import (
-    Qt, QTimer, Signal, QDate, QEvent, QObject, QThread, QUrl
+    Qt, QTimer, Signal, QDate, QEvent, QObject, QThread, QUrl, QPointF, QRectF
 )
 from PySide6.QtMultimedia import QSoundEffect
 from packaging.version import parse as parse_version
 
-from config import SERVER_IP
+from config import SERVER_IP, MODO_LOCAL
 
 # ==============================================================================
 # 2. FUNÇÕES AUXILIARES E VARIÁVEIS GLOBAIS
 # ==============================================================================
 access_token = None
-API_BASE_URL = f"http://{SERVER_IP}:5000"
+API_BASE_URL = f"http://{'127.0.0.1' if MODO_LOCAL else SERVER_IP}:5000"
 APP_VERSION = "2.6.0"
 
 class SignalHandler(QObject):
@@ -134,6 +136,112 @@ class FormDataLoader(QObject):
             results['message'] = f"Ocorreu um erro inesperado: {e}"
         self.finished.emit(results)
 
+class RelatorioJobWorker(QObject):
+    """Pede um relatório à API como trabalho em segundo plano, acompanha o estado e descarrega o ficheiro."""
+    progresso = Signal(str)
+    finished = Signal(dict)
+    INTERVALO_CONSULTA = 1.0
+    TEMPO_LIMITE = 900
+    TEXTOS_ESTADO = {
+        'pendente': "Relatório na fila do servidor...",
+        'executando': "O servidor está a gerar o relatório...",
+    }
+    def __init__(self, tipo, parametros, caminho_salvar):
+        super().__init__()
+        self.tipo = tipo
+        self.parametros = parametros
+        self.caminho_salvar = caminho_salvar
+    def run(self):
+        results = {'status': 'success', 'caminho': self.caminho_salvar}
+        try:
+            global access_token
+            headers = {'Authorization': f'Bearer {access_token}'}
+            url_jobs = f"{API_BASE_URL}/api/relatorios/jobs"
+            response = requests.post(url_jobs, headers=headers, json={'tipo': self.tipo, 'parametros': self.parametros}, timeout=10)
+            if response.status_code != 202:
+                raise RuntimeError(response.json().get('erro', f"Erro {response.status_code}"))
+            id_trabalho = response.json()['id']
+
+            inicio = time.monotonic()
+            while True:
+                estado = requests.get(f"{url_jobs}/{id_trabalho}", headers=headers, timeout=10).json()
+                if estado.get('estado') == 'concluido':
+                    results['avisos'] = estado.get('avisos') or []
+                    break
+                if estado.get('estado') == 'erro' or 'erro' in estado:
+                    raise RuntimeError(estado.get('erro', 'Erro desconhecido'))
+                if time.monotonic() - inicio > self.TEMPO_LIMITE:
+                    raise RuntimeError("O servidor demorou demasiado a gerar o relatório.")
+                self.progresso.emit(self.TEXTOS_ESTADO.get(estado.get('estado'), "A aguardar o servidor..."))
+                time.sleep(self.INTERVALO_CONSULTA)
+
+            self.progresso.emit("A descarregar o ficheiro...")
+            with requests.get(f"{url_jobs}/{id_trabalho}/arquivo", headers=headers, stream=True, timeout=30) as response:
+                response.raise_for_status()
+                with open(self.caminho_salvar, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        f.write(chunk)
+        except requests.exceptions.RequestException:
+            results['status'] = 'error'
+            results['message'] = "connection_error"
+        except Exception as e:
+            results['status'] = 'error'
+            results['message'] = str(e)
+        self.finished.emit(results)
+
+class _ReceptorRelatorio(QObject):
+    """Vive na thread da interface, para que o callback de conclusão não corra na thread do worker."""
+    def __init__(self, callback, parent):
+        super().__init__(parent)
+        self.callback = callback
+    def receber(self, resultados):
+        self.callback(resultados)
+        self.deleteLater()
+
+def gerar_relatorio_em_segundo_plano(parent, tipo, parametros, caminho_salvar, ao_concluir):
+    """Corre um RelatorioJobWorker numa QThread, com um diálogo de progresso, e chama ao_concluir(resultados)."""
+    dialogo = QProgressDialog("A pedir o relatório ao servidor...", None, 0, 0, parent)
+    dialogo.setWindowTitle("Gerando Relatório")
+    dialogo.setWindowModality(Qt.WindowModality.WindowModal)
+    dialogo.setMinimumDuration(0)
+    dialogo.show()
+
+    thread = QThread()
+    worker = RelatorioJobWorker(tipo, parametros, caminho_salvar)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.progresso.connect(dialogo.setLabelText)
+    receptor = _ReceptorRelatorio(ao_concluir, parent)
+    worker.finished.connect(dialogo.close)
+    worker.finished.connect(receptor.receber)
+    worker.finished.connect(thread.quit)
+    worker.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    # Mantém as referências vivas enquanto o trabalho corre
+    parent._relatorio_em_curso = (thread, worker, dialogo)
+    thread.start()
+
+def mostrar_resultado_relatorio(parent, resultados, perguntar_abrir=False):
+    if resultados['status'] != 'success':
+        if resultados.get('message') == "connection_error":
+            show_connection_error_message(parent)
+        else:
+            QMessageBox.warning(parent, "Erro", f"Não foi possível gerar o relatório: {resultados.get('message')}")
+        return
+    if resultados.get('avisos'):
+        QMessageBox.warning(parent, "Atenção", "\n\n".join(resultados['avisos']))
+    if not perguntar_abrir:
+        QMessageBox.information(parent, "Sucesso", f"Relatório salvo com sucesso em:\n{resultados['caminho']}")
+        return
+    msg = QMessageBox(parent)
+    msg.setIcon(QMessageBox.Icon.Information)
+    msg.setWindowTitle("Sucesso")
+    msg.setText("Relatório gerado com sucesso!")
+    msg.setInformativeText(f"Salvo em:\n{resultados['caminho']}\n\nDeseja abrir o arquivo agora?")
+    msg.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+    if msg.exec() == QMessageBox.StandardButton.Yes:
+        os.startfile(resultados['caminho'])
+
 class FormularioProdutoDialog(QDialog):
     produto_atualizado = Signal(int, dict)
 
@@ -767,12 +875,16 @@ class SetoresWidget(QWidget):
         self.btn_imprimir = QPushButton("🖨️ Imprimir Relação")
         self.btn_imprimir.setObjectName("btnNeutral")
         self.btn_imprimir.setToolTip("Gera um PDF com os produtos deste setor para colagem.")
+        self.btn_imprimir_todos = QPushButton("🖨️ Imprimir Todos")
+        self.btn_imprimir_todos.setObjectName("btnNeutral")
+        self.btn_imprimir_todos.setToolTip("Gera a relação de itens de todos os setores de uma vez.")
         self.btn_excluir = QPushButton("🗑️ Excluir Selecionado")
         self.btn_excluir.setObjectName("btnNegative")
         
         layout_botoes.addWidget(self.btn_adicionar)
         layout_botoes.addWidget(self.btn_editar)
         layout_botoes.addWidget(self.btn_imprimir)
+        layout_botoes.addWidget(self.btn_imprimir_todos)
         layout_botoes.addWidget(self.btn_excluir)
         layout_botoes.addStretch(1)
         
@@ -791,6 +903,7 @@ class SetoresWidget(QWidget):
         self.btn_adicionar.clicked.connect(self.abrir_formulario_adicionar)
         self.btn_editar.clicked.connect(self.abrir_formulario_editar)
         self.btn_imprimir.clicked.connect(self.imprimir_relatorio_setor) # <--- CONECTAR SINAL
+        self.btn_imprimir_todos.clicked.connect(self.imprimir_relatorio_todos_setores)
         self.btn_excluir.clicked.connect(self.excluir_setor_selecionado)
         
         self.carregar_setores()
@@ -882,41 +995,31 @@ class SetoresWidget(QWidget):
         if not caminho_salvar:
             return
             
-        global access_token
-        headers = {'Authorization': f'Bearer {access_token}'}
-        
-        try:
-            # Feedback visual de carregamento
-            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-            
-            response = requests.get(f"{API_BASE_URL}/api/relatorios/setor/{setor_id}", headers=headers, stream=True)
-            
-            if response.status_code == 200:
-                with open(caminho_salvar, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                QApplication.restoreOverrideCursor()
-                
-                msg = QMessageBox()
-                msg.setIcon(QMessageBox.Icon.Information)
-                msg.setWindowTitle("Sucesso")
-                msg.setText(f"Relatório gerado com sucesso!")
-                msg.setInformativeText(f"Salvo em:\n{caminho_salvar}\n\nDeseja abrir o arquivo agora?")
-                msg.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-                if msg.exec() == QMessageBox.StandardButton.Yes:
-                    import os
-                    os.startfile(caminho_salvar)
-            else:
-                QApplication.restoreOverrideCursor()
-                erro_msg = response.json().get('erro', 'Erro desconhecido')
-                QMessageBox.warning(self, "Erro", f"Não foi possível gerar o relatório: {erro_msg}")
-                
-        except requests.exceptions.RequestException:
-            QApplication.restoreOverrideCursor()
-            show_connection_error_message(self)
-        except Exception as e:
-            QApplication.restoreOverrideCursor()
-            QMessageBox.critical(self, "Erro", f"Ocorreu um erro: {e}")            
+        gerar_relatorio_em_segundo_plano(
+            self, 'setor', {'id_setor': setor_id}, caminho_salvar,
+            lambda resultados: mostrar_resultado_relatorio(self, resultados, perguntar_abrir=True)
+        )
+
+    def imprimir_relatorio_todos_setores(self):
+        opcoes = ["Um único PDF (uma secção por setor)", "Arquivo ZIP (um PDF por setor)"]
+        opcao, ok = QInputDialog.getItem(self, "Imprimir Todos os Setores", "Formato:", opcoes, 0, False)
+        if not ok:
+            return
+        formato = 'pdf' if opcao == opcoes[0] else 'zip'
+
+        caminho_salvar, _ = QFileDialog.getSaveFileName(
+            self,
+            "Salvar Relatório dos Setores",
+            f"Relacao_Setores.{formato}",
+            f"Arquivos {formato.upper()} (*.{formato})"
+        )
+        if not caminho_salvar:
+            return
+
+        gerar_relatorio_em_segundo_plano(
+            self, 'setores', {'formato': formato}, caminho_salvar,
+            lambda resultados: mostrar_resultado_relatorio(self, resultados, perguntar_abrir=True)
+        )
 
 class MudarSenhaDialog(QDialog):
     def __init__(self, parent=None):
@@ -1031,17 +1134,23 @@ class ImportacaoWidget(QWidget):
         instrucoes = QLabel(
             "<b>Instruções:</b><br>"
             "1. Prepare uma planilha com as seguintes colunas obrigatórias: <b>codigo, nome</b>.<br>"
-            "2. Colunas opcionais: <b>preco, quantidade</b>, <b>descricao</b>, <b>fornecedores_nomes</b>, <b>naturezas_nomes</b>.<br>"
+            "2. Colunas opcionais: <b>preco, quantidade</b>, <b>descricao</b>, <b>codigoB</b>, <b>codigoC</b>, <b>setor</b>, <b>fornecedores_nomes</b>, <b>naturezas_nomes</b>.<br>"
             "3. Para múltiplos fornecedores ou naturezas, separe os nomes por vírgula (ex: 'Fornecedor A, Fornecedor B').<br>"
             "4. Salve a planilha no formato <b>CSV (Valores separados por vírgulas)</b>.<br>"
+            "5. O botão <b>Exportar Catálogo</b> gera um CSV neste mesmo formato (com o saldo atual em 'quantidade').<br>"
         )
         instrucoes.setWordWrap(True)
         layout_selecao = QHBoxLayout()
         self.btn_selecionar = QPushButton("📂 Selecionar Ficheiro CSV...")
         self.label_ficheiro = QLabel("Nenhum ficheiro selecionado.")
+        self.btn_exportar = QPushButton("💾 Exportar Catálogo (CSV)")
+        self.btn_exportar.setObjectName("btnNeutral")
         layout_selecao.addWidget(self.btn_selecionar)
         layout_selecao.addWidget(self.label_ficheiro)
         layout_selecao.addStretch(1)
+        layout_selecao.addWidget(self.btn_exportar)
+        self.check_atualizar = QCheckBox("Atualizar produtos já existentes (nome, descrição, preço e códigos B/C)")
+        self.check_atualizar.setToolTip("Sem esta opção, linhas com código já cadastrado são rejeitadas.")
         self.btn_importar = QPushButton("🚀 Iniciar Importação")
         self.btn_importar.setObjectName("btnPositive")
         self.btn_importar.setEnabled(False)
@@ -1051,11 +1160,13 @@ class ImportacaoWidget(QWidget):
         self.layout.addWidget(titulo)
         self.layout.addWidget(instrucoes)
         self.layout.addLayout(layout_selecao)
+        self.layout.addWidget(self.check_atualizar)
         self.layout.addWidget(self.btn_importar)
         self.layout.addWidget(label_resultados)
         self.layout.addWidget(self.text_resultados)
         self.btn_selecionar.clicked.connect(self.selecionar_ficheiro)
         self.btn_importar.clicked.connect(self.iniciar_importacao)
+        self.btn_exportar.clicked.connect(self.exportar_catalogo)
     def selecionar_ficheiro(self):
         caminho, _ = QFileDialog.getOpenFileName(self, "Selecionar Ficheiro CSV", "", "Ficheiros CSV (*.csv)")
         if caminho:
@@ -1073,11 +1184,17 @@ class ImportacaoWidget(QWidget):
         try:
             with open(self.caminho_ficheiro, 'rb') as f:
                 files = {'file': (os.path.basename(self.caminho_ficheiro), f, 'text/csv')}
-                response = requests.post(f"{API_BASE_URL}/api/produtos/importar", headers=headers, files=files)
+                dados_form = {'modo': 'atualizar' if self.check_atualizar.isChecked() else 'inserir'}
+                response = requests.post(f"{API_BASE_URL}/api/produtos/importar", headers=headers, files=files, data=dados_form)
             if response.status_code == 200:
                 dados = response.json()
                 resultado_texto = f"{dados.get('mensagem', '')}\n"
-                resultado_texto += f"Produtos importados com sucesso: {dados.get('produtos_importados', 0)}\n\n"
+                if 'produtos_atualizados' in dados:
+                    resultado_texto += f"Produtos novos inseridos: {dados.get('produtos_inseridos', 0)}\n"
+                    resultado_texto += f"Produtos atualizados: {dados.get('produtos_atualizados', 0)}\n"
+                    resultado_texto += f"Produtos sem alteração: {dados.get('produtos_inalterados', 0)}\n\n"
+                else:
+                    resultado_texto += f"Produtos importados com sucesso: {dados.get('produtos_importados', 0)}\n\n"
                 erros = dados.get('erros', [])
                 if erros:
                     resultado_texto += "Erros encontrados:\n"
@@ -1092,11 +1209,56 @@ class ImportacaoWidget(QWidget):
         except Exception as e:
             self.text_resultados.setText(f"Ocorreu um erro crítico: {e}")
         self.btn_importar.setEnabled(False)
+    def exportar_catalogo(self):
+        caminho_salvar, _ = QFileDialog.getSaveFileName(self, "Exportar Catálogo", "produtos.csv", "Ficheiros CSV (*.csv)")
+        if not caminho_salvar:
+            return
+        global access_token
+        headers = {'Authorization': f'Bearer {access_token}'}
+        try:
+            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+            response = requests.get(f"{API_BASE_URL}/api/produtos/exportar", headers=headers, params={'formato': 'csv'}, stream=True)
+            if response.status_code == 200:
+                with open(caminho_salvar, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        f.write(chunk)
+                QApplication.restoreOverrideCursor()
+                QMessageBox.information(self, "Sucesso", f"Catálogo exportado para:\n{caminho_salvar}")
+            else:
+                QApplication.restoreOverrideCursor()
+                QMessageBox.warning(self, "Erro", f"A API retornou um erro: {response.status_code}")
+        except requests.exceptions.RequestException:
+            QApplication.restoreOverrideCursor()
+            show_connection_error_message(self)
+
+class ClassesAbcWorker(QObject):
+    """Busca /api/analise/abc (catálogo inteiro) fora da thread da interface."""
+    finished = Signal(dict)
+    def run(self):
+        results = {'status': 'success'}
+        try:
+            global access_token
+            headers = {'Authorization': f'Bearer {access_token}'}
+            response = requests.get(f"{API_BASE_URL}/api/analise/abc", headers=headers, timeout=30)
+            if response.status_code != 200:
+                raise RuntimeError(response.json().get('erro', f"Erro {response.status_code}"))
+            results['classes'] = {p['id_produto']: p['classe'] for p in response.json()['produtos']}
+        except requests.exceptions.RequestException:
+            results['status'] = 'error'
+            results['message'] = "connection_error"
+        except Exception as e:
+            results['status'] = 'error'
+            results['message'] = str(e)
+        self.finished.emit(results)
 
 class InventarioWidget(QWidget):
+    INTERVALO_CLASSES_ABC_MS = 10 * 60 * 1000
+
     def __init__(self):
         super().__init__()
         self.dados_exibidos = []
+        self.classes_abc = {}
+        self.abc_thread = None
         self.sort_qtd_desc = True
         
         # Inicialização da Interface e Conexões
@@ -1106,6 +1268,7 @@ class InventarioWidget(QWidget):
         # Carregamento Inicial
         self.carregar_setores_filtro()
         self.carregar_dados_inventario()
+        self.carregar_classes_abc()
 
     def setup_ui(self):
         """Constrói a interface gráfica do widget."""
@@ -1126,9 +1289,16 @@ class InventarioWidget(QWidget):
         self.combo_filtro_setor.setPlaceholderText("Todos os Setores")
         self.combo_filtro_setor.addItem("Todos os Setores", None)
         self.combo_filtro_setor.setMinimumWidth(180)
+
+        # Classe da curva ABC (saídas dos últimos 90 dias, calculada no servidor)
+        self.combo_filtro_abc = QComboBox()
+        self.combo_filtro_abc.addItem("Todas as Classes ABC", None)
+        for classe in "ABC":
+            self.combo_filtro_abc.addItem(f"Classe {classe}", classe)
         
         layout_filtros.addWidget(self.input_pesquisa)
         layout_filtros.addWidget(self.combo_filtro_setor)
+        layout_filtros.addWidget(self.combo_filtro_abc)
         self.layout.addLayout(layout_filtros)
 
         # 3. Barra de Ferramentas (Botões)
@@ -1174,7 +1344,7 @@ class InventarioWidget(QWidget):
         self.tabela_inventario.setWordWrap(True)
         
         # Configuração das Colunas (Adicionado Setor)
-        colunas = ["Código", "Nome do Produto", "Descrição", "Setor", "Saldo", "Preço (R$)", "Código B", "Código C"]
+        colunas = ["Código", "Nome do Produto", "Descrição", "Setor", "Saldo", "Preço (R$)", "Código B", "Código C", "Classe ABC"]
         self.tabela_inventario.setColumnCount(len(colunas))
         self.tabela_inventario.setHorizontalHeaderLabels(colunas)
         
@@ -1190,9 +1360,16 @@ class InventarioWidget(QWidget):
         self.search_timer = QTimer(self)
         self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self.carregar_dados_inventario)
+
+        # A curva ABC cobre o catálogo inteiro: é buscada ao abrir o ecrã e
+        # depois só de tempos a tempos, nunca a cada pesquisa ou filtro.
+        self.abc_timer = QTimer(self)
+        self.abc_timer.timeout.connect(self.carregar_classes_abc)
+        self.abc_timer.start(self.INTERVALO_CLASSES_ABC_MS)
         
         self.input_pesquisa.textChanged.connect(self.iniciar_busca_timer)
         self.combo_filtro_setor.currentIndexChanged.connect(self.carregar_dados_inventario)
+        self.combo_filtro_abc.currentIndexChanged.connect(lambda: self.popular_tabela(self.dados_exibidos))
         
         self.btn_adicionar.clicked.connect(self.abrir_formulario_adicionar)
         self.btn_editar.clicked.connect(self.abrir_formulario_editar)
@@ -1255,8 +1432,32 @@ class InventarioWidget(QWidget):
         except requests.exceptions.RequestException:
             show_connection_error_message(self)
 
+    def carregar_classes_abc(self):
+        """Atualiza o mapa id_produto -> classe ABC num worker; a tabela é redesenhada quando ele chega."""
+        if self.abc_thread is not None:
+            return
+        self.abc_thread = QThread()
+        self.abc_worker = ClassesAbcWorker()
+        self.abc_worker.moveToThread(self.abc_thread)
+        self.abc_thread.started.connect(self.abc_worker.run)
+        self.abc_worker.finished.connect(self.mostrar_classes_abc)
+        self.abc_worker.finished.connect(self.abc_thread.quit)
+        self.abc_worker.finished.connect(self.abc_worker.deleteLater)
+        self.abc_thread.finished.connect(self.abc_thread.deleteLater)
+        self.abc_thread.start()
+
+    def mostrar_classes_abc(self, results):
+        self.abc_thread = None
+        if results['status'] != 'success':
+            return # Sem a curva a coluna fica vazia; o inventário continua utilizável
+        self.classes_abc = results['classes']
+        self.popular_tabela(self.dados_exibidos)
+
     def popular_tabela(self, dados):
         """Preenche a QTableWidget com os dados recebidos."""
+        classe_filtro = self.combo_filtro_abc.currentData()
+        if classe_filtro:
+            dados = [item for item in dados if self.classes_abc.get(item['id_produto']) == classe_filtro]
         self.tabela_inventario.setRowCount(0)
         self.tabela_inventario.setRowCount(len(dados))
         
@@ -1291,6 +1492,11 @@ class InventarioWidget(QWidget):
             
             # Coluna 7: Código C
             self.tabela_inventario.setItem(linha, 7, QTableWidgetItem(item.get('codigoC', '')))
+
+            # Coluna 8: Classe ABC
+            classe_item = QTableWidgetItem(self.classes_abc.get(item['id_produto'], '-'))
+            classe_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.tabela_inventario.setItem(linha, 8, classe_item)
             
         self.tabela_inventario.resizeRowsToContents()
 
@@ -1382,34 +1588,31 @@ class InventarioWidget(QWidget):
             if item:
                 product_ids.append(item.data(Qt.UserRole))
 
+        try:
+            global access_token
+            headers = {'Authorization': f'Bearer {access_token}'}
+            response = requests.get(f"{API_BASE_URL}/api/etiquetas/formatos", headers=headers)
+            response.raise_for_status()
+            dados_formatos = response.json()
+        except requests.exceptions.RequestException:
+            show_connection_error_message(self)
+            return
+        formatos = dados_formatos['formatos']
+        descricoes = [f['descricao'] for f in formatos]
+        indice_padrao = next((i for i, f in enumerate(formatos) if f['id'] == dados_formatos['padrao']), 0)
+        descricao, ok = QInputDialog.getItem(self, "Formato das Etiquetas", "Papel / rolo de etiquetas:", descricoes, indice_padrao, False)
+        if not ok:
+            return
+        formato_etiqueta = formatos[descricoes.index(descricao)]['id']
+
         caminho_salvar, _ = QFileDialog.getSaveFileName(self, "Salvar Etiquetas", "etiquetas.pdf", "PDF (*.pdf)")
         if not caminho_salvar:
             return
 
-        global access_token
-        headers = {'Authorization': f'Bearer {access_token}'}
-        try:
-            # Feedback visual simples
-            QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-            
-            response = requests.post(f"{API_BASE_URL}/api/produtos/etiquetas", 
-                                   headers=headers, 
-                                   json={'product_ids': product_ids}, 
-                                   stream=True)
-            
-            QApplication.restoreOverrideCursor()
-
-            if response.status_code == 200:
-                with open(caminho_salvar, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                QMessageBox.information(self, "Sucesso", f"Etiquetas salvas em:\n{caminho_salvar}")
-            else:
-                QMessageBox.warning(self, "Erro", f"Erro ao gerar: {response.status_code}")
-                
-        except Exception as e:
-            QApplication.restoreOverrideCursor()
-            show_connection_error_message(self)
+        gerar_relatorio_em_segundo_plano(
+            self, 'etiquetas', {'product_ids': product_ids, 'formato_etiqueta': formato_etiqueta}, caminho_salvar,
+            lambda resultados: mostrar_resultado_relatorio(self, resultados)
+        )
 
 
 class GestaoEstoqueWidget(QWidget):
@@ -1563,13 +1766,11 @@ class RelatoriosWidget(QWidget):
     def gerar_relatorio(self, formato):
         relatorio_selecionado = self.combo_tipo_relatorio.currentText()
         params = {'formato': formato}
-        endpoint = ""
-        nome_arquivo_base = ""
         if relatorio_selecionado == "Inventário Atual":
-            endpoint = f"{API_BASE_URL}/api/relatorios/inventario"
+            tipo_relatorio = 'inventario'
             nome_arquivo_base = "relatorio_inventario"
         else:
-            endpoint = f"{API_BASE_URL}/api/relatorios/movimentacoes"
+            tipo_relatorio = 'movimentacoes'
             nome_arquivo_base = "relatorio_movimentacoes"
             params['data_inicio'] = self.input_data_inicio.date().toString("yyyy-MM-dd")
             params['data_fim'] = self.input_data_fim.date().toString("yyyy-MM-dd")
@@ -1580,19 +1781,10 @@ class RelatoriosWidget(QWidget):
         caminho_salvar, _ = QFileDialog.getSaveFileName(self, "Salvar Relatório", f"{nome_arquivo_base}{extensao}", f"Arquivos {formato.upper()} (*{extensao})")
         if not caminho_salvar:
             return
-        try:
-            global access_token
-            headers = {'Authorization': f'Bearer {access_token}'}
-            response = requests.get(endpoint, headers=headers, params=params, stream=True)
-            if response.status_code == 200:
-                with open(caminho_salvar, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                QMessageBox.information(self, "Sucesso", f"Relatório salvo com sucesso em:\n{caminho_salvar}")
-            else:
-                QMessageBox.warning(self, "Erro", f"A API retornou um erro: {response.status_code}")
-        except requests.exceptions.RequestException:
-            show_connection_error_message(self)
+        gerar_relatorio_em_segundo_plano(
+            self, tipo_relatorio, params, caminho_salvar,
+            lambda resultados: mostrar_resultado_relatorio(self, resultados)
+        )
 
 class FornecedoresWidget(QWidget):
     def __init__(self):
@@ -2449,7 +2641,115 @@ class InteractiveKPICard(QFrame):
         self.clicked.emit()
         super().mouseReleaseEvent(event)
 
+# --- Gráficos de tendência do dashboard ---
+# Desenhados em QImage (permitido fora da thread da interface) pelo
+# TendenciasWorker; a interface só recebe as imagens prontas.
+
+COR_ENTRADA = QColor("#3C9D5D")
+COR_SAIDA = QColor("#D0503C")
+COR_VALOR = QColor("#4768A5")
+
+def _preparar_grafico(largura, altura, titulo):
+    imagem = QImage(largura, altura, QImage.Format.Format_ARGB32_Premultiplied)
+    imagem.fill(Qt.GlobalColor.white)
+    painter = QPainter(imagem)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    fonte = QFont()
+    fonte.setPointSize(9)
+    fonte.setBold(True)
+    painter.setFont(fonte)
+    painter.setPen(QColor("#4768A5"))
+    painter.drawText(QRectF(10, 4, largura - 20, 20), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, titulo)
+    fonte.setBold(False)
+    fonte.setPointSize(8)
+    painter.setFont(fonte)
+    # Área útil: margem à esquerda para a escala, em baixo para as datas
+    area = QRectF(60, 30, largura - 75, altura - 55)
+    return imagem, painter, area
+
+def _desenhar_eixos(painter, area, serie, maximo, formatar):
+    painter.setPen(QPen(QColor("#D5DCEB"), 1))
+    for i in range(5):
+        y = area.bottom() - area.height() * i / 4
+        painter.drawLine(QPointF(area.left(), y), QPointF(area.right(), y))
+        painter.setPen(QColor("#666666"))
+        painter.drawText(QRectF(0, y - 8, area.left() - 6, 16), Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, formatar(maximo * i / 4))
+        painter.setPen(QPen(QColor("#D5DCEB"), 1))
+    painter.setPen(QColor("#666666"))
+    # No máximo ~8 datas no eixo, para não se sobreporem
+    passo = max(1, len(serie) // 8)
+    for i in range(0, len(serie), passo):
+        x = area.left() + area.width() * (i + 0.5) / len(serie)
+        dia = serie[i]['data']
+        painter.drawText(QRectF(x - 30, area.bottom() + 4, 60, 16), Qt.AlignmentFlag.AlignCenter, f"{dia[8:10]}/{dia[5:7]}")
+
+def desenhar_grafico_movimentos(serie, largura, altura):
+    imagem, painter, area = _preparar_grafico(largura, altura, "Entradas e saídas por dia (unidades)")
+    maximo = max([max(d['entradas'], d['saidas']) for d in serie] + [1])
+    _desenhar_eixos(painter, area, serie, maximo, lambda v: f"{v:,.0f}".replace(',', '.'))
+    largura_dia = area.width() / len(serie)
+    largura_barra = max(1.0, largura_dia * 0.4)
+    painter.setPen(Qt.PenStyle.NoPen)
+    for i, d in enumerate(serie):
+        x = area.left() + largura_dia * i + largura_dia * 0.1
+        for valor, cor, deslocamento in ((d['entradas'], COR_ENTRADA, 0), (d['saidas'], COR_SAIDA, largura_barra)):
+            if valor:
+                altura_barra = area.height() * valor / maximo
+                painter.setBrush(cor)
+                painter.drawRect(QRectF(x + deslocamento, area.bottom() - altura_barra, largura_barra, altura_barra))
+    for i, (texto, cor) in enumerate((("Entradas", COR_ENTRADA), ("Saídas", COR_SAIDA))):
+        x = largura - 150 + i * 75
+        painter.setBrush(cor)
+        painter.drawRect(QRectF(x, 10, 10, 10))
+        painter.setPen(QColor("#333333"))
+        painter.drawText(QRectF(x + 14, 4, 60, 20), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, texto)
+        painter.setPen(Qt.PenStyle.NoPen)
+    painter.end()
+    return imagem
+
+def desenhar_grafico_valor(serie, largura, altura):
+    imagem, painter, area = _preparar_grafico(largura, altura, "Valor do estoque (R$)")
+    valores = [d['valor_estoque'] for d in serie]
+    maximo = max(valores + [1.0])
+    _desenhar_eixos(painter, area, serie, maximo, lambda v: f"{v:,.0f}".replace(',', '.'))
+    pontos = QPolygonF([
+        QPointF(area.left() + area.width() * (i + 0.5) / len(valores), area.bottom() - area.height() * max(v, 0) / maximo)
+        for i, v in enumerate(valores)
+    ])
+    painter.setPen(QPen(COR_VALOR, 2))
+    painter.drawPolyline(pontos)
+    painter.end()
+    return imagem
+
+class TendenciasWorker(QObject):
+    """Busca /api/dashboard/tendencias e desenha os gráficos fora da thread da interface."""
+    finished = Signal(dict)
+    def __init__(self, dias, largura, altura):
+        super().__init__()
+        self.dias = dias
+        self.largura = largura
+        self.altura = altura
+    def run(self):
+        results = {'status': 'success'}
+        try:
+            global access_token
+            headers = {'Authorization': f'Bearer {access_token}'}
+            response = requests.get(f"{API_BASE_URL}/api/dashboard/tendencias", headers=headers, params={'dias': self.dias}, timeout=15)
+            if response.status_code != 200:
+                raise RuntimeError(response.json().get('erro', f"Erro {response.status_code}"))
+            serie = response.json()['serie']
+            results['movimentos'] = desenhar_grafico_movimentos(serie, self.largura, self.altura)
+            results['valor'] = desenhar_grafico_valor(serie, self.largura, self.altura)
+        except requests.exceptions.RequestException:
+            results['status'] = 'error'
+            results['message'] = "connection_error"
+        except Exception as e:
+            results['status'] = 'error'
+            results['message'] = str(e)
+        self.finished.emit(results)
+
 class DashboardWidget(QWidget):
+    ALTURA_GRAFICO = 220
     ir_para_produtos = Signal()
     ir_para_fornecedores = Signal()
     ir_para_entrada_rapida = Signal()
@@ -2517,9 +2817,30 @@ class DashboardWidget(QWidget):
         action_layout.addWidget(self.btn_atalho_entrada)
         action_layout.addWidget(self.btn_atalho_saida)
         action_layout.addWidget(self.btn_atalho_terminal)
+        tendencias_titulo_layout = QHBoxLayout()
+        tendencias_title = QLabel("Tendências")
+        tendencias_title.setObjectName("dashboardSectionTitle")
+        self.combo_periodo_tendencias = QComboBox()
+        for texto, dias in (("Últimos 7 dias", 7), ("Últimos 30 dias", 30), ("Últimos 90 dias", 90), ("Últimos 365 dias", 365)):
+            self.combo_periodo_tendencias.addItem(texto, dias)
+        self.combo_periodo_tendencias.setCurrentIndex(1)
+        tendencias_titulo_layout.addWidget(tendencias_title, 1)
+        tendencias_titulo_layout.addWidget(self.combo_periodo_tendencias)
+        tendencias_layout = QHBoxLayout()
+        self.grafico_movimentos = QLabel("A carregar...")
+        self.grafico_valor = QLabel("A carregar...")
+        for grafico in (self.grafico_movimentos, self.grafico_valor):
+            grafico.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            grafico.setMinimumHeight(self.ALTURA_GRAFICO)
+            grafico.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Fixed)
+            tendencias_layout.addWidget(grafico)
+        self.tendencias_thread = None
+        self.tendencias_pendente = False
         self.layout.addWidget(welcome_card)
         self.layout.addWidget(kpi_title)
         self.layout.addLayout(kpi_layout)
+        self.layout.addLayout(tendencias_titulo_layout)
+        self.layout.addLayout(tendencias_layout)
         self.layout.addWidget(action_title)
         self.layout.addLayout(action_layout)
         self.layout.addStretch(1)
@@ -2528,6 +2849,7 @@ class DashboardWidget(QWidget):
         self.btn_atalho_entrada.clicked.connect(self.ir_para_entrada_rapida.emit)
         self.btn_atalho_saida.clicked.connect(self.ir_para_saida_rapida.emit)
         self.btn_atalho_terminal.clicked.connect(self.ir_para_terminal.emit)
+        self.combo_periodo_tendencias.currentIndexChanged.connect(self.carregar_tendencias)
     def atualizar_mensagem_boas_vindas(self, nome_utilizador):
         primeiro_nome = nome_utilizador.split(" ")[0]
         curiosidade = random.choice(self.lista_curiosidades)
@@ -2536,6 +2858,7 @@ class DashboardWidget(QWidget):
     def carregar_dados_dashboard(self, nome_utilizador):
         self.atualizar_mensagem_boas_vindas(nome_utilizador)
         self.carregar_kpis()
+        self.carregar_tendencias()
     def carregar_kpis(self):
         global access_token
         headers = {'Authorization': f'Bearer {access_token}'}
@@ -2549,6 +2872,34 @@ class DashboardWidget(QWidget):
                 self.card_valor_estoque.set_valor(valor_formatado)
         except requests.exceptions.RequestException:
             show_connection_error_message(self)
+    def carregar_tendencias(self):
+        if self.tendencias_thread is not None:
+            # Um pedido ainda em curso; o período novo é pedido quando ele terminar
+            self.tendencias_pendente = True
+            return
+        self.tendencias_pendente = False
+        largura = max(300, self.grafico_movimentos.width())
+        self.tendencias_thread = QThread()
+        self.tendencias_worker = TendenciasWorker(self.combo_periodo_tendencias.currentData(), largura, self.ALTURA_GRAFICO)
+        self.tendencias_worker.moveToThread(self.tendencias_thread)
+        self.tendencias_thread.started.connect(self.tendencias_worker.run)
+        self.tendencias_worker.finished.connect(self.mostrar_tendencias)
+        self.tendencias_worker.finished.connect(self.tendencias_thread.quit)
+        self.tendencias_worker.finished.connect(self.tendencias_worker.deleteLater)
+        self.tendencias_thread.finished.connect(self.tendencias_thread.deleteLater)
+        self.tendencias_thread.start()
+    def mostrar_tendencias(self, resultados):
+        self.tendencias_thread = None
+        if resultados['status'] == 'success':
+            self.grafico_movimentos.setPixmap(QPixmap.fromImage(resultados['movimentos']))
+            self.grafico_valor.setPixmap(QPixmap.fromImage(resultados['valor']))
+        else:
+            # Sem diálogo de erro: o dashboard continua utilizável sem os gráficos
+            texto = "Servidor indisponível." if resultados.get('message') == "connection_error" else resultados.get('message')
+            self.grafico_movimentos.setText(f"Não foi possível carregar as tendências: {texto}")
+            self.grafico_valor.clear()
+        if self.tendencias_pendente:
+            self.carregar_tendencias()
 
 # ==============================================================================
 # 6. CLASSE DA JANELA DE LOGIN
@@ -1,6 +1,7 @@
 import sys
 import os
 import threading
+import multiprocessing
 import traceback
 from waitress import serve
 from PySide6.QtWidgets import QApplication, QMessageBox
@@ -9,18 +10,47 @@ from PySide6.QtWidgets import QApplication, QMessageBox
 backend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 sys.path.insert(0, backend_path)
 
+from config import MODO_LOCAL, PASTA_DADOS_LOCAL
+
+# --- Pasta de dados e modo local ---
+# O backend lê a configuração do ambiente em criar_app(), por isso isto vem antes de criar o servidor.
+# A pasta de instalação pode não ter permissão de escrita: os registos vão para a pasta de dados.
+pasta_dados = PASTA_DADOS_LOCAL or (
+    os.path.join(os.environ['LOCALAPPDATA'], 'Estoque') if os.environ.get('LOCALAPPDATA')
+    else os.path.join(os.path.expanduser('~'), '.estoque')
+)
+os.makedirs(pasta_dados, exist_ok=True)
+os.environ.setdefault('ESTOQUE_ARQUIVO_CONSULTAS_LENTAS', os.path.join(pasta_dados, 'logs', 'consultas_lentas.log'))
+if MODO_LOCAL:
+    # SQLite em WAL com os PRAGMAs de configuracao.preparar_engine; o esquema é criado no primeiro arranque
+    os.environ.setdefault('ESTOQUE_DATABASE_URL', 'sqlite:///' + os.path.join(pasta_dados, 'estoque.db'))
+
 # --- Imports do Nosso Projeto ---
-from app import app
+from app import criar_app, inicializar_banco, iniciar_reconciliacao_periodica, criar_administrador_inicial
 from main_ui import AppManager, resource_path
 
 # --- Função para Rodar o Servidor ---
 def run_server():
     """Inicia o servidor Flask usando Waitress em uma porta específica."""
     print("Iniciando servidor Flask em segundo plano...")
-    serve(app, host='0.0.0.0', port=5000)
+    app = criar_app()
+    if MODO_LOCAL:
+        # Só no modo local este processo é o dono do banco. Com o banco partilhado,
+        # o esquema, o preenchimento do mov_diario e a reconciliação dos indicadores
+        # ficam com o servidor (run_server.py, servidor_producao.py ou
+        # 'flask --app app:criar_app inicializar-banco'): vários clientes a
+        # arrancar não os repetem em paralelo.
+        inicializar_banco(app)
+        if criar_administrador_inicial(app):
+            print("Banco local criado com o utilizador admin / admin.")
+        iniciar_reconciliacao_periodica(app)
+    # No modo local só este computador usa o servidor
+    serve(app, host='127.0.0.1' if MODO_LOCAL else '0.0.0.0', port=5000)
 
 # --- Bloco de Execução Principal ---
 if __name__ == "__main__":
+    # Necessário no executável do PyInstaller: a importação paralela do backend cria processos filhos
+    multiprocessing.freeze_support()
     # Bloco de depuração global para apanhar qualquer erro que impeça a aplicação de iniciar
     try:
         # 1. Inicia o servidor em uma thread separada
@@ -0,0 +1,39 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+os.environ.setdefault('ESTOQUE_DB_CONSULTA_LENTA_MS', '0')
+# Bancos de testes diferentes começam com as mesmas versões de dados: o cache de relatórios é esvaziado a cada teste
+os.environ['ESTOQUE_CACHE_RELATORIOS'] = tempfile.mkdtemp(prefix='estoque_testes_cache_')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+import app as aplicacao  # noqa: E402
+import configuracao  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Aplicação de testes (criar_app) num banco SQLite temporário, com o utilizador admin/admin."""
+    shutil.rmtree(os.environ['ESTOQUE_CACHE_RELATORIOS'], ignore_errors=True)
+    config = dict(configuracao.carregar_configuracao(), database_url=f"sqlite:///{tmp_path / 'estoque.db'}")
+    app = aplicacao.criar_app(config)
+    app.testing = True
+    aplicacao.inicializar_banco(app)
+    aplicacao.criar_administrador_inicial(app)
+    yield app
+    with app.app_context():
+        aplicacao.db.engine.dispose()
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def cabecalhos(cliente):
+    token = cliente.post('/api/login', json={'login': 'admin', 'senha': 'admin'}).get_json()['access_token']
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,114 @@
+import io
+from datetime import datetime
+
+from pypdf import PdfReader
+
+import app as aplicacao
+import cache_relatorios
+import relatorios
+
+
+def _texto_pdf(dados):
+    return ''.join(pagina.extract_text() for pagina in PdfReader(io.BytesIO(dados)).pages)
+
+
+def test_versao_incrementada_depois_do_commit(app, cliente, cabecalhos):
+    with app.app_context():
+        antes = aplicacao.versoes_dados(['produto'])['produto']
+    cliente.post('/api/produtos', json={'codigo': 'V1', 'nome': 'Versionado', 'preco': '1,00'}, headers=cabecalhos)
+    with app.app_context():
+        assert aplicacao.versoes_dados(['produto'])['produto'] > antes
+
+
+def test_pdf_do_cache_enviado_tal_como_foi_gravado(cliente, cabecalhos, monkeypatch):
+    cliente.post('/api/produtos', json={'codigo': 'G1', 'nome': 'Gerado', 'preco': '1,00'}, headers=cabecalhos)
+    renderizacoes = []
+    renderizar = aplicacao.RENDERIZADORES_RELATORIO['inventario']
+    monkeypatch.setitem(aplicacao.RENDERIZADORES_RELATORIO, 'inventario',
+                        lambda *a, **k: renderizacoes.append(1) or renderizar(*a, **k))
+
+    envios = []
+    for hora in (datetime(2030, 1, 2, 8, 15), datetime(2030, 1, 2, 17, 45)):
+        monkeypatch.setattr(relatorios, 'datetime', type('Relogio', (datetime,), {'now': classmethod(lambda cls: hora)}))
+        resposta = cliente.get('/api/relatorios/inventario?formato=pdf', headers=cabecalhos)
+        envios.append(resposta.get_data())
+        resposta.close()
+
+    assert len(renderizacoes) == 1
+    # O acerto no cache não reescreve o PDF: leva a hora da renderização
+    assert envios[0] == envios[1]
+    assert 'Gerado em: 02/01/2030 08:15' in _texto_pdf(envios[1])
+
+
+def test_entrada_obtida_sobrevive_a_limpeza(tmp_path):
+    origem = tmp_path / 'relatorio.tmp'
+    origem.write_bytes(b'conteudo do relatorio')
+    arquivo, _, _, _ = cache_relatorios.guardar('a' * 64, str(origem), 'r.pdf', 'application/pdf', pasta=str(tmp_path))
+    arquivo.close()
+
+    arquivo, nome, _, _ = cache_relatorios.obter('a' * 64, pasta=str(tmp_path))
+    cache_relatorios.remover_excedente(str(tmp_path), limite=0)
+    with arquivo:
+        assert (nome, arquivo.read()) == ('r.pdf', b'conteudo do relatorio')
+    assert cache_relatorios.obter('a' * 64, pasta=str(tmp_path)) is None
+
+
+def test_reposicao_ve_alteracoes_do_historico(app, cliente, cabecalhos):
+    from datetime import date, timedelta
+
+    cliente.post('/api/produtos', json={'codigo': 'R1', 'nome': 'Reposto', 'preco': '1,00'}, headers=cabecalhos)
+    cliente.post('/api/estoque/entrada', json={'id_produto': 1, 'quantidade': 100}, headers=cabecalhos)
+    with app.app_context():
+        historico = aplicacao.versoes_dados([aplicacao.HISTORICO_MOV_DIARIO])
+    # Entradas e saídas do dia não invalidam a base de reposição
+    cliente.post('/api/estoque/saida', json={'id_produto': 1, 'quantidade': 1}, headers=cabecalhos)
+    with app.app_context():
+        assert aplicacao.versoes_dados([aplicacao.HISTORICO_MOV_DIARIO]) == historico
+    assert cliente.get('/api/analise/reposicao', headers=cabecalhos).get_json()['total_em_risco'] == 0
+
+    # Saídas de ontem lançadas diretamente no resumo (como depois de reconstruir-mov-diario)
+    with app.app_context():
+        aplicacao.db.session.execute(aplicacao.db.insert(aplicacao.MovimentoDiario).values(
+            id_produto=1, dia=date.today() - timedelta(days=1), tipo='Saida', quantidade=95, movimentos=5))
+        aplicacao.db.session.commit()
+    resposta = cliente.get('/api/analise/reposicao', headers=cabecalhos).get_json()
+    assert resposta['total_em_risco'] == 1 and resposta['produtos'][0]['saldo_atual'] == 4
+
+
+def test_etiquetas_avisam_codigos_sem_barras(app, cliente, cabecalhos):
+    ids = [cliente.post('/api/produtos', json={'codigo': codigo, 'nome': codigo, 'preco': '1,00'}, headers=cabecalhos).get_json()['id_produto_criado']
+           for codigo in ('E1', 'Ração')]
+    parametros = aplicacao.parametros_etiquetas({'product_ids': ids})
+    with app.app_context():
+        # A segunda vez vem do cache e tem de trazer o mesmo aviso
+        for _ in range(2):
+            _, _, avisos = aplicacao.renderizar_relatorio('etiquetas', parametros, io.BytesIO())
+            assert len(avisos) == 1 and 'Ração' in avisos[0] and 'E1' not in avisos[0]
+
+
+def test_parametros_do_trabalho_filtrados_por_tipo(cliente, cabecalhos):
+    assert aplicacao.parametros_relatorio('inventario', {'formato': 'xlsx', 'workers': 64, 'gerado_em': 'x'}) == {'formato': 'xlsx'}
+    assert aplicacao.parametros_relatorio('movimentacoes', {'tipo': 'Saida', 'destino': '/tmp/x'}) == {'formato': 'pdf', 'tipo': 'Saida'}
+    for tipo, parametros in (('inventario', {'formato': 'zip'}), ('setor', {'id_setor': '1'}),
+                             ('movimentacoes', {'tipo': {'x': 1}}), ('movimentacoes', {'data_inicio': 20300101})):
+        resposta = cliente.post('/api/relatorios/jobs', json={'tipo': tipo, 'parametros': parametros}, headers=cabecalhos)
+        assert resposta.status_code == 400, (tipo, parametros)
+
+
+def test_todos_os_relatorios_sincronos_respondem(cliente, cabecalhos):
+    cliente.post('/api/setores', json={'nome': 'S1'}, headers=cabecalhos)
+    for url in ('/api/relatorios/inventario?formato=pdf', '/api/relatorios/inventario?formato=xlsx',
+                '/api/relatorios/setores?formato=pdf', '/api/relatorios/setores?formato=zip',
+                '/api/relatorios/movimentacoes?formato=pdf', '/api/relatorios/movimentacoes?formato=xlsx'):
+        resposta = cliente.get(url, headers=cabecalhos)
+        assert resposta.status_code == 200, url
+        resposta.close()
+
+
+def test_movimentacoes_sincronas_validam_parametros(cliente, cabecalhos):
+    for consulta in ('tipo=foo', 'data_inicio=2030-13-01'):
+        resposta = cliente.get(f'/api/relatorios/movimentacoes?formato=pdf&{consulta}', headers=cabecalhos)
+        assert resposta.status_code == 400, consulta
+    resposta = cliente.get('/api/relatorios/movimentacoes?formato=xlsx&tipo=Saida', headers=cabecalhos)
+    assert resposta.status_code == 200
+    resposta.close()
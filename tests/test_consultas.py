@@ -0,0 +1,52 @@
+import pytest
+
+import app as aplicacao
+import consultas_sql
+
+# Rotas com @orcamento_consultas: com app.testing (ver conftest) um pedido acima
+# do orçamento levanta OrcamentoConsultasExcedido e o teste falha
+ROTAS_COM_ORCAMENTO = [
+    '/api/produtos',
+    '/api/produtos/codigo/P3',
+    '/api/estoque/saldos',
+    '/api/movimentacoes',
+    '/api/dashboard/kpis',
+    '/api/dashboard/tendencias',
+    '/api/analise/abc',
+    '/api/analise/reposicao',
+]
+
+
+def test_rotas_dentro_do_orcamento(app, cliente, cabecalhos):
+    cliente.post('/api/setores', json={'nome': 'Setor'}, headers=cabecalhos)
+    cliente.post('/api/fornecedores', json={'nome': 'Fornecedor'}, headers=cabecalhos)
+    for i in range(30):
+        cliente.post('/api/produtos', json={'codigo': f'P{i}', 'nome': f'Produto {i}', 'preco': '1,50',
+                                            'id_setor': 1, 'fornecedores_ids': [1]}, headers=cabecalhos)
+    # O orçamento não depende do número de linhas: entradas e saídas em vários produtos
+    for id_produto in range(1, 11):
+        assert cliente.post('/api/estoque/entrada', json={'id_produto': id_produto, 'quantidade': 10}, headers=cabecalhos).status_code == 201
+        assert cliente.post('/api/estoque/saida', json={'id_produto': id_produto, 'quantidade': 3}, headers=cabecalhos).status_code == 201
+
+    # Primeira passagem com os caches vazios, segunda com os caches preenchidos
+    for _ in range(2):
+        for rota in ROTAS_COM_ORCAMENTO:
+            assert cliente.get(rota, headers=cabecalhos).status_code == 200, rota
+
+    # Indicadores em falta: o kpis reconstrói-os dentro do mesmo orçamento
+    with app.app_context():
+        aplicacao.db.session.execute(aplicacao.db.delete(aplicacao.Indicador))
+        aplicacao.db.session.commit()
+    assert cliente.get('/api/dashboard/kpis', headers=cabecalhos).status_code == 200
+
+
+def test_orcamento_excedido_falha_em_testes(app):
+    @consultas_sql.orcamento_consultas(1)
+    def duas_consultas():
+        aplicacao.db.session.execute(aplicacao.db.text('SELECT 1'))
+        aplicacao.db.session.execute(aplicacao.db.text('SELECT 2'))
+        return 'ok'
+
+    app.add_url_rule('/teste/duas-consultas', view_func=duas_consultas)
+    with pytest.raises(consultas_sql.OrcamentoConsultasExcedido, match='fez 2 consultas SQL'):
+        app.test_client().get('/teste/duas-consultas')
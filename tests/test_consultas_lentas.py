@@ -0,0 +1,43 @@
+import os
+
+import sqlalchemy as sa
+from sqlalchemy import event
+
+import consultas_lentas
+
+
+def test_parametros_sensiveis_mascarados():
+    engine = sa.create_engine('sqlite://')
+    metadata = sa.MetaData()
+    usuario = sa.Table('usuario', metadata, sa.Column('id_usuario', sa.Integer, primary_key=True),
+                       sa.Column('login', sa.String), sa.Column('senha_hash', sa.String), sa.Column('nome', sa.String))
+    metadata.create_all(engine)
+    registados = []
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def guardar(conn, cursor, statement, parametros, context, executemany):
+        registados.append(consultas_lentas.parametros_mascarados(statement, parametros, context, executemany))
+
+    with engine.begin() as conexao:
+        conexao.execute(usuario.insert(), [{'login': 'ana', 'senha_hash': 'h1', 'nome': 'Ana'},
+                                           {'login': 'rui', 'senha_hash': 'h2', 'nome': 'Rui'}])
+        conexao.execute(usuario.update().where(usuario.c.login == 'ana').values(senha_hash='h3', nome='Ana M.'))
+        conexao.exec_driver_sql("SELECT * FROM usuario WHERE login = ? AND nome = ?", ('ana', 'Ana M.'))
+
+    assert registados == [
+        [('***', '***', 'Ana'), ('***', '***', 'Rui')],
+        ('***', 'Ana M.', '***'),
+        ('***', '***'),
+    ]
+
+
+def test_ficheiro_por_processo(tmp_path, monkeypatch):
+    monkeypatch.setattr(consultas_lentas, 'limite_segundos', None)
+    monkeypatch.setattr(consultas_lentas, 'arquivo', None)
+    monkeypatch.setattr(consultas_lentas._logger, 'handlers', [])
+    try:
+        consultas_lentas.configurar(100, False, str(tmp_path / 'consultas_lentas.log'))
+        assert consultas_lentas.arquivo == str(tmp_path / f'consultas_lentas.{os.getpid()}.log')
+    finally:
+        for handler in consultas_lentas._logger.handlers:
+            handler.close()
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import create_engine
+
+import app as aplicacao
+import configuracao
+
+
+def test_saida_usa_o_mesmo_saldo_da_listagem(app, cliente, cabecalhos):
+    cliente.post('/api/produtos', json={'nome': 'Produto', 'codigo': 'S1', 'preco': '1,00'}, headers=cabecalhos)
+    cliente.post('/api/estoque/entrada', json={'id_produto': 1, 'quantidade': 5}, headers=cabecalhos)
+    # Desvio entre mov_estoque e mov_diario (ex.: escrita feita fora da aplicação)
+    with app.app_context():
+        aplicacao.db.session.execute(aplicacao.db.update(aplicacao.MovimentoDiario).values(quantidade=2))
+        aplicacao.db.session.commit()
+
+    saldo = cliente.get('/api/estoque/saldos', headers=cabecalhos).get_json()[0]['saldo_atual']
+    assert saldo == 2
+    resposta = cliente.post('/api/estoque/saida', json={'id_produto': 1, 'quantidade': 3}, headers=cabecalhos)
+    assert (resposta.status_code, resposta.get_json()) == (400, {'erro': 'Saldo insuficiente'})
+
+
+def test_banco_sem_upsert_recusado_no_arranque(monkeypatch):
+    engine = create_engine('sqlite://')
+    monkeypatch.setattr(engine.dialect, 'name', 'mssql')
+    with pytest.raises(ValueError, match="Banco 'mssql' não suportado"):
+        configuracao.preparar_engine(engine, configuracao.carregar_configuracao())
+
+
+def test_comando_inicializar_banco_preenche_mov_diario(app, cliente, cabecalhos):
+    cliente.post('/api/produtos', json={'codigo': 'I1', 'nome': 'Inicial', 'preco': '2,00'}, headers=cabecalhos)
+    cliente.post('/api/estoque/entrada', json={'id_produto': 1, 'quantidade': 5}, headers=cabecalhos)
+    with app.app_context():
+        aplicacao.db.session.execute(aplicacao.db.delete(aplicacao.MovimentoDiario))
+        aplicacao.db.session.commit()
+
+    resultado = app.test_cli_runner().invoke(args=['inicializar-banco'])
+    assert resultado.exit_code == 0 and 'Banco inicializado' in resultado.output
+    with app.app_context():
+        assert aplicacao.calcular_saldo_produto(1) == 5
@@ -0,0 +1,68 @@
+import io
+
+
+def _importar(cliente, cabecalhos, texto, modo='inserir'):
+    dados = {'file': (io.BytesIO(texto.encode('utf-8')), 'produtos.csv'), 'modo': modo}
+    return cliente.post('/api/produtos/importar', data=dados, headers=cabecalhos, content_type='multipart/form-data').get_json()
+
+
+def test_atualizar_nao_apaga_setor(cliente, cabecalhos):
+    cliente.post('/api/setores', json={'nome': 'Armazém'}, headers=cabecalhos)
+    _importar(cliente, cabecalhos, 'codigo;nome;preco;quantidade;setor\nA1;Original;1,00;0;Armazém\n')
+    id_setor = cliente.get('/api/produtos/1', headers=cabecalhos).get_json()['id_setor']
+    assert id_setor is not None
+
+    resposta = _importar(cliente, cabecalhos, 'codigo;nome;preco;quantidade;setor\nA1;Atualizado;3,00;0;Inexistente\n', 'atualizar')
+    assert resposta['erros'] == ["Linha 2: Setor 'Inexistente' não existe."]
+    produto = cliente.get('/api/produtos/1', headers=cabecalhos).get_json()
+    assert (produto['nome'], produto['id_setor']) == ('Original', id_setor)
+
+    resposta = _importar(cliente, cabecalhos, 'codigo;nome;preco;quantidade;setor\nA1;Atualizado;3,00;0;\n', 'atualizar')
+    assert resposta['erros'] == [] and resposta['produtos_atualizados'] == 1
+    produto = cliente.get('/api/produtos/1', headers=cabecalhos).get_json()
+    assert (produto['nome'], produto['id_setor']) == ('Atualizado', id_setor)
+
+
+def test_exportacao_preserva_nomes_com_virgula(cliente, cabecalhos):
+    for nome in ('Silva, Lda', 'Nome "curto"', 'Outro'):
+        cliente.post('/api/fornecedores', json={'nome': nome}, headers=cabecalhos)
+    csv = 'codigo;nome;preco;quantidade;fornecedores_nomes\nB1;Com fornecedores;1,00;0;"""Silva, Lda"", ""Nome """"curto"""""", Outro"\n'
+    assert _importar(cliente, cabecalhos, csv)['produtos_importados'] == 1
+
+    exportado = cliente.get('/api/produtos/exportar', headers=cabecalhos).get_data()
+    cliente.delete('/api/produtos/1', headers=cabecalhos)
+    assert _importar(cliente, cabecalhos, exportado.decode('utf-8'))['erros'] == []
+    id_produto = cliente.get('/api/produtos/codigo/B1', headers=cabecalhos).get_json()['id']
+    produto = cliente.get(f'/api/produtos/{id_produto}', headers=cabecalhos).get_json()
+    assert sorted(f['nome'] for f in produto['fornecedores']) == ['Nome "curto"', 'Outro', 'Silva, Lda']
+
+
+def test_inserir_isola_erro_do_banco_na_linha(cliente, cabecalhos):
+    # 'c1' e 'C1' passam a verificação em Python mas são o mesmo código para o unique do banco
+    resposta = _importar(cliente, cabecalhos, 'codigo;nome;preco;quantidade\nC1;Primeiro;1,00;2\nc1;Repetido;1,00;0\nC2;Segundo;1,00;0\n')
+    assert resposta['produtos_importados'] == 2
+    assert len(resposta['erros']) == 1 and resposta['erros'][0].startswith('Linha 3: Erro - ')
+    assert cliente.get('/api/produtos/codigo/C2', headers=cabecalhos).status_code == 200
+
+
+def test_codificacao_detetada_para_o_ficheiro_inteiro(monkeypatch):
+    import importacao
+    monkeypatch.setattr(importacao, 'LIMIAR_IMPORTACAO_PARALELA_BYTES', 0)
+    # Em latin-1, 'Ã§' são os bytes C3 A7, UTF-8 válido ('ç') se o bloco for lido sozinho;
+    # só o último bloco tem bytes que não são UTF-8
+    linhas = ['A0;MaÃ§a;1,00;0'] + [f'P{i};Produto {i};1,00;0' for i in range(200)] + ['Z1;Ração;1,00;0']
+    dados = ('codigo;nome;preco;quantidade\n' + '\n'.join(linhas) + '\n').encode('latin-1')
+    registros, _, erros = importacao.ler_ficheiro_importacao(dados, max_workers=2)
+    assert erros == []
+    assert (registros[0]['nome'], registros[-1]['nome']) == ('MaÃ§a', 'Ração')
+
+
+def test_atualizar_reconhece_codigo_com_outra_caixa(cliente, cabecalhos):
+    cliente.post('/api/setores', json={'nome': 'Armazém'}, headers=cabecalhos)
+    _importar(cliente, cabecalhos, 'codigo;nome;preco;quantidade;setor\nA1;Original;1,00;0;Armazém\n')
+    id_setor = cliente.get('/api/produtos/1', headers=cabecalhos).get_json()['id_setor']
+
+    resposta = _importar(cliente, cabecalhos, 'codigo;nome;preco;quantidade;setor\na1;Atualizado;3,00;0;\n', 'atualizar')
+    assert (resposta['produtos_inseridos'], resposta['produtos_atualizados']) == (0, 1)
+    produto = cliente.get('/api/produtos/1', headers=cabecalhos).get_json()
+    assert (produto['codigo'], produto['nome'], produto['id_setor']) == ('A1', 'Atualizado', id_setor)
@@ -0,0 +1,61 @@
+from sqlalchemy import event
+
+import app as aplicacao
+
+
+def _kpis(cliente, cabecalhos):
+    return cliente.get('/api/dashboard/kpis', headers=cabecalhos).get_json()
+
+
+def _produto(**alteracoes):
+    dados = {'nome': 'Produto', 'codigo': 'P1', 'preco': '2,50'}
+    dados.update(alteracoes)
+    return dados
+
+
+def test_preco_nulo_vazio_e_invalido_no_put(app, cliente, cabecalhos):
+    cliente.post('/api/produtos', json=_produto(), headers=cabecalhos)
+    cliente.post('/api/estoque/entrada', json={'id_produto': 1, 'quantidade': 4}, headers=cabecalhos)
+    assert _kpis(cliente, cabecalhos)['valor_total_estoque'] == 10.0
+
+    resposta = cliente.put('/api/produtos/1', json=_produto(preco='abc'), headers=cabecalhos)
+    assert resposta.status_code == 400
+    assert _kpis(cliente, cabecalhos)['valor_total_estoque'] == 10.0
+
+    for preco in (None, ''):
+        resposta = cliente.put('/api/produtos/1', json=_produto(preco=preco), headers=cabecalhos)
+        assert resposta.status_code == 200
+        assert _kpis(cliente, cabecalhos)['valor_total_estoque'] == 0
+
+    cliente.put('/api/produtos/1', json=_produto(preco=3), headers=cabecalhos)
+    assert _kpis(cliente, cabecalhos)['valor_total_estoque'] == 12.0
+    # Os deltas aplicados batem com o recálculo a partir da origem
+    with app.app_context():
+        assert aplicacao.reconciliar_indicadores() is True
+    assert _kpis(cliente, cabecalhos)['valor_total_estoque'] == 12.0
+
+
+def test_delta_do_estoque_aplicado_depois_do_commit(app, cliente, cabecalhos):
+    cliente.post('/api/produtos', json=_produto(), headers=cabecalhos)
+    ordem = []
+
+    def antes_de_executar(conexao, cursor, sql, *args):
+        if sql.startswith(('INSERT INTO mov_estoque', 'UPDATE indicador')):
+            ordem.append(' '.join(sql.split()[:3]))
+
+    def ao_confirmar(conexao):
+        ordem.append('COMMIT')
+
+    with app.app_context():
+        engine = aplicacao.db.engine
+    event.listen(engine, 'before_cursor_execute', antes_de_executar)
+    event.listen(engine, 'commit', ao_confirmar)
+    try:
+        cliente.post('/api/estoque/entrada', json={'id_produto': 1, 'quantidade': 4}, headers=cabecalhos)
+    finally:
+        event.remove(engine, 'before_cursor_execute', antes_de_executar)
+        event.remove(engine, 'commit', ao_confirmar)
+
+    # A linha partilhada do indicador só é tocada depois de a entrada estar gravada
+    assert ordem[:3] == ['INSERT INTO mov_estoque', 'COMMIT', 'UPDATE indicador SET']
+    assert _kpis(cliente, cabecalhos)['valor_total_estoque'] == 10.0
@@ -0,0 +1,27 @@
+import re
+
+
+def _bytes_enviados(cliente, endpoint):
+    texto = cliente.get('/api/metrics').get_data(as_text=True)
+    m = re.search(r'estoque_http_resposta_bytes_total\{endpoint="%s",metodo="GET",processo="\d+"\} (\d+)' % re.escape(endpoint), texto)
+    return int(m.group(1)) if m else 0
+
+
+def test_downloads_e_streams_contam_nas_metricas(cliente, cabecalhos):
+    # Os contadores são do processo: compara com os valores antes dos pedidos
+    antes_pdf = _bytes_enviados(cliente, '/api/relatorios/inventario')
+    antes_csv = _bytes_enviados(cliente, '/api/produtos/exportar')
+    cliente.post('/api/produtos', json={'nome': 'Produto', 'codigo': 'P1', 'preco': '2,50'}, headers=cabecalhos)
+
+    # send_file (direct_passthrough): o corpo só é fechado depois de lido
+    resposta = cliente.get('/api/relatorios/inventario?formato=pdf', headers=cabecalhos)
+    pdf = resposta.get_data()
+    resposta.close()
+    # CSV em stream, sem Content-Length
+    resposta = cliente.get('/api/produtos/exportar', headers=cabecalhos)
+    csv = resposta.get_data()
+    resposta.close()
+
+    assert len(pdf) > 0 and len(csv) > 0
+    assert _bytes_enviados(cliente, '/api/relatorios/inventario') - antes_pdf == len(pdf)
+    assert _bytes_enviados(cliente, '/api/produtos/exportar') - antes_csv == len(csv)
@@ -0,0 +1,32 @@
+import io
+import zipfile
+
+from pypdf import PdfReader
+
+import relatorios
+
+
+def test_pdf_setor_quebra_nomes_longos():
+    nome = 'Parafuso sextavado inox A2 M8x40 com porca autoblocante e anilha larga para estruturas metálicas exteriores'
+    destino = io.BytesIO()
+    relatorios.gerar_pdf_setor(destino, 'Armazém', [('P1', nome, 3), ('P2', 'Curto', 1)])
+    texto = PdfReader(io.BytesIO(destino.getvalue())).pages[0].extract_text()
+    assert '…' not in texto
+    # O saldo (3) é extraído entre a primeira linha do nome e a continuação
+    assert ' '.join(texto.split()).replace(' 3 ', ' ', 1).count(nome) == 1
+
+
+def test_code128_invalido_sem_barras():
+    barras, modulos = relatorios.barras_code128('ABC-123')
+    assert barras and modulos > 0
+    assert relatorios.barras_code128('Ração') is None
+    assert relatorios.codigos_sem_barras(['ABC-123', 'Ração', ' Ração ', '']) == ['Ração']
+
+
+def test_zip_setores_sem_nomes_repetidos():
+    destino = io.BytesIO()
+    setores = [(nome, [('P1', 'Item', 1)]) for nome in ('A', 'A_2', 'A', 'A')]
+    relatorios.gerar_relatorio_setores(destino, setores, 'zip')
+    with zipfile.ZipFile(io.BytesIO(destino.getvalue())) as arquivo_zip:
+        nomes = arquivo_zip.namelist()
+    assert len(nomes) == len(set(nomes)) == 4
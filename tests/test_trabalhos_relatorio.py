@@ -0,0 +1,43 @@
+import time
+
+import trabalhos_relatorio
+
+
+def test_trabalho_expirado_apaga_o_parcial(tmp_path, monkeypatch):
+    monkeypatch.setattr(trabalhos_relatorio, '_ultima_limpeza', 0)
+    id_trabalho = 'a' * 32
+    # Worker morto a meio: estado final de erro gravado por _trabalho_terminado, .part deixado no spool
+    estado = {'id': id_trabalho, 'estado': 'erro', 'erro': 'Falha no processo de relatório',
+              'criado_em': time.time() - 2 * trabalhos_relatorio.VALIDADE_SEGUNDOS,
+              'concluido_em': time.time() - trabalhos_relatorio.VALIDADE_SEGUNDOS - 1}
+    trabalhos_relatorio._gravar_estado(estado, str(tmp_path))
+    (tmp_path / f'{id_trabalho}.part').write_bytes(b'%PDF-1.4 incompleto')
+
+    trabalhos_relatorio.limpar_expirados(str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_trabalho_corre_no_banco_da_aplicacao_que_o_enfileirou(cliente, cabecalhos, monkeypatch):
+    import io
+    import openpyxl
+    # Pool novo só para este teste: os processos criam a aplicação com a configuração desta
+    monkeypatch.setattr(trabalhos_relatorio, '_pool', None)
+    cliente.post('/api/produtos', json={'nome': 'Parafuso', 'codigo': 'PAR-01', 'preco': '1.50'}, headers=cabecalhos)
+
+    resposta = cliente.post('/api/relatorios/jobs', json={'tipo': 'inventario', 'parametros': {'formato': 'xlsx'}}, headers=cabecalhos)
+    assert resposta.status_code == 202
+    id_trabalho = resposta.get_json()['id']
+    try:
+        limite = time.monotonic() + 120
+        while True:
+            estado = cliente.get(f'/api/relatorios/jobs/{id_trabalho}', headers=cabecalhos).get_json()
+            if estado['estado'] in trabalhos_relatorio.ESTADOS_FINAIS or time.monotonic() > limite:
+                break
+            time.sleep(0.2)
+    finally:
+        trabalhos_relatorio._pool.shutdown()
+    assert estado['estado'] == 'concluido', estado
+
+    arquivo = cliente.get(f'/api/relatorios/jobs/{id_trabalho}/arquivo', headers=cabecalhos)
+    folha = openpyxl.load_workbook(io.BytesIO(arquivo.data)).active
+    assert 'PAR-01' in [linha[1] for linha in folha.iter_rows(values_only=True)]